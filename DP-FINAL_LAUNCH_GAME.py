@@ -1,3 +1,5 @@
+import time
+startup_time = time.perf_counter() # --startup-report counts from here
 import random
 import math  
 import pygame
@@ -9,11 +11,32 @@ import sys
 from os import path
 import ctypes
 import sqlite3
+import argparse
+from input_replay import InputRecorder, InputReplayer, LiveInput, RecordingInput, ReplayInput
+from level_data import PLAYER_START, load_level_data, get_level_duration
+import player_physics
+from flow_field import FlowField
+from line_of_sight import SightGrid
+from frame_scheduler import FrameScheduler
+from autopilot import AutopilotInput
+import assets
+from assets import LazySound, find_audio, load_font, load_image, loading_done, preload_image
+from atlas import GAME_SPRITES
+from audio import SoundManager
+from cue_tones import CueTones
+from quality_governor import QualityGovernor
+from screen_shake import ScreenShake
+from settings_store import SettingsStore
+from startup_timer import StartupTimer
+from window import Window
+
+startup = StartupTimer(startup_time)
+startup.mark('imports')
 
 def init_database():
     """Initialize the SQLite database and create tables if they don't exist"""
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Create table for player progress
@@ -61,6 +84,15 @@ def init_database():
     except Exception as e:
         print(f"Error initializing database: {e}")
 
+database_ready = False
+def ensure_database():
+    """Create the tables the first time anything reads or writes the database"""
+    global database_ready
+    if not database_ready:
+        with startup.timed('database'):
+            init_database()
+        database_ready = True
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -71,6 +103,82 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+# Command line options
+parser = argparse.ArgumentParser(description='Contextual and Sensory-Based Navigation in 2D Games')
+parser.add_argument('--profile-states', action='store_true', help='print per-state update/render times on exit')
+parser.add_argument('--record', metavar='FILE', help='record this run\'s input to FILE')
+parser.add_argument('--replay', metavar='FILE', help='play back input recorded with --record')
+parser.add_argument('--headless', action='store_true', help='no window or audio device, run as fast as possible')
+parser.add_argument('--seed', type=int, help='seed for the game\'s random numbers')
+parser.add_argument('--level', type=int, help='skip the menus and start at this level')
+parser.add_argument('--player-name', default='Player', help='player name used with --level')
+parser.add_argument('--db', metavar='FILE', help='use this database file instead of game_data.db')
+parser.add_argument('--autopilot', action='store_true', help='let a bot play instead of the keyboard (starts at --level, default 1)')
+parser.add_argument('--sensory-enemies', action='store_true', help='blobs chase the player when they can see them')
+parser.add_argument('--job-budget', type=float, default=2.0, metavar='MS',
+                    help='time per frame for jobs that can run less often, like navigation cues (default: 2)')
+parser.add_argument('--frames', type=int, help='with --autopilot, stop after this many frames')
+parser.add_argument('--startup-report', action='store_true', help='print how long each part of starting up took on exit')
+parser.add_argument('--window-scale', type=float, default=1.0, metavar='SCALE',
+                    help='window size as a multiple of 800x856, 1 or more, e.g. 2 for high DPI screens (default: 1)')
+parser.add_argument('--scaled', action='store_true', help='let SDL stretch the game to fit the desktop (pygame.SCALED)')
+parser.add_argument('--no-shake', action='store_true', help='turn off screen shake')
+parser.add_argument('--audio-buffer', type=int, default=512, metavar='SAMPLES',
+                    help='mixer buffer size; bigger is less likely to crackle while music streams, smaller plays effects sooner (default: 512)')
+args, _ = parser.parse_known_args()
+if args.window_scale < 1:
+    # The game always draws at 800x856, so a smaller window would only add a
+    # scale to every frame; SDL shrinks it on the GPU with --scaled instead
+    parser.error('--window-scale must be 1 or more; use --scaled to fit a smaller screen')
+
+if args.headless:
+    # Dummy drivers have to be chosen before pygame initialises
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+DB_PATH = args.db or resource_path('game_data.db')
+
+# A replay brings its own seed and start level so the run plays out exactly the same
+replayer = InputReplayer(args.replay) if args.replay else None
+if replayer:
+    args.seed = replayer.header['seed']
+    args.level = replayer.header.get('level')
+    args.player_name = replayer.header.get('player_name', args.player_name)
+    args.sensory_enemies = replayer.header.get('sensory_enemies', False)
+if args.seed is None:
+    args.seed = random.randrange(2 ** 31)
+if args.autopilot and not args.level:
+    args.level = 1
+rng = random.Random(args.seed)
+
+class FrameClock():
+    """Game time that advances a fixed step per frame instead of following the wall clock"""
+    def __init__(self, fps):
+        self.frame = 0
+        self.step = 1000 / fps
+
+    def tick(self):
+        self.frame += 1
+
+    def ticks(self):
+        return int(self.frame * self.step)
+
+# Recorded, replayed, headless and bot runs use frame time so they are repeatable
+frame_clock = FrameClock(60) if (args.record or args.replay or args.headless or args.autopilot) else None
+
+# Work that doesn't have to happen every frame, spread out within --job-budget
+scheduler = FrameScheduler(args.job_budget, measure=frame_clock is None)
+
+# Cosmetic effects dropped, first one first, while frames take longer than
+# a 60 fps frame, and brought back once there is room again
+governor = QualityGovernor(['alert shake', 'exit pulse', 'countdown pulse', 'hover bubbles', 'score fade'],
+                           1000 / 60, active=frame_clock is None)
+
+def game_ticks():
+    if frame_clock:
+        return frame_clock.ticks()
+    return pygame.time.get_ticks()
+
 # PYGAME INITIALIZATION 
 if os.name == 'nt':  # Windows only
     try:
@@ -83,13 +191,15 @@ if os.name == 'nt':  # Windows only
         except:
             pass
 
-# Initialize pygame and mixer
-pygame.mixer.pre_init(44100, -16, 2, 512)
-mixer.init()
-pygame.init()
+startup.mark('arguments')
 
-# Initialize database
-init_database()
+# Initialize pygame. Only the settings for the mixer, it opens the audio
+# device when the music starts (see finish_loading), and the database is
+# set up the first time it's used (see ensure_database)
+pygame.mixer.pre_init(44100, -16, 2, args.audio_buffer)
+pygame.display.init()
+pygame.font.init()
+startup.mark('pygame init')
 
 # UI Layout Constants (Add these)
 UI_LEFT_MARGIN = 100    # Increased from 70 to push level further right
@@ -100,13 +210,25 @@ LEVEL_TO_MONEY_SPACE = 40  # Increased spacing between level and money
 # Screen setup
 screen_width = 800 # 70% of 1920
 screen_height = 856  # 70% of 1080
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption('GAME PROJECT-ANNE 2025')
+# Everything draws on screen, at this size whatever the window's is. It
+# goes on the window at the end of the frame, scaled to fit and moved by
+# the screen shake (see Window.present)
+window = Window((screen_width, screen_height), args.window_scale, args.scaled and not args.headless)
+screen = window.open('GAME PROJECT-ANNE 2025')
+screen_shake = ScreenShake(enabled=not args.no_shake)
+
+# The title screen's sky and sun decode on a worker thread while the rest of
+# the setup runs. Everything else waits until the first frame is up, see
+# preload_game_assets()
+preload_image(resource_path('img/sky.png'))
+preload_image(resource_path('img/sun.png'))
+startup.mark('window')
 
 def save_game_progress(level, score, play_time, player_name="Player"):
     """Save the current game progress to the database"""
+    ensure_database()
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -123,8 +245,9 @@ def save_game_progress(level, score, play_time, player_name="Player"):
 
 def load_game_progress():
     """Load the latest game progress from the database"""
+    ensure_database()
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -152,8 +275,9 @@ def load_game_progress():
 
 def save_high_score(player_name, score, level):
     """Save a high score to the database only if it's a new personal best"""
+    ensure_database()
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         # --- NEW: Check if this is a new high score for the player ---
@@ -187,8 +311,9 @@ def save_high_score(player_name, score, level):
 
 def get_high_scores(limit=10):
     """Retrieve the top high scores from the database"""
+    ensure_database()
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         # GET ONLY THE BEST SCORE FOR EACH PLAYER WITH CORRECT LEVEL AND DATE
@@ -228,8 +353,9 @@ def get_high_scores(limit=10):
 
 def save_settings(music_enabled, sfx_enabled, volume, controls_shown):
     """Save game settings to the database"""
+    ensure_database()
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -247,8 +373,9 @@ def save_settings(music_enabled, sfx_enabled, volume, controls_shown):
 
 def load_settings():
     """Load game settings from the database"""
+    ensure_database()
     try:
-        conn = sqlite3.connect(resource_path('game_data.db'))
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('SELECT music_enabled, sfx_enabled, volume, controls_shown FROM game_settings WHERE id = 1')
@@ -283,7 +410,7 @@ def draw_debug_info():
         f"Settings Pos: {settings_rect}"
     ]
 # Draw debug text
-    debug_font = pygame.font.SysFont('Arial', 20)
+    debug_font = load_font('Arial', 20)
     for i, text in enumerate(debug_info):
         text_surf = debug_font.render(text, True, (255,255,255))
         screen.blit(text_surf, (10, screen_height - 80 + i*25))
@@ -298,10 +425,11 @@ clock = pygame.time.Clock()
 fps = 60
 
 #define font
-font = pygame.font.SysFont('Bauhaus 93', int(70 * 0.7))  # Scaled from original 70px
-font_score = pygame.font.SysFont('Bauhaus 93', int(50 * 0.7))  # Scaled from 50px
-font_menu = pygame.font.SysFont('Bauhaus 93', int(40 * 0.7))  # Scaled from 40px
-font_timer = pygame.font.SysFont('Bauhaus 93', int(70 * 0.7))  # Scaled from 70px
+font = load_font('Bauhaus 93', int(70 * 0.7))  # Scaled from original 70px
+font_score = load_font('Bauhaus 93', int(50 * 0.7))  # Scaled from 50px
+font_menu = load_font('Bauhaus 93', int(40 * 0.7))  # Scaled from 40px
+font_timer = load_font('Bauhaus 93', int(70 * 0.7))  # Scaled from 70px
+startup.mark('fonts')
 
 #define colors
 white = (255, 255, 255)
@@ -324,7 +452,7 @@ level_colors = {
 
 #define the level timers
 level_start_time = 0
-last_coin_time = 0
+last_coin_time = -10000
 
 #duration for coin collection alerts
 COIN_ALERT_DURATION = 1.0
@@ -333,7 +461,7 @@ countdown_time = 3 # 3 second countdown
 game_started = False # To track if countdown is complete
 
 #for key press alerts
-alert_font = pygame.font.SysFont('Arial', 20)
+alert_font = load_font('Arial', 20)
 alerts = []
 ALERT_DURATION = 1.5
 
@@ -357,7 +485,7 @@ def draw_controls_hint():
     screen.blit(bg, bg_rect)
     
     # Use a more readable font
-    controls_font = pygame.font.SysFont('Arial', 30, bold=True)  # Increased size
+    controls_font = load_font('Arial', 30, bold=True)  # Increased size
     
     # Space to jump (with proper spacing)
     space_text = controls_font.render("PRESS", True, (255, 255, 255))
@@ -385,7 +513,7 @@ def draw_controls_hint():
     screen.blit(arrow_key, (start_x + use_text.get_width() + 10, screen_height - 90))
     screen.blit(move_text, (start_x + use_text.get_width() + arrow_key.get_width() + 20, screen_height - 90))
     # Draw small keyboard icons
-    key_font = pygame.font.SysFont('Arial', 20, bold=True)
+    key_font = load_font('Arial', 20, bold=True)
     
     
     # Arrow keys instruction (with proper spacing)
@@ -400,50 +528,10 @@ def draw_controls_hint():
     screen.blit(use_text, (start_x, screen_height - 90))
     screen.blit(arrow_key, (start_x + use_text.get_width() + 10, screen_height - 90))
     screen.blit(move_text, (start_x + use_text.get_width() + arrow_key.get_width() + 20, screen_height - 90))
-def draw_name_input_screen():
-    global player_name, name_input_active, name_input_text, name_input_screen
-    
-    # Dark background
-    screen.fill((30, 30, 50))
-    
-    # Title
-    draw_text('ENTER YOUR NAME', font, white, (screen_width // 2) - 200, screen_height // 2 - 150)
-    
-    # Input box
-    pygame.draw.rect(screen, (50, 50, 80), name_input_rect, border_radius=10)
-    pygame.draw.rect(screen, (100, 100, 200) if name_input_active else (70, 70, 120), name_input_rect, 3, border_radius=10)
-    
-    # Input text
-    input_font = pygame.font.SysFont('Arial', 40)
-    text_surface = input_font.render(name_input_text, True, white)
-    screen.blit(text_surface, (name_input_rect.x + 10, name_input_rect.y + 10))
-    
-    # Cursor blink
-    if name_input_active and pygame.time.get_ticks() % 1000 < 500:
-        cursor_x = name_input_rect.x + 10 + text_surface.get_width() + 2
-        pygame.draw.line(screen, white, (cursor_x, name_input_rect.y + 10), 
-                        (cursor_x, name_input_rect.y + name_input_rect.height - 10), 2)
-    
-    # Start button
-    start_button_rect = pygame.Rect(screen_width // 2 - 100, screen_height // 2 + 50, 200, 60)
-    pygame.draw.rect(screen, (0, 100, 200), start_button_rect, border_radius=10)
-    pygame.draw.rect(screen, white, start_button_rect, 2, border_radius=10)
-    
-    start_text = font_menu.render("START GAME", True, white)
-    screen.blit(start_text, (start_button_rect.centerx - start_text.get_width() // 2, 
-                           start_button_rect.centery - start_text.get_height() // 2))
-    
-    # Instructions
-    instruction_font = pygame.font.SysFont('Arial', 20)
-    instructions = instruction_font.render("Click on the box to enter your name, then press START", True, (180, 180, 180))
-    screen.blit(instructions, (screen_width // 2 - instructions.get_width() // 2, screen_height // 2 + 120))
-    
-    return start_button_rect
-
 def add_alert(text, is_coin=False):
     alert = {
         'text': text,
-        'time': pygame.time.get_ticks(),
+        'time': game_ticks(),
         'shake_offset': 8 if is_coin else 3,  # More shake for coins
         'color': (255, 215, 0) if is_coin else (255, 255, 255),
         'size': 36 if is_coin else 24,  # Larger text for coins
@@ -457,26 +545,26 @@ def add_alert(text, is_coin=False):
 #define game variables
 tile_size = 40
 game_over = 0
-main_menu = True
 level = 1 # Start at level 1
 max_levels = 7
 score = 0
+# Totals over the whole run, for the run summary
+run_stats = {'coins': 0, 'deaths': 0, 'levels_completed': 0}
 # Player name variables
 player_name = "Player"  # Default name
 name_input_active = False
 name_input_text = ""
-name_input_screen = False
 name_input_rect = pygame.Rect(screen_width // 2 - 150, screen_height // 2 - 50, 300, 60)
-paused = False # New variable for pause state
-settings_menu = False # New variable for settings menu state
+start_button_rect = pygame.Rect(screen_width // 2 - 100, screen_height // 2 + 50, 200, 60)
+# The player's settings, read from the database once, in finish_loading
+# (see apply_settings). Changes take effect straight away and are saved in
+# the background once they settle
+settings = SettingsStore(load_settings, save_settings,
+                         {'music_enabled': True, 'sfx_enabled': True, 'volume': 0.5, 'controls_shown': True})
 music_on = True # Initial state for music
 sfx_on = True   # Initial state for sound effects
-volume = 0.5  # New: Initial volume level (0.0 to 1.0)1
-slider_active = False # New: State for volume slider interaction
-level_select_menu = False
-title_animation_start_time = 0 # NEW: To track when animation starts
+volume = 0.5  # Volume level (0.0 to 1.0)
 title_animation_duration = 2000 # NEW: Animation duration in milliseconds (2 seconds)
-show_main_menu_buttons = False # NEW: Controls when buttons are visible
 # New variables for warning sounds
 PLATFORM_PROXIMITY_THRESHOLD = 70 # Distance in pixels to trigger platform warning
 BLOB_PROXIMITY_THRESHOLD = 100 # Distance in pixels to trigger blob warning
@@ -490,209 +578,53 @@ blue = (0, 0, 255)
 black = (0, 0, 0) # New color for menu background
 gray = (150, 150, 150) # New color for slider
 
-#load images
-sun_img = pygame.image.load(resource_path ('img/sun.png'))
-bg_img = pygame.image.load(resource_path('img/sky.png'))
-restart_img = pygame.image.load(resource_path('img/restart_btn.png'))
-start_img = pygame.image.load(resource_path('img/start_btn.png'))
-exit_img = pygame.image.load(resource_path('img/exit_btn.png'))
-settings_img = pygame.image.load(resource_path('img/settings_btn.png'))
-pause_img = pygame.image.load(resource_path('img/pause_btn.png'))
-back_img = pygame.image.load(resource_path('img/back_button.png'))
-music_on_img = pygame.image.load(resource_path('img/music_on.png')) 
-music_off_img = pygame.image.load(resource_path('img/music_off.png')) 
-sfx_on_img = pygame.image.load(resource_path('img/sfx_on.png')) 
-sfx_off_img = pygame.image.load(resource_path('img/sfx_off.png')) 
-
-# Simplified Hardcoded Levels (rest of your level data remains the same)
-def get_level_data(level):
-    if level == 1:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ] 
-    elif level == 2:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ]
-    elif level == 3:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ]
-    elif level == 4:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ]
-    elif level == 5:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ]
-    elif level == 6:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ]
-    elif level == 7:
-        return [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
-        ]
-    else:
-        return [[0 for _ in range(20)] for _ in range(20)]
-
-#load sounds
-pygame.mixer.music.load(resource_path('img/music.wav'))
-pygame.mixer.music.set_volume(volume) # Set initial volume based on the 'volume' variable
-pygame.mixer.music.play(-1)
-jump_fx = pygame.mixer.Sound(resource_path('img/jump.wav'))
-jump_fx.set_volume(0.5)
-coin_fx = pygame.mixer.Sound(resource_path('img/coin.wav'))
-coin_fx.set_volume(0.5)
-game_over_fx = pygame.mixer.Sound(resource_path('img/game_over.wav'))
-game_over_fx.set_volume(0.5)
-# Load new warning sounds
-platform_warning_fx = pygame.mixer.Sound(resource_path('img/platform_warning.wav')) #
-platform_warning_fx.set_volume(0.3) # Adjust volume as needed
-blob_warning_fx = pygame.mixer.Sound(resource_path('img/blob_warning.wav')) #
-blob_warning_fx.set_volume(0.3) # Adjust volume as needed
+#load images (the title screen's, the rest come in with finish_loading())
+sun_img = load_image(resource_path('img/sun.png'))
+bg_img = load_image(resource_path('img/sky.png'))
+startup.mark('title images')
+
+#load sounds (each one the first time it plays)
+jump_fx = LazySound(resource_path('img/jump.wav'), 0.5)
+coin_fx = LazySound(resource_path('img/coin.wav'), 0.5)
+game_over_fx = LazySound(resource_path('img/game_over.wav'), 0.5)
+# Warning beeps, made rather than loaded: the closer the blob or platform,
+# the higher and faster they go. Blobs sound an octave above platforms
+blob_warning_cues = CueTones(BLOB_PROXIMITY_THRESHOLD, pitches=(1760, 1480, 1245, 1047), pulse_rates=(16, 12, 8, 6), volume=0.3)
+platform_warning_cues = CueTones(PLATFORM_PROXIMITY_THRESHOLD, pitches=(880, 740, 622, 523), pulse_rates=(16, 12, 8, 6), volume=0.3)
+
+# Sound effects go through sfx, which plays them once per frame: two channels
+# for each kind of sound, a minimum gap between repeats of the same one, and
+# a death or a coin cutting off a less important sound when they're all busy.
+# Warnings are played from the blob or platform they're about, panned and
+# quieter with distance from the player
+sfx = SoundManager({'player': 2, 'pickup': 2, 'warning': 2, 'alert': 1},
+                   hearing_range=3 * BLOB_PROXIMITY_THRESHOLD, pan_width=BLOB_PROXIMITY_THRESHOLD)
+sfx.add(jump_fx, 'player', priority=1, min_interval_ms=100)
+sfx.add(coin_fx, 'pickup', priority=2, min_interval_ms=50)
+sfx.add(game_over_fx, 'alert', priority=3, min_interval_ms=1000)
+for tone in platform_warning_cues.tones:
+    sfx.add(tone, 'warning', priority=1, min_interval_ms=250)
+for tone in blob_warning_cues.tones:
+    sfx.add(tone, 'warning', priority=2, min_interval_ms=250)
 
 def draw_text(text, font, text_col, x, y):
     img = font.render(text, True, text_col)
     screen.blit(img, (x, y))
 
+overlay_cache = {}
+def get_overlay(alpha):
+    """Full screen black overlay with the given alpha, built once and reused"""
+    if alpha not in overlay_cache:
+        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, alpha))
+        overlay_cache[alpha] = overlay
+    return overlay_cache[alpha]
+
 # New function to draw hover text with a bubble background
 def draw_hover_text(text, x, y):
-    hover_font = pygame.font.SysFont('Arial', 18)
+    if not governor.enabled('hover bubbles'):
+        return
+    hover_font = load_font('Arial', 18)
     text_surf = hover_font.render(text, True, black) # Black text
     
     # Create background rectangle for the bubble
@@ -726,40 +658,32 @@ def draw_level_label(level, font, text_col, bg_col, x, y):
 #function to reset level
 def reset_level(level):   
     global level_start_time, game_started, level_duration, show_controls, controls_timer, last_player_action_time
+    global last_nav_cue, player
 
-    level_duration = {
-        1: 15,
-        2: 25,
-        3: 35,
-        4: 45,
-        5: 55,
-        6: 65,
-        7: 75,
-        8: 85
-    }.get(level, 60)
+    level_duration = get_level_duration(level)
  
-    player.reset(100, screen_height - 130)
+    if player is None:
+        with startup.timed('player'):
+            player = Player(*PLAYER_START)
+    player.reset(*PLAYER_START)
+    screen_shake.stop()
     blob_group.empty()
     platform_group.empty()
     coin_group.empty()
     lava_group.empty()
     exit_group.empty()
  
-    level_start_time = pygame.time.get_ticks()
+    level_start_time = game_ticks()
     game_started = False
-    show_controls = True
-    controls_timer = pygame.time.get_ticks()
-    last_player_action_time = pygame.time.get_ticks()
+    show_controls = settings['controls_shown']
+    controls_timer = game_ticks()
+    last_player_action_time = game_ticks()
+    last_nav_cue = None
  
-    # Get the hardcoded level data
-    world_data = get_level_data(level)
-    world = World(world_data)
-
-    #load in level data and create world
-    if path.exists(f'level{level}_data'):
-        pickle_in = open(f'level{level}_data', 'rb')
-        world_data = pickle.load(pickle_in)
-    world = World(world_data)
+    #load in level data (level file if there is one) and create world
+    with startup.timed('first level'):
+        world = World(load_level_data(level))
+    schedule_blob_sight()
  
     #create dummy coin for showing the score
     score_coin = Coin(tile_size // 2, tile_size // 2)
@@ -774,28 +698,30 @@ class Button():
         self.rect.y = y
         self.clicked = False
         self.hover_text = ""  # Text to show on hover
-        self.hover_font = pygame.font.SysFont('Arial', 18)
+        self.hover_font = load_font('Arial', 18)
         self.hover_visible = False
+        self.hover_image = None  # Optional pre-rendered image shown while hovered
 
     def draw(self):
         action = False
-        pos = pygame.mouse.get_pos()
+        pos = window.mouse_pos()
         
         # Reset hover state
         self.hover_visible = False
         
-        # Check for hover and click
+        # Check for hover and click (clicks come from this frame's event pump)
         if self.rect.collidepoint(pos):
             self.hover_visible = True
-            if pygame.mouse.get_pressed()[0] == 1 and not self.clicked:
+        for click_pos in mouse_clicks:
+            if self.rect.collidepoint(click_pos):
                 action = True
                 self.clicked = True
-        
-        if pygame.mouse.get_pressed()[0] == 0:
-            self.clicked = False
             
-        # Draw the button
-        screen.blit(self.image, self.rect)
+        # Draw the button (use the cached hover image if there is one)
+        if self.hover_visible and self.hover_image is not None:
+            screen.blit(self.hover_image, self.rect)
+        else:
+            screen.blit(self.image, self.rect)
         
         # Draw hover text if needed
         if self.hover_visible and self.hover_text:
@@ -807,6 +733,8 @@ class Button():
         self.hover_text = text
 
     def draw_hover_text(self):
+        if not governor.enabled('hover bubbles'):
+            return
         try:
             # Render text
             text_surf = self.hover_font.render(self.hover_text, True, (0, 0, 0))
@@ -834,12 +762,12 @@ class Button():
         return action
 
     def check_hover(self):
-        pos = pygame.mouse.get_pos()
+        pos = window.mouse_pos()
         return self.rect.collidepoint(pos)
 
 
     def draw_hover_text(text, x, y):
-        font = pygame.font.SysFont('Arial', 20)
+        font = load_font('Arial', 20)
         text_surf = font.render(text, True, (255, 255, 255))
         text_rect = text_surf.get_rect(center=(x, y))
     # Optional background
@@ -853,52 +781,38 @@ class Player():
     def update(self, game_over):
         global show_controls, controls_timer, last_player_action_time
         
-        dx = 0
-        dy = 0
         walk_cooldown = 5
-        col_thresh = 20
         
         player_moved = False  # Track if player took any action
-        
-        if  level >= 5:
-            gravity = 1.2
-            jump_power = -14
-        else:
-            gravity = 1.0
-            jump_power = -15
 
         if game_over == 0 and game_started:
             #get keypresses
-            key = pygame.key.get_pressed()
+            key = input_keys
             #pygame doesn't access physical vibrations but can simulate a shake effect on key press
-            global shake_frames
-            if key[pygame.K_SPACE] and self.jumped == False and self.in_air == False:
+            platforms = [(tuple(platform.rect), platform.move_x, platform.move_direction) for platform in platform_group]
+            x, y, self.vel_y, self.in_air, self.jumped, did_jump = player_physics.step(
+                tuple(self.rect), self.vel_y, self.in_air, self.jumped,
+                key[pygame.K_LEFT], key[pygame.K_RIGHT], key[pygame.K_SPACE],
+                player_physics.jump_power(level), world.tile_grid, platforms)
+
+            if did_jump:
                 player_moved = True
                 if sfx_on: # Only play jump sound if SFX is on
-                    jump_fx.play()
-                self.vel_y = jump_power
-                self.jumped = True
+                    sfx.play(jump_fx)
                 add_alert("jumped!")
-                shake_frames = 10
-                
-            if key[pygame.K_SPACE] == False:
-                self.jumped = False
+                screen_shake.add(4, 10)
             
             if key[pygame.K_LEFT]:
                 player_moved = True
-                dx -= 5
                 self.counter += 1
                 self.direction = -1
-                add_alert("Move Left")
-                shake_frames = 6
+                screen_shake.add(1, 6)
             
             if key[pygame.K_RIGHT]:
                 player_moved = True
-                dx += 5
                 self.counter += 1
                 self.direction = 1
-                add_alert("Move Right")
-                shake_frames = 6
+                screen_shake.add(1, 6)
             
             if key[pygame.K_LEFT] == False and key[pygame.K_RIGHT] == False:
                 self.counter = 0
@@ -919,35 +833,11 @@ class Player():
                 if self.direction == -1:
                     self.image = self.images_left[self.index]
 
-            #add gravity
-            self.vel_y += 1
-            if self.vel_y > 10:
-                self.vel_y = 10
-            dy += self.vel_y
-
-            #check for collision
-            self.in_air = True
-            for tile in world.tile_list:
-                #check for collision in x direction
-                if tile[1].colliderect(self.rect.x + dx, self.rect.y, self.width, self.height):
-                    dx = 0
-                #check for collision in y direction
-                if tile[1].colliderect(self.rect.x, self.rect.y + dy, self.width, self.height):
-                    #check if below the ground i.e. jumping
-                    if self.vel_y < 0:
-                        dy = tile[1].bottom - self.rect.top
-                        self.vel_y = 0
-                    #check if above the ground i.e. falling
-                    elif self.vel_y >= 0:
-                        dy = tile[1].top - self.rect.bottom
-                        self.vel_y = 0
-                        self.in_air = False
-
             #check for collision with enemies
             if pygame.sprite.spritecollide(self, blob_group, False):
                 game_over = -1
                 if sfx_on: # Only play game over sound if SFX is on
-                    game_over_fx.play()
+                    sfx.play(game_over_fx)
                 #ENEMY DEATH ALERT:
                 add_alert("HIT BY ENEMY! YOU DIED!", False)
 
@@ -955,52 +845,25 @@ class Player():
             if pygame.sprite.spritecollide(self, lava_group, False):
                 game_over = -1
                 if sfx_on: # Only play game over sound if SFX is on
-                    game_over_fx.play()
+                    sfx.play(game_over_fx)
                 # LAVA DEATH ALERT:
                 add_alert("FELL IN LAVA! YOU DIED!", False)
 
-            #check for collision with lava
-            if pygame.sprite.spritecollide(self, lava_group, False):
-                game_over = -1
-                if sfx_on: # Only play game over sound if SFX is on
-                    game_over_fx.play()
-
             #check for collision with exit
             if pygame.sprite.spritecollide(self, exit_group, False):
                 game_over = 1
 
-            #check for collision with platforms
-            for platform in platform_group:
-                #collision in the x direction
-                if platform.rect.colliderect(self.rect.x + dx, self.rect.y, self.width, self.height):
-                    dx = 0
-                #collision in the y direction
-                if platform.rect.colliderect(self.rect.x, self.rect.y + dy, self.width, self.height):
-                    #check if below platform
-                    if abs((self.rect.top + dy) - platform.rect.bottom) < col_thresh:
-                        self.vel_y = 0
-                        dy = platform.rect.bottom - self.rect.top
-                    #check if above platform
-                    elif abs((self.rect.bottom + dy) - platform.rect.top) < col_thresh:
-                        self.rect.bottom = platform.rect.top - 1
-                        self.in_air = False
-                        dy = 0
-                    #move sideways with the platform
-                    if platform.move_x != 0:
-                        self.rect.x += platform.move_direction
-
-            #update player coordinates
-            self.rect.x += dx
-            self.rect.y += dy
+            #update player coordinates (tile and platform collisions are in player_physics.step)
+            self.rect.x = x
+            self.rect.y = y
 
         elif game_over == -1:
             self.image = self.dead_image
-            draw_text('GAME OVER!', font, blue, (screen_width // 2) - 200, screen_height // 2)
             if self.rect.y > 200:
                 self.rect.y -= 5
 
         # Update controls display timer based on player activity
-        current_time = pygame.time.get_ticks()
+        current_time = game_ticks()
         if player_moved:
             last_player_action_time = current_time
             show_controls = False
@@ -1012,23 +875,23 @@ class Player():
         if show_controls and current_time - controls_timer > CONTROLS_DISPLAY_TIME:
             show_controls = False
 
+        return game_over
+
+    def draw(self):
         #draw player onto screen
         screen.blit(self.image, self.rect)
 
-        return game_over
-
     def reset(self, x, y):
         self.images_right = []
         self.images_left = []
         self.index = 0
         self.counter = 0
         for num in range(1, 5):
-            img_right = pygame.image.load(resource_path(f'img/guy{num}.png'))
-            img_right = pygame.transform.scale(img_right, (40, 80))
+            img_right = load_image(resource_path(f'img/guy{num}.png'), (40, 80))
             img_left = pygame.transform.flip(img_right, True, False)
             self.images_right.append(img_right)
             self.images_left.append(img_left)
-        self.dead_image = pygame.image.load(resource_path('img/ghost.png'))
+        self.dead_image = load_image(resource_path('img/ghost.png'))
         self.image = self.images_right[self.index]
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -1045,22 +908,22 @@ class World():
         self.tile_list = []
 
         #load images
-        dirt_img = pygame.image.load(resource_path('img/dirt.png'))
-        grass_img = pygame.image.load(resource_path('img/grass.png'))
+        dirt_img = load_image(resource_path('img/dirt.png'), (tile_size, tile_size))
+        grass_img = load_image(resource_path('img/grass.png'), (tile_size, tile_size))
 
         row_count = 0
         for row in data:
             col_count = 0
             for tile in row:
                 if tile == 1:
-                    img = pygame.transform.scale(dirt_img, (tile_size, tile_size))
+                    img = dirt_img
                     img_rect = img.get_rect()
                     img_rect.x = col_count * tile_size
                     img_rect.y = row_count * tile_size
                     tile = (img, img_rect)
                     self.tile_list.append(tile)
                 if tile == 2:
-                    img = pygame.transform.scale(grass_img, (tile_size, tile_size))
+                    img = grass_img
                     img_rect = img.get_rect()
                     img_rect.x = col_count * tile_size
                     img_rect.y = row_count * tile_size
@@ -1086,33 +949,71 @@ class World():
                     exit_group.add(exit)
                 col_count += 1
             row_count += 1
+        self.tile_grid = player_physics.TileGrid([tile[1] for tile in self.tile_list], tile_size)
+        self.flow_field = FlowField(data, tile_size)
+        self.sight = SightGrid(data, tile_size, frame_cache=True)
 
     def draw(self):
         for tile in self.tile_list:
             screen.blit(tile[0], tile[1])
 
+BLOB_SIGHT_RANGE = 8 # tiles
+BLOB_CHASE_SPEED = 2
+BLOB_LEASH = 3 * tile_size # how far from its start a blob will chase
+
 class Enemy(pygame.sprite.Sprite):
     def __init__(self, x, y):
         pygame.sprite.Sprite.__init__(self)
-        self.image = pygame.image.load(resource_path('img/blob1.png'))
+        self.image = load_image(resource_path('img/blob1.png'))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
         self.move_direction = 1
         self.move_counter = 0
-
-    def update(self):
+        # Sensory behaviour (--sensory-enemies), set each frame by update_blob_sight()
+        self.home_x = x
+        self.patrol_x = None # where the patrol was left off to chase
+        self.sees_player = False
+        self.target_x = 0
+
+    def update(self, sight=None):
+        if sight is not None and self.sees_player:
+            self.chase(sight)
+            return
+        if sight is not None and self.patrol_x is not None:
+            # Lost sight of the player, go back to the patrol
+            if self.rect.x == self.patrol_x:
+                self.patrol_x = None
+            else:
+                self.rect.x += 1 if self.patrol_x > self.rect.x else -1
+            return
         self.rect.x += self.move_direction
         self.move_counter += 1
         if abs(self.move_counter) > 50:
             self.move_direction *= -1
             self.move_counter *= -1
 
+    def chase(self, sight):
+        if self.patrol_x is None:
+            self.patrol_x = self.rect.x
+        distance = self.target_x - self.rect.centerx
+        if abs(distance) < BLOB_CHASE_SPEED:
+            return
+        step = BLOB_CHASE_SPEED if distance > 0 else -BLOB_CHASE_SPEED
+        if abs(self.rect.x + step - self.home_x) > BLOB_LEASH:
+            return
+        # Stay on the ground it's on: no walking into walls or off edges
+        front = (self.rect.right - 1 if step > 0 else self.rect.left) + step
+        col = front // tile_size
+        row = (self.rect.bottom - 1) // tile_size
+        if (col, row) in sight.solid or (col, row + 1) not in sight.solid:
+            return
+        self.rect.x += step
+
 class Platform(pygame.sprite.Sprite):
     def __init__(self, x, y, move_x, move_y):
         pygame.sprite.Sprite.__init__(self)
-        img = pygame.image.load(resource_path('img/platform.png'))
-        self.image = pygame.transform.scale(img, (tile_size, tile_size // 2))
+        self.image = load_image(resource_path('img/platform.png'), (tile_size, tile_size // 2))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -1132,8 +1033,7 @@ class Platform(pygame.sprite.Sprite):
 class Lava(pygame.sprite.Sprite):
     def __init__(self, x, y):
         pygame.sprite.Sprite.__init__(self)
-        img = pygame.image.load(resource_path('img/lava.png'))
-        self.image = pygame.transform.scale(img, (tile_size, tile_size // 2))
+        self.image = load_image(resource_path('img/lava.png'), (tile_size, tile_size // 2))
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -1141,8 +1041,7 @@ class Lava(pygame.sprite.Sprite):
 class Coin(pygame.sprite.Sprite):
     def __init__(self, x, y):
         pygame.sprite.Sprite.__init__(self)
-        img = pygame.image.load(resource_path('img/coin.png'))
-        self.image = pygame.transform.scale(img, (tile_size // 2, tile_size // 2))
+        self.image = load_image(resource_path('img/coin.png'), (tile_size // 2, tile_size // 2))
         self.rect = self.image.get_rect()
         self.rect.center = (x, y)
 
@@ -1163,8 +1062,12 @@ class Exit(pygame.sprite.Sprite):
         self.rect.x = x
         self.rect.y = y
         self.pulse_time = 0
+        self.still_image = self.image
         
     def update(self):
+        if not governor.enabled('exit pulse'):
+            self.image = self.still_image
+            return
         # Create pulsing effect
         self.pulse_time += 0.05
         pulse = abs(math.sin(self.pulse_time)) * 0.2 + 0.8  # 0.8 to 1.0 scale
@@ -1182,11 +1085,11 @@ class Exit(pygame.sprite.Sprite):
         
     def draw_instruction(self, screen):
         # Create a pulsing instruction above the exit
-        pulse = int(pygame.time.get_ticks()/100) % 10
+        pulse = int(game_ticks()/100) % 10 if governor.enabled('exit pulse') else 0
         size = 30 + pulse * 2  # Pulsing size
         
         # Create instruction text
-        font = pygame.font.SysFont('impact', size)
+        font = load_font('impact', size)
         text = font.render("EXIT!", True, (255, 255, 0))  # Yellow text
         outline = font.render("EXIT!", True, (0, 0, 0))   # Black outline
         
@@ -1217,29 +1120,161 @@ class Slider:
         self.value = initial_val
         self.grabbed = False
 
+        self.handle_radius = 15
+
     def draw(self, screen):
-        # Draw background bar
-        pygame.draw.rect(screen, gray, self.rect, border_radius=5)
-        # Draw slider knob
-        knob_x = self.rect.x + int((self.value - self.min_val) / (self.max_val - self.min_val) * (self.rect.width - self.rect.height))
-        knob_rect = pygame.Rect(knob_x, self.rect.y, self.rect.height, self.rect.height)
-        pygame.draw.ellipse(screen, white, knob_rect)
+        # Draw slider bar (white background with black border)
+        pygame.draw.rect(screen, white, self.rect, border_radius=5)
+        pygame.draw.rect(screen, black, self.rect, 2, border_radius=5) # Border
+        # Draw slider handle (black outline with blue inner circle)
+        handle_x = self.rect.x + int((self.value - self.min_val) / (self.max_val - self.min_val) * self.rect.width)
+        pygame.draw.circle(screen, black, (handle_x, self.rect.centery), self.handle_radius)
+        pygame.draw.circle(screen, (0, 0, 255), (handle_x, self.rect.centery), self.handle_radius - 2)
+
+    def set_from_x(self, pos_x):
+        # Clamp the knob position within the slider
+        self.value = self.min_val + (pos_x - self.rect.x) / self.rect.width * (self.max_val - self.min_val)
+        self.value = max(self.min_val, min(self.max_val, self.value))
 
     def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if self.rect.collidepoint(event.pos):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # The handle is taller than the bar, so allow grabbing anywhere within its radius
+            grab_rect = self.rect.inflate(self.handle_radius * 2, self.handle_radius * 2)
+            if grab_rect.collidepoint(event.pos):
                 self.grabbed = True
+                self.set_from_x(event.pos[0])
+                return True
         elif event.type == pygame.MOUSEBUTTONUP:
             self.grabbed = False
         elif event.type == pygame.MOUSEMOTION and self.grabbed:
-            pos_x, _ = event.pos
-            # Clamp the knob position within the slider
-            self.value = self.min_val + (pos_x - self.rect.x) / (self.rect.width - self.rect.height) * (self.max_val - self.min_val)
-            self.value = max(self.min_val, min(self.max_val, self.value))
+            self.set_from_x(event.pos[0])
             return True # Indicate that the slider was interacted with
         return False
 
-player = Player(100, screen_height - 130)
+class LevelSelectGrid():
+    """Level select grid built once and kept between frames.
+
+    Tile images are rendered once per level and cached, and only the
+    buttons for the current page exist, so the per-frame cost is the
+    hover/click check on at most one page of tiles no matter how many
+    levels there are.
+    """
+    def __init__(self, level_count, columns=4, rows=2, button_width=100, button_height=80, gap=20):
+        self.columns = columns # How many columns will be in each row
+        self.rows = rows # Rows per page, extra levels go onto further pages
+        self.button_width = button_width
+        self.button_height = button_height # Made buttons slightly taller for better appearance
+        self.gap = gap # Gap between buttons
+        self.tile_cache = {} # level -> (image, hover image)
+        self.page = 0
+        self.level_buttons = []
+
+        # Static pieces of the screen, rendered once
+        self.overlay = get_overlay(180) # Darker black for menu
+        self.title_surf = font.render('SELECT LEVEL', True, white)
+        self.title_pos = ((screen_width // 2) - 220, screen_height // 2 - 200)
+
+        # Calculate total grid dimensions for centering (one full page)
+        grid_width = columns * button_width + (columns - 1) * gap
+        grid_height = rows * button_height + (rows - 1) * gap
+        self.start_x = (screen_width - grid_width) // 2
+        # Adjust Y position to be visually appealing relative to the "SELECT LEVEL" title
+        self.start_y = screen_height // 2 - grid_height // 2 + 50
+
+        # Page arrows sit below the grid and are only drawn when there is more than one page
+        arrow_y = self.start_y + grid_height + gap
+        self.prev_button = Button(self.start_x, arrow_y, self.render_arrow(-1))
+        self.next_button = Button(self.start_x + grid_width - 60, arrow_y, self.render_arrow(1))
+        self.page_label = None
+        self.page_label_pos = (0, 0)
+
+        self.set_level_count(level_count)
+
+    def render_arrow(self, direction):
+        img = pygame.Surface((60, 40), pygame.SRCALPHA)
+        pygame.draw.rect(img, (60, 120, 180, 200), (0, 0, 60, 40), border_radius=10)
+        pygame.draw.rect(img, white, (0, 0, 60, 40), 3, border_radius=10)
+        if direction < 0:
+            points = [(40, 8), (40, 32), (18, 20)]
+        else:
+            points = [(20, 8), (20, 32), (42, 20)]
+        pygame.draw.polygon(img, white, points)
+        return img
+
+    def render_tile(self, lvl, button_color):
+        # Create a Surface for the button to draw custom graphics
+        img = pygame.Surface((self.button_width, self.button_height), pygame.SRCALPHA)
+        # Draw button background with rounded corners
+        pygame.draw.rect(img, button_color, (0, 0, self.button_width, self.button_height), border_radius=10)
+        # Draw a white border around the button
+        pygame.draw.rect(img, white, (0, 0, self.button_width, self.button_height), 3, border_radius=10)
+        # Render the level number text using 'font_menu' and center it on the button image
+        level_text_surf = font_menu.render(str(lvl), True, (255, 255, 255)) # White text
+        text_rect = level_text_surf.get_rect(center=(self.button_width // 2, self.button_height // 2))
+        img.blit(level_text_surf, text_rect)
+        return img
+
+    def tile_images(self, lvl):
+        if lvl not in self.tile_cache:
+            # Semi-transparent blue normally, brighter while hovered
+            self.tile_cache[lvl] = (self.render_tile(lvl, (60, 120, 180, 200)),
+                                    self.render_tile(lvl, (90, 160, 230, 230)))
+        return self.tile_cache[lvl]
+
+    def page_size(self):
+        return self.columns * self.rows
+
+    def page_count(self):
+        return max(1, (self.level_count + self.page_size() - 1) // self.page_size()) # Ceiling division
+
+    def set_level_count(self, level_count):
+        self.level_count = level_count
+        self.set_page(min(self.page, self.page_count() - 1))
+
+    def set_page(self, page):
+        # Rebuild the buttons only when the visible page changes
+        self.page = max(0, min(page, self.page_count() - 1))
+        self.level_buttons = []
+        first = self.page * self.page_size() + 1
+        last = min(self.level_count, first + self.page_size() - 1)
+        for i in range(first, last + 1):
+            slot = i - first
+            row = slot // self.columns
+            col = slot % self.columns
+
+            btn_x = self.start_x + col * (self.button_width + self.gap)
+            btn_y = self.start_y + row * (self.button_height + self.gap)
+
+            image, hover_image = self.tile_images(i)
+            btn = Button(btn_x, btn_y, image)
+            btn.hover_image = hover_image
+            self.level_buttons.append((btn, i))
+
+        if self.page_count() > 1:
+            self.page_label = font_menu.render(f'{self.page + 1} / {self.page_count()}', True, white)
+            self.page_label_pos = (screen_width // 2 - self.page_label.get_width() // 2,
+                                   self.prev_button.rect.centery - self.page_label.get_height() // 2)
+        else:
+            self.page_label = None
+
+    def draw(self):
+        action = None
+        for btn, lvl in self.level_buttons:
+            if btn.draw():
+                action = lvl # Return the selected level number
+
+        if self.page_label is not None:
+            screen.blit(self.page_label, self.page_label_pos)
+            if self.page > 0 and self.prev_button.draw():
+                self.set_page(self.page - 1)
+            if self.page < self.page_count() - 1 and self.next_button.draw():
+                self.set_page(self.page + 1)
+
+        return action
+
+# The player and world are built when the first level starts
+player = None
+world = None
 
 blob_group = pygame.sprite.Group()
 platform_group = pygame.sprite.Group()
@@ -1247,37 +1282,88 @@ lava_group = pygame.sprite.Group()
 coin_group = pygame.sprite.Group()
 exit_group = pygame.sprite.Group()
 
-#create dummy coin for showing the score
-score_coin = Coin(tile_size // 2, tile_size // 2)
-coin_group.add(score_coin)
-
-#load in level data and create world
-if path.exists(f'level{level}_data'):
-    pickle_in = open(f'level{level}_data', 'rb')
-    world_data = pickle.load(pickle_in)
-world = World(world_data)
-
-#create buttons
-restart_button = Button(screen_width // 2 - 50, screen_height // 2 + 100, restart_img)
-start_button = Button(screen_width // 2 - 340, screen_height // 2, start_img)
-exit_button = Button(screen_width // 2 + 70, screen_height // 2, exit_img)
-settings_button = Button(screen_width - settings_img.get_width() - 35, 45, settings_img) # Top-right corner
-pause_button = Button(screen_width - pause_img.get_width() - 90, 35, pause_img)
-
-# Settings menu buttons and elements
-volume_slider = Slider(screen_width // 2 - 100, screen_height // 2 - 50, 200, 20, 0.0, 1.0, pygame.mixer.music.get_volume())
-# New buttons for settings menu
-back_button = Button(0, 0, back_img) # Initial position will be set in draw_settings_menu
-music_toggle_button = Button(0, 0, music_on_img) # Initial image, will change based on state
-sfx_toggle_button = Button(0, 0, sfx_on_img)
+# Settings menu slider
+volume_slider = Slider(screen_width // 2 - 150, screen_height // 2 + 50, 300, 10, 0.0, 1.0, volume)
+
+def preload_game_assets():
+    # Decode on worker threads while the title screen fades in
+    for name, size in GAME_SPRITES:
+        preload_image(resource_path('img/' + name), size)
+
+def load_menu_assets():
+    global restart_img, start_img, exit_img, settings_img, pause_img, back_img
+    global music_on_img, music_off_img, sfx_on_img, sfx_off_img
+    global restart_button, start_button, exit_button, settings_button, pause_button
+    global back_button, music_toggle_button, sfx_toggle_button
+
+    #load images
+    restart_img = load_image(resource_path('img/restart_btn.png'))
+    start_img = load_image(resource_path('img/start_btn.png'))
+    exit_img = load_image(resource_path('img/exit_btn.png'))
+    settings_img = load_image(resource_path('img/settings_btn.png'))
+    pause_img = load_image(resource_path('img/pause_btn.png'))
+    back_img = load_image(resource_path('img/back_button.png'))
+    music_on_img = load_image(resource_path('img/music_on.png'))
+    music_off_img = load_image(resource_path('img/music_off.png'))
+    sfx_on_img = load_image(resource_path('img/sfx_on.png'))
+    sfx_off_img = load_image(resource_path('img/sfx_off.png'))
+
+    #create buttons
+    restart_button = Button(screen_width // 2 - 50, screen_height // 2 + 100, restart_img)
+    start_button = Button(screen_width // 2 - 340, screen_height // 2, start_img)
+    exit_button = Button(screen_width // 2 + 70, screen_height // 2, exit_img)
+    settings_button = Button(screen_width - settings_img.get_width() - 35, 45, settings_img) # Top-right corner
+    pause_button = Button(screen_width - pause_img.get_width() - 90, 35, pause_img)
+
+    # New buttons for settings menu
+    back_button = Button(0, 0, back_img) # Initial position will be set in draw_settings_menu
+    music_toggle_button = Button(0, 0, music_on_img) # Initial image, will change based on state
+    sfx_toggle_button = Button(0, 0, sfx_on_img)
+
+assets_ready = False
+def apply_settings():
+    """Read the saved settings into the game; the first read sets up the database"""
+    global music_on, sfx_on, volume
+    ensure_database() # Timed on its own, so it isn't counted twice
+    with startup.timed('settings'):
+        music_on = settings['music_enabled']
+        sfx_on = settings['sfx_enabled']
+        volume = settings['volume']
+        volume_slider.value = volume
+
+def finish_loading():
+    """Everything past the title screen: the buttons (waiting for their images if still loading) and the music.
+
+    Called as soon as the preloads are in, and before anything that needs
+    them (the title screen's buttons, starting a level) in case they aren't.
+    The level's own sprites are built when it starts, see reset_level().
+    """
+    global assets_ready
+    if assets_ready:
+        return
+    assets_ready = True
+    with startup.timed('game assets'):
+        load_menu_assets()
+    apply_settings()
+    with startup.timed('mixer + music'):
+        mixer.init()
+        # Streamed from the file as it plays, so a compressed one (see find_audio) is never held decoded
+        pygame.mixer.music.load(find_audio(resource_path('img/music.wav')))
+        pygame.mixer.music.set_volume(volume) # Set initial volume based on the 'volume' variable
+        if music_on:
+            pygame.mixer.music.play(-1)
+    with startup.timed('warning tones'):
+        blob_warning_cues.prepare()
+        platform_warning_cues.prepare()
+
+# Level select grid is built once and reused every time the menu is shown
+level_select_grid = LevelSelectGrid(max_levels)
 
 play_count = 0
 def draw_pause_menu():
     global play_count
     # Darken the background
-    overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 150))
-    screen.blit(overlay, (0, 0))
+    screen.blit(get_overlay(150), (0, 0))
 
     draw_text('PAUSED', font, white, (screen_width // 2) - 120, screen_height // 2 - 150)
     
@@ -1297,8 +1383,8 @@ def draw_pause_menu():
                            save_button_rect.centery - save_text.get_height() // 2))
     
     # Check if save button is clicked
-    mouse_pos = pygame.mouse.get_pos()
-    mouse_clicked = pygame.mouse.get_pressed()[0]
+    mouse_pos = window.mouse_pos()
+    mouse_clicked = any(save_button_rect.collidepoint(pos) for pos in mouse_clicks)
     
     # Initialize play_time variable
     play_time = 0
@@ -1310,7 +1396,7 @@ def draw_pause_menu():
         
         if mouse_clicked:
             # Calculate play time in seconds (only when button is clicked)
-            current_time = pygame.time.get_ticks()
+            current_time = game_ticks()
             play_time = (current_time - level_start_time) // 1000
             
             print(f"Attempting to save: Level={level}, Score={score}, Time={play_time}")
@@ -1322,9 +1408,6 @@ def draw_pause_menu():
             else:
                 print("Failed to save game!")
                 add_alert("Failed to save game", False)
-            
-            # Add a small delay to prevent multiple rapid clicks
-            pygame.time.delay(300)
     
     # Draw Restart button
     restart_button.rect.x = screen_width // 2 - restart_button.image.get_width() - 30 
@@ -1351,7 +1434,7 @@ def draw_pause_menu():
     return action
 
 	# DEBUG: Always show test text to verify drawing works
-    test_font = pygame.font.SysFont('Arial', 30)
+    test_font = load_font('Arial', 30)
     test_text = test_font.render("DEBUG TEXT", True, (255, 0, 0))  # Red text
     screen.blit(test_text, (50, 50))
 
@@ -1362,7 +1445,7 @@ def draw_pause_menu():
     # Hover check
     if exit_button.check_hover():
        print("HOVER DETECTED - CHECK CONSOLE")  # Verify in console
-       hover_font = pygame.font.SysFont('Arial', 30)
+       hover_font = load_font('Arial', 30)
        hover_text = hover_font.render("HOVERING!", True, (0, 255, 0))  # Green text
        screen.blit(hover_text, (exit_button.rect.x, exit_button.rect.y - 40))
     
@@ -1374,12 +1457,10 @@ def draw_pause_menu():
        action = 'main_menu'
 
 def draw_settings_menu():
-    global music_on, sfx_on, volume, slider_active # Declare global to modify the variables
+    global music_on, sfx_on # Declare global to modify the variables
 
     # Darken the background
-    overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 150)) # Black with 150 alpha (out of 255)
-    screen.blit(overlay, (0, 0))
+    screen.blit(get_overlay(150), (0, 0)) # Black with 150 alpha (out of 255)
 
     draw_text('SETTINGS', font, white, (screen_width // 2) - 140, screen_height // 2 - 150) #
 
@@ -1414,6 +1495,7 @@ def draw_settings_menu():
     draw_text("Music", font_score, white, music_toggle_button.rect.centerx - (font_score.render("Music", True, white).get_width() // 2), music_toggle_button.rect.y - 30)
     if music_toggle_button.draw():
         music_on = not music_on # Toggle music state
+        settings.set('music_enabled', music_on)
         if music_on:
             mixer.music.play(-1) # Start music if turned on
         else:
@@ -1435,75 +1517,28 @@ def draw_settings_menu():
     draw_text("SFX", font_score, white, sfx_toggle_button.rect.centerx - (font_score.render("SFX", True, white).get_width() // 2), sfx_toggle_button.rect.y - 30)
     if sfx_toggle_button.draw():
         sfx_on = not sfx_on # Toggle SFX state
+        settings.set('sfx_enabled', sfx_on)
     # Restore original positions
     sfx_toggle_button.rect.x = original_sfx_toggle_x
     sfx_toggle_button.rect.y = original_sfx_toggle_y
 
-    # Volume Slider Bar dimensions and position
-    slider_bar_width = 300
-    slider_bar_height = 10
-    # Position below the icons, adjust as needed
-    slider_y_pos = screen_height // 2 - 50 + 100 
-    slider_x_start = screen_width // 2 - slider_bar_width // 2
-    slider_x_end = slider_x_start + slider_bar_width
-
-    # Draw slider bar (white background with black border)
-    pygame.draw.rect(screen, white, (slider_x_start, slider_y_pos, slider_bar_width, slider_bar_height), border_radius=5)
-    pygame.draw.rect(screen, black, (slider_x_start, slider_y_pos, slider_bar_width, slider_bar_height), 2, border_radius=5) # Border
-
-    # Calculate handle position based on current volume
-    handle_x = slider_x_start + int(volume * slider_bar_width)
-    handle_radius = 15
-    # Create a rectangle for the slider handle for collision detection
-    handle_rect = pygame.Rect(handle_x - handle_radius, slider_y_pos + slider_bar_height // 2 - handle_radius, handle_radius * 2, handle_radius * 2)
-
-    # Draw slider handle (black outline with blue inner circle)
-    pygame.draw.circle(screen, black, (handle_x, slider_y_pos + slider_bar_height // 2), handle_radius)
-    pygame.draw.circle(screen, (0, 0, 255), (handle_x, slider_y_pos + slider_bar_height // 2), handle_radius - 2) # Use a specific color for blue
+    # Volume slider (dragging is handled by the settings event handlers)
+    volume_slider.draw(screen)
 
     # Display volume percentage text next to the slider
     volume_percent_text = f"{int(volume * 100)}%"
-    draw_text(volume_percent_text, font_score, white, slider_x_start + slider_bar_width + 40, slider_y_pos) 
-
-    # Handle slider interaction (mouse clicks and drags)
-    mouse_pos = pygame.mouse.get_pos()
-    mouse_pressed = pygame.mouse.get_pressed()
-    
-    # Check if left mouse button is down
-    if mouse_pressed[0]: 
-        # If the mouse is colliding with the handle or the slider is already active (being dragged)
-        if handle_rect.collidepoint(mouse_pos) or slider_active: 
-            slider_active = True # Set slider to active
-            
-            # Clamp the mouse's X position within the slider bar's boundaries
-            new_handle_x = max(slider_x_start, min(mouse_pos[0], slider_x_end))
-            
-            # Calculate the new volume based on the handle's position relative to the bar
-            new_volume = (new_handle_x - slider_x_start) / slider_bar_width
-            volume = new_volume # Update the global volume variable
-
-            # Apply the new volume to the music mixer
-            pygame.mixer.music.set_volume(volume)
-    else:
-        slider_active = False # Reset slider active state when mouse button is released
+    draw_text(volume_percent_text, font_score, white, volume_slider.rect.right + 40, volume_slider.rect.y)
 
     return action # Will return 'back_to_game' or None
 
-def draw_countdown_timer():
-    current_time = pygame.time.get_ticks()
+def countdown_remaining():
+    current_time = game_ticks()
     elapsed = (current_time - level_start_time) / 1000 # Convert to seconds
-    remaining_countdown = max(0, countdown_time - elapsed)
-    
-    if remaining_countdown > 0:
-        
-        #create dark overlay
-        overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
-        
-        countdown_number = int(remaining_countdown) + 1 # Show 3, 2, 1
-        countdown_text = str(countdown_number)
-        
+    return max(0, countdown_time - elapsed)
+
+countdown_cache = {} # countdown number -> (text, outline, background) surfaces
+def get_countdown_surfaces(countdown_number):
+    if countdown_number not in countdown_cache:
         #make countdown numbers bigger and more dramatic
         if countdown_number == 3:
             text_color = bright_orange
@@ -1517,81 +1552,85 @@ def draw_countdown_timer():
             text_color = (255, 255, 0)
             outline_color = (255, 100, 0)
             text_size = 180
-            
-        countdown_font = pygame.font.SysFont('Impact', text_size)
-        
-        text_surf = countdown_font.render(countdown_text, True, text_color)
-        outline_surf = countdown_font.render(countdown_text, True, outline_color)
-        
-        text_rect = text_surf.get_rect(center=(screen_width // 2, screen_height // 2))
-        outline_rect = outline_surf.get_rect(center=(screen_width // 2 + 3, screen_height // 2 + 3))
-        
-        screen.blit(outline_surf, outline_rect)
-        screen.blit(text_surf, text_rect)
-        
-        #add pulsing effect
-        pulse = abs(pygame.time.get_ticks() % 1000 - 500) / 500
-        scaled_text = pygame.transform.scale(text_surf, 
-                                           (int(text_surf.get_width() * (1 + pulse * 0.2)), 
-                                        int(text_surf.get_height() * (1 + pulse * 0.2))))
-        
-        scaled_rect = scaled_text.get_rect(center=(screen_width // 2, screen_height // 2))
-        screen.blit(scaled_text, scaled_rect)
-       
+
+        countdown_font = load_font('Impact', text_size)
+        text_surf = countdown_font.render(str(countdown_number), True, text_color)
+        outline_surf = countdown_font.render(str(countdown_number), True, outline_color)
+
         # Create a semi-transparent background
         bg_surf = pygame.Surface((text_surf.get_width() + 40, text_surf.get_height() + 40), pygame.SRCALPHA)
         bg_surf.fill((0, 0, 0, 150))
-        bg_rect = bg_surf.get_rect(center=(screen_width // 2, screen_height // 2))
-        
-        screen.blit(bg_surf, bg_rect)
-        screen.blit(text_surf, text_rect)
-        
-        return False # Countdown not complete
-    return True # Countdown complete
+        countdown_cache[countdown_number] = (text_surf, outline_surf, bg_surf)
+    return countdown_cache[countdown_number]
 
-def draw_level_timer():
-    if not game_started:
+def draw_countdown_timer():
+    remaining_countdown = countdown_remaining()
+    if remaining_countdown <= 0:
         return
-    
-    current_time = pygame.time.get_ticks()
+
+    #create dark overlay
+    screen.blit(get_overlay(200), (0, 0))
+
+    countdown_number = int(remaining_countdown) + 1 # Show 3, 2, 1
+    text_surf, outline_surf, bg_surf = get_countdown_surfaces(countdown_number)
+
+    text_rect = text_surf.get_rect(center=(screen_width // 2, screen_height // 2))
+    outline_rect = outline_surf.get_rect(center=(screen_width // 2 + 3, screen_height // 2 + 3))
+
+    screen.blit(outline_surf, outline_rect)
+    screen.blit(text_surf, text_rect)
+
+    #add pulsing effect
+    if governor.enabled('countdown pulse'):
+        pulse = abs(game_ticks() % 1000 - 500) / 500
+        scaled_text = pygame.transform.scale(text_surf,
+                                           (int(text_surf.get_width() * (1 + pulse * 0.2)),
+                                        int(text_surf.get_height() * (1 + pulse * 0.2))))
+
+        scaled_rect = scaled_text.get_rect(center=(screen_width // 2, screen_height // 2))
+        screen.blit(scaled_text, scaled_rect)
+
+    bg_rect = bg_surf.get_rect(center=(screen_width // 2, screen_height // 2))
+    screen.blit(bg_surf, bg_rect)
+    screen.blit(text_surf, text_rect)
+
+def level_time_remaining():
+    current_time = game_ticks()
     elapsed = (current_time - level_start_time - (countdown_time * 1000)) / 1000 # Subtract countdown time
-    remaining_time = max(0, level_duration - elapsed)
-    
+    return max(0, level_duration - elapsed)
+
+timer_text_cache = {} # last rendered timer text -> surface
+def draw_level_timer():
+    remaining_time = level_time_remaining()
+
     # Convert to minutes:seconds format
     minutes = int(remaining_time // 60)
     seconds = int(remaining_time % 60)
     timer_text = f"{minutes:02d}:{seconds:02d}"
-    
-    # Draw timer at top of screen
-    text_surf = font_score.render(timer_text, True, bright_orange)
-    
-    bg_width = max(150, text_surf.get_width() + 20)
+
+    # Draw timer at top of screen (the text only changes once a second)
+    if timer_text not in timer_text_cache:
+        timer_text_cache.clear()
+        timer_text_cache[timer_text] = font_score.render(timer_text, True, bright_orange)
+    text_surf = timer_text_cache[timer_text]
+
     bg_rect = pygame.Rect(screen_width // 2 - 75, 35, 150, 50)
-    
+
     pygame.draw.rect(screen, navy_blue, bg_rect, border_radius=8)
     pygame.draw.rect(screen, white, bg_rect, 2, border_radius=8)
-    
+
     text_x = screen_width // 2 - text_surf.get_width() // 2
     text_y = 35 + (50 - text_surf.get_height()) // 2
     screen.blit(text_surf, (text_x, text_y))
-    
+
     if remaining_time < 10:
-        pulse = abs(pygame.time.get_ticks() % 1000 - 500) / 500
+        pulse = abs(game_ticks() % 1000 - 500) / 500
         bg_rect.inflate_ip(int(10 * pulse), int(10 * pulse))
         pygame.draw.rect(screen, (200, 0, 0), bg_rect, border_radius=8)
-    
-    # Check if time has run out
-    if remaining_time <= 0:
-        return True # Time's up
-    return False
 
 def draw_level_select_menu():
-    # Darken the background
-    overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180)) # Darker black for menu
-    screen.blit(overlay, (0, 0))
-
-    draw_text('SELECT LEVEL', font, white, (screen_width // 2) - 220, screen_height // 2 - 200)
+    screen.blit(level_select_grid.overlay, (0, 0))
+    screen.blit(level_select_grid.title_surf, level_select_grid.title_pos)
 
     action = None
 
@@ -1607,124 +1646,368 @@ def draw_level_select_menu():
     back_button.rect.x = original_back_x
     back_button.rect.y = original_back_y
 
-    # Level selection buttons in a 4x4 grid layout
-    columns_per_row = 4 # Defines how many columns will be in each row
-    button_width = 100
-    button_height = 80 # Made buttons slightly taller for better appearance
-    gap = 20 # Gap between buttons
+    # The grid keeps its buttons between frames, so only hover/click is checked here
+    selected = level_select_grid.draw()
+    if selected is not None:
+        action = selected # Return the selected level number
 
-    # Calculate number of rows needed for the levels
-    num_rows = (max_levels + columns_per_row - 1) // columns_per_row # Ceiling division
+    return action
 
-    # Calculate total grid dimensions for centering
-    grid_width = columns_per_row * button_width + (columns_per_row - 1) * gap
-    grid_height = num_rows * button_height + (num_rows - 1) * gap
+class EventDispatcher():
+    """Routes the events from the single per-frame pump to handlers.
 
-    # Calculate starting position to center the grid on the screen
-    start_x = (screen_width - grid_width) // 2
-    # Adjust Y position to be visually appealing relative to the "SELECT LEVEL" title
-    start_y = screen_height // 2 - grid_height // 2 + 50 
+    Handlers are registered per game state and indexed by event type, so
+    each event costs a lookup in the active state's table plus one for the
+    handlers that run in every state.
+    """
+    def __init__(self):
+        self.handlers = {} # state name -> {event type -> [handlers]}
 
-    level_buttons = []
-    for i in range(1, max_levels + 1):
-        row = (i - 1) // columns_per_row
-        col = (i - 1) % columns_per_row
+    def register(self, state_name, event_type, handler):
+        self.handlers.setdefault(state_name, {}).setdefault(event_type, []).append(handler)
 
-        btn_x = start_x + col * (button_width + gap)
-        btn_y = start_y + row * (button_height + gap)
+    def dispatch(self, state_name, events):
+        common = self.handlers.get(ANY_STATE, {})
+        active = self.handlers.get(state_name, {})
+        for event in events:
+            for handler in common.get(event.type, ()):
+                handler(event)
+            for handler in active.get(event.type, ()):
+                handler(event)
 
-        # Create a temporary Surface for each button to draw custom graphics
-        temp_button_img = pygame.Surface((button_width, button_height), pygame.SRCALPHA)
-        
-        # Draw button background (a semi-transparent blue with rounded corners)
-        button_color = (60, 120, 180, 200) # RGBA (blue with some transparency)
-        pygame.draw.rect(temp_button_img, button_color, (0, 0, button_width, button_height), border_radius=10) 
-        # Draw a white border around the button
-        pygame.draw.rect(temp_button_img, white, (0, 0, button_width, button_height), 3, border_radius=10) 
+ANY_STATE = 'any'
+mouse_clicks = [] # Left clicks from this frame's pump, read by Button.draw
 
-        # Render the level number text using 'font_menu'
-        level_text_surf = font_menu.render(str(i), True, (255, 255, 255)) # White text
-        # Center the text on the button image
-        text_rect = level_text_surf.get_rect(center=(button_width // 2, button_height // 2))
-        temp_button_img.blit(level_text_surf, text_rect)
-        
-        # Create the Button instance with the custom-rendered image
-        btn = Button(btn_x, btn_y, temp_button_img)
-        level_buttons.append((btn, i))
+class GameState():
+    """One screen of the game.
+
+    Only the active state is updated and rendered, so screens that are not
+    visible cost nothing. Surfaces a state reuses every frame are built in
+    load_resources() the first time the state is entered.
+    """
+    name = ''
+
+    def __init__(self):
+        self.loaded = False
+
+    def load_resources(self):
+        pass
 
-    for btn, lvl in level_buttons:
-        if btn.draw():
-            action = lvl # Return the selected level number
+    def enter(self, previous):
+        pass
+
+    def leave(self, next_state):
+        pass
 
+    def update(self):
+        pass
+
+    def render(self):
+        pass
+
+class StateMachine():
+    def __init__(self):
+        self.states = {}
+        self.current = None
+        self.pending = None
+        self.timings = {} # state name -> [updates, update seconds, renders, render seconds, worst frame seconds]
+
+    def add(self, state):
+        self.states[state.name] = state
+
+    def change(self, name):
+        # Applied between update and render, or at the start of the next frame
+        self.pending = name
+
+    def apply_pending(self):
+        while self.pending is not None:
+            next_state = self.states[self.pending]
+            self.pending = None
+            previous = self.current
+            if previous is not None:
+                previous.leave(next_state.name)
+            if not next_state.loaded:
+                next_state.load_resources()
+                next_state.loaded = True
+            self.current = next_state
+            next_state.enter(previous.name if previous is not None else None)
+
+    def run_frame(self):
+        self.apply_pending()
+        state = self.current
+        start = time.perf_counter()
+        state.update()
+        update_time = time.perf_counter() - start
+        self.record(state.name, update_time, None)
+
+        self.apply_pending()
+        state = self.current
+        start = time.perf_counter()
+        state.render()
+        render_time = time.perf_counter() - start
+        self.record(state.name, None, render_time)
+
+    def record(self, name, update_time, render_time):
+        timing = self.timings.setdefault(name, [0, 0.0, 0, 0.0, 0.0])
+        if update_time is not None:
+            timing[0] += 1
+            timing[1] += update_time
+            timing[4] = max(timing[4], update_time)
+        if render_time is not None:
+            timing[2] += 1
+            timing[3] += render_time
+            timing[4] = max(timing[4], render_time)
+
+    def print_profile(self):
+        print("State          frames   update ms   render ms   worst ms")
+        for name, (updates, update_total, renders, render_total, worst) in self.timings.items():
+            avg_update = update_total / updates * 1000 if updates else 0
+            avg_render = render_total / renders * 1000 if renders else 0
+            print(f"{name:<14} {max(updates, renders):>6} {avg_update:>11.3f} {avg_render:>11.3f} {worst * 1000:>10.3f}")
+
+def quit_game():
+    global run
+    run = False
+
+def draw_hud_buttons():
+    """Draw the settings and pause buttons, returning 'settings', 'pause' or None"""
+    action = None
+    if settings_button.draw():
+        action = 'settings'
+    # Add hover message for settings button
+    if settings_button.check_hover():
+        draw_hover_text("Settings", settings_button.rect.centerx, settings_button.rect.centery)
+
+    if pause_button.draw():
+        action = 'pause'
+    # Add hover message for pause button
+    if pause_button.check_hover():
+        draw_hover_text("Pause/Resume", pause_button.rect.centerx, pause_button.rect.centery)
     return action
 
-run = True
-while run:
-    clock.tick(fps)
+score_text_cache = {} # (score, colour) -> (text, outline), for the last one drawn
+def draw_score():
+    coin_time = game_ticks() - last_coin_time
+    flash_duration = 1000
+
+    if coin_time < flash_duration and governor.enabled('score fade'):
+        fade_progress = coin_time / flash_duration
+        r = int(255 + (0 - 255) * fade_progress)
+        g = int(215 + (0 - 215) * fade_progress)
+        b = int(0 + (128 - 0) * fade_progress)
+        score_color = (r, g, b)
+    elif coin_time < flash_duration:
+        score_color = (255, 215, 0) # Flash without the fade, so the text is only rendered once
+    else:
+        score_color = navy_blue
+
+    key = (score, score_color)
+    if key not in score_text_cache:
+        score_text_cache.clear()
+        score_text_cache[key] = (font_score.render('X ' + str(score), True, score_color),
+                                 font_score.render('X ' + str(score), True, white))
+    score_text, outline_text = score_text_cache[key]
+    screen.blit(outline_text, (tile_size - 12, 12))
+    screen.blit(score_text, (tile_size - 10, 10))
+
+def draw_play_scene(show_buttons, show_stats):
+    """Draw the level with its sprites and player, returning any HUD button action"""
     screen.blit(bg_img, (0, 0))
     screen.blit(sun_img, (100, 100))
 
-    # Handle name input screen - THIS MUST BE INSIDE THE while run: LOOP
-    if name_input_screen:
-        start_button_rect = draw_name_input_screen()
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if name_input_rect.collidepoint(event.pos):
-                    name_input_active = True
-                else:
-                    name_input_active = False
-                    
-                if start_button_rect.collidepoint(event.pos) and name_input_text.strip():
-                    player_name = name_input_text.strip()
-                    name_input_screen = False
-                    # RESET LEVEL TO 1 FOR NEW PLAYER
-                    level = 1
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                    main_menu = False  # Exit main menu and start the game
-                    print(f"Player name set to: {player_name}")
-            
-            if event.type == pygame.KEYDOWN and name_input_active:
-                if event.key == pygame.K_RETURN:
-                   if name_input_text.strip():
-                      player_name = name_input_text.strip()
-                      name_input_screen = False
-                      # RESET LEVEL TO 1 FOR NEW PLAYER
-                      level = 1
-                      world = reset_level(level)
-                      game_over = 0
-                      score = 0
-                      main_menu = False  # Exit main menu and start the game
-                elif event.key == pygame.K_BACKSPACE:
-                    name_input_text = name_input_text[:-1]
-                elif event.key == pygame.K_ESCAPE:
-                    name_input_active = False
-                else:
-                    if len(name_input_text) < 15:
-                        name_input_text += event.unicode
-        
-        pygame.display.update()
-        continue  # This continue is now properly inside the while loop
-    
-    # ... rest of your game code (main_menu, settings_menu, level_select_menu, etc.) ...
-
-    if main_menu or settings_menu or level_select_menu:
-        current_time = pygame.time.get_ticks()
-
-    if main_menu:
-        current_time = pygame.time.get_ticks()
-  
-        # Initialize animation timer on the first frame main_menu is active
-        if title_animation_start_time == 0: 
-            title_animation_start_time = current_time
-            show_main_menu_buttons = False # Hide buttons initially
-        
-        elapsed_time = current_time - title_animation_start_time
+    action = None
+    if show_buttons:
+        action = draw_hud_buttons()
+
+    world.draw()
+
+    if not game_started:
+        draw_countdown_timer()
+    elif show_stats and game_over == 0:
+        draw_level_timer()
+        draw_score()
+        #draw the level label
+        draw_level_label(level, font_menu, white, (50, 50, 150), screen_width -120, 5)
+
+    blob_group.draw(screen)
+    platform_group.draw(screen)
+    lava_group.draw(screen)
+    coin_group.draw(screen)
+    exit_group.draw(screen)
+
+    for exit in exit_group:
+        exit.draw_instruction(screen)
+
+    player.draw()
+    return action
+
+def draw_alerts():
+    #draw my alerts above the player character
+    now = game_ticks()
+    for alert in alerts[:]:
+        elapsed = (now - alert['time']) / 1000
+        if elapsed > alert.get('duration', ALERT_DURATION):
+            alerts.remove(alert)
+            continue
+
+        alpha = max(0, 255 - int((elapsed / alert.get('duration', ALERT_DURATION)) * 255))
+        shake = alert.get('shake_offset', 0) if governor.enabled('alert shake') else 0
+        offset_x = rng.randint(-shake, shake) if shake else 0
+        offset_y = rng.randint(-shake, shake) if shake else 0
+
+        alert_font = load_font('Arial', alert.get('size', 20))
+        text_color = alert.get('color', (255, 255, 255))
+        text_surf = alert_font.render(alert['text'], True, text_color)
+        text_surf.set_alpha(alpha)
+
+        #create background box with same alpha
+        bg_surf = pygame.Surface((text_surf.get_width() + 20, text_surf.get_height() + 10), pygame.SRCALPHA)
+        bg_color = (50, 50, 50, alpha) if not alert.get('is_coin', False) else (100, 50, 0, alpha)
+        bg_surf.fill(bg_color)
+        pygame.draw.rect(bg_surf, (text_color[0], text_color[1], text_color[2], alpha), (0, 0, bg_surf.get_width(), bg_surf.get_height()), 2)
+
+        #position of alert
+        x = player.rect.centerx - bg_surf.get_width() // 2 + offset_x
+        y = player.rect.top - 40 + offset_y #pixels above the head of character
+
+        screen.blit(bg_surf, (x, y))
+        screen.blit(text_surf, (x + 10, y + 5))
+
+# Navigation cues, shown when the way to the exit changes
+NAV_CUE_TEXT = {
+    'left': "Exit: go left",
+    'right': "Exit: go right",
+    'jump': "Exit: jump up",
+    'jump left': "Exit: jump left",
+    'jump right': "Exit: jump right",
+}
+last_nav_cue = None
+def show_navigation_cue():
+    global last_nav_cue
+    # Only while standing somewhere, the cue for mid-air would flicker
+    if player.in_air:
+        return
+    flow_field = world.flow_field
+    cue = flow_field.cue(flow_field.cell_at(player.rect.centerx, player.rect.bottom))
+    if cue != last_nav_cue and cue in NAV_CUE_TEXT:
+        add_alert(NAV_CUE_TEXT[cue])
+    last_nav_cue = cue
+
+def update_navigation():
+    # Scheduled job: follow the platforms in the flow field, then show the cue
+    if state_machine.current.name != 'playing' or not game_started or game_over != 0:
+        return
+    world.flow_field.move_platforms([platform.rect for platform in platform_group])
+    show_navigation_cue()
+
+scheduler.add('navigation', update_navigation, priority=0, max_staleness=6, cost_ms=0.1)
+
+def update_proximity_warnings():
+    # Scheduled job: sound a warning for blobs close by and platforms
+    # right overhead, but only ones in view (not behind a wall)
+    global last_blob_warning_time, last_platform_warning_time
+    if state_machine.current.name != 'playing' or not game_started or game_over != 0 or not sfx_on:
+        return
+    now = game_ticks()
+    eye = player.rect.center
+    if now - last_blob_warning_time > WARNING_COOLDOWN:
+        near = [blob.rect for blob in blob_group
+                if math.dist(blob.rect.center, eye) < BLOB_PROXIMITY_THRESHOLD]
+        seen = nearest_in_view(near, eye)
+        if seen is not None:
+            sfx.play(blob_warning_cues.tone(math.dist(seen.center, eye)), seen)
+            last_blob_warning_time = now
+    if now - last_platform_warning_time > WARNING_COOLDOWN:
+        near = [platform.rect for platform in platform_group
+                if platform.rect.bottom <= player.rect.top
+                and math.dist(platform.rect.center, eye) < PLATFORM_PROXIMITY_THRESHOLD]
+        seen = nearest_in_view(near, eye)
+        if seen is not None:
+            sfx.play(platform_warning_cues.tone(math.dist(seen.center, eye)), seen)
+            last_platform_warning_time = now
+
+def nearest_in_view(rects, eye):
+    # The closest of rects with nothing solid between it and eye, or None
+    in_view = [rect for rect, clear in zip(rects, world.sight.clear_from([rect.center for rect in rects], eye)) if clear]
+    if not in_view:
+        return None
+    return min(in_view, key=lambda rect: math.dist(rect.center, eye))
+
+scheduler.add('proximity warnings', update_proximity_warnings, priority=0, max_staleness=10, cost_ms=0.05)
+
+def update_blob_sight(blobs):
+    # Scheduled for the blobs picked this frame, as one batched query
+    target = world.sight.cell_at(*player.rect.center)
+    cells = [world.sight.cell_at(*blob.rect.center) for blob in blobs]
+    for blob, sees in zip(blobs, world.sight.visible_from(cells, target, BLOB_SIGHT_RANGE)):
+        blob.sees_player = sees
+        blob.target_x = player.rect.centerx
+
+def schedule_blob_sight():
+    # One job per blob, so with lots of them each just looks less often
+    scheduler.remove_batch(update_blob_sight)
+    if args.sensory_enemies:
+        for index, blob in enumerate(blob_group):
+            scheduler.add(('blob sight', index), update_blob_sight, priority=1, max_staleness=4,
+                          cost_ms=0.01, item=blob)
+
+def start_selected_level(selected_level):
+    global level, world, game_over, score
+    level = selected_level # Set the chosen level
+
+    #initialize the world for the selected level
+    world = reset_level(level) # Call reset_level with the chosen level number
+    player.reset(*PLAYER_START) # Reset player for the new game
+    game_over = 0 # Ensure game is not in game_over state
+    score = 0 # Reset score
+    state_machine.change('playing')
+
+def restart_current_level():
+    global world, game_over, score
+    world = reset_level(level) # Reset using the current 'level' variable
+    game_over = 0
+    score = 0  # Reset score for the current level
+    state_machine.change('playing')
+
+def complete_level():
+    global level, world, game_over
+    # Save high score when level is completed
+    save_high_score(player_name, score, level)
+    run_stats['levels_completed'] += 1
+
+    #reset game and go to next level
+    level += 1
+    if level <= max_levels:
+        world = reset_level(level)
+        game_over = 0
+    else:
+        state_machine.change('victory')
+
+def return_to_title():
+    global level, world, game_over, score
+    level = 0 # Reset level to 0 (the level select screen picks the next one)
+    world = World([]) # Reinitialize world for main menu state (e.g., empty world)
+    game_over = 0
+    score = 0
+    player.reset(*PLAYER_START)
+    state_machine.change('title')
+
+class TitleState(GameState):
+    name = 'title'
+
+    def load_resources(self):
+        # Render the main game title ("GAME PROJECT") and the subtitle/year ("ANNE 2025") once
+        self.title_surf = font.render('A 2D GAME PROJECT', True, blue)
+        self.title_rect = self.title_surf.get_rect(center=(screen_width // 2, screen_height // 2 - 150))
+        self.year_surf = font_score.render('ANNE 2025', True, blue) # Using font_score for smaller text
+        self.year_rect = self.year_surf.get_rect(center=(screen_width // 2, screen_height // 2 - 80)) # Positioned below main title
+
+    def enter(self, previous):
+        self.start_time = game_ticks()
+
+    def render(self):
+        global name_input_text, name_input_active
+        elapsed_time = game_ticks() - self.start_time
 
         # Draw the main menu background
         screen.blit(bg_img, (0, 0))
@@ -1735,334 +2018,432 @@ while run:
         if elapsed_time < title_animation_duration:
             # Calculate alpha for a fade-in effect
             alpha = min(255, int((elapsed_time / title_animation_duration) * 255))
-        
-        # Render and display the main game title ("GAME PROJECT")
-        game_title_surf = font.render('A 2D GAME PROJECT', True, blue)
-        game_title_surf.set_alpha(alpha) # Apply transparency
-        game_title_rect = game_title_surf.get_rect(center=(screen_width // 2, screen_height // 2 - 150))
-        screen.blit(game_title_surf, game_title_rect)
-
-        # Render and display the subtitle/year ("ANNE 2025")
-        game_year_surf = font_score.render('ANNE 2025', True, blue) # Using font_score for smaller text
-        game_year_surf.set_alpha(alpha)
-        game_year_rect = game_year_surf.get_rect(center=(screen_width // 2, screen_height // 2 - 80)) # Positioned below main title
-        screen.blit(game_year_surf, game_year_rect)
+        self.title_surf.set_alpha(alpha) # Apply transparency
+        self.year_surf.set_alpha(alpha)
+        screen.blit(self.title_surf, self.title_rect)
+        screen.blit(self.year_surf, self.year_rect)
 
         # Show start and exit buttons only after the animation duration has passed
         if elapsed_time >= title_animation_duration:
-            show_main_menu_buttons = True
-        
-        if show_main_menu_buttons:
-           if exit_button.draw():
-              run = False
-           if start_button.draw():
-              name_input_screen = True  # Go to name input first
-              main_menu = False
-              # Reset name input fields
-              name_input_text = ""
-              name_input_active = False
-               
-
-    elif settings_menu == True:
-        action = draw_settings_menu()
-        if action == 'back_to_game':
-            settings_menu = False
+            finish_loading() # Usually long done by now, else wait for it here
+            if exit_button.draw():
+                quit_game()
+            if start_button.draw():
+                # Reset name input fields and go to name input first
+                name_input_text = ""
+                name_input_active = False
+                state_machine.change('name_input')
+
+class NameInputState(GameState):
+    name = 'name_input'
+
+    def load_resources(self):
+        self.title_surf = font.render('ENTER YOUR NAME', True, white)
+        self.input_font = load_font('Arial', 40)
+        self.start_text = font_menu.render("START GAME", True, white)
+        instruction_font = load_font('Arial', 20)
+        self.instructions = instruction_font.render("Click on the box to enter your name, then press START", True, (180, 180, 180))
+        self.text_surface = None
+        self.rendered_text = None
+
+    def render(self):
+        # Dark background (covers the whole screen, so no sky or sun underneath)
+        screen.fill((30, 30, 50))
+
+        # Title
+        screen.blit(self.title_surf, ((screen_width // 2) - 200, screen_height // 2 - 150))
+
+        # Input box
+        pygame.draw.rect(screen, (50, 50, 80), name_input_rect, border_radius=10)
+        pygame.draw.rect(screen, (100, 100, 200) if name_input_active else (70, 70, 120), name_input_rect, 3, border_radius=10)
+
+        # Input text, re-rendered only when it changes
+        if name_input_text != self.rendered_text:
+            self.text_surface = self.input_font.render(name_input_text, True, white)
+            self.rendered_text = name_input_text
+        screen.blit(self.text_surface, (name_input_rect.x + 10, name_input_rect.y + 10))
+
+        # Cursor blink
+        if name_input_active and game_ticks() % 1000 < 500:
+            cursor_x = name_input_rect.x + 10 + self.text_surface.get_width() + 2
+            pygame.draw.line(screen, white, (cursor_x, name_input_rect.y + 10),
+                            (cursor_x, name_input_rect.y + name_input_rect.height - 10), 2)
+
+        # Start button
+        pygame.draw.rect(screen, (0, 100, 200), start_button_rect, border_radius=10)
+        pygame.draw.rect(screen, white, start_button_rect, 2, border_radius=10)
+        screen.blit(self.start_text, (start_button_rect.centerx - self.start_text.get_width() // 2,
+                               start_button_rect.centery - self.start_text.get_height() // 2))
+
+        # Instructions
+        screen.blit(self.instructions, (screen_width // 2 - self.instructions.get_width() // 2, screen_height // 2 + 120))
+
+class LevelSelectState(GameState):
+    name = 'level_select'
+
+    def render(self):
+        global level, score, game_over
+        screen.blit(bg_img, (0, 0))
+        screen.blit(sun_img, (100, 100))
 
-    elif level_select_menu == True:
         selected_level = draw_level_select_menu()
         if selected_level == 'back_to_main':
-            level_select_menu = False
-            main_menu = True # Go back to the main menu
-            title_animation_start_time = 0 # NEW: Reset animation timer
-            show_main_menu_buttons = False
             #RESET LEVEL WHEN RETURNING TO MAIN MENU
             level = 1
             score = 0
             game_over = 0
+            state_machine.change('title') # Go back to the main menu
         elif selected_level is not None: # A level was selected
-            level = selected_level # Set the chosen level
-            
-            #initialize the world for the selected level
-            world = reset_level(level) # Call reset_level with the chosen level number
-            player.reset(100, screen_height - 130) # Reset player for the new game
-            game_over = 0 # Ensure game is not in game_over state
-            score = 0 # Reset score
-            level_select_menu = False # Exit level selection menu
-            main_menu = False # Start the game (exit main menu state)
-            paused = False # Ensure game is not paused when starting
-            
-        # Handle volume slider events within the settings menu loop
-        for event in pygame.event.get(): # Process settings menu specific events
-            if event.type == pygame.QUIT:
-                run = False
-            if volume_slider.handle_event(event):
-                pygame.mixer.music.set_volume(volume_slider.value)
-            
-            # Handle level selection key presses
-            if event.type == pygame.K_ESCAPE: # Allow ESC to exit settings
-                settings_menu = False
-            if event.type == pygame.KEYDOWN:
-                # This section is fine, as it's within the settings_menu state
-                if event.key == pygame.K_1:
-                    level = 1
-                    settings_menu = False # Exit settings after selecting level
-                    main_menu = False # Go to game directly, not back to main menu
-                    world_data = [] # Clear old world data
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                elif event.key == pygame.K_2 and max_levels >= 2:
-                    level = 2
-                    settings_menu = False
-                    main_menu = False
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                elif event.key == pygame.K_3 and max_levels >= 3:
-                    level = 3
-                    settings_menu = False
-                    main_menu = False
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                elif event.key == pygame.K_4 and max_levels >= 4:
-                    level = 4
-                    settings_menu = False
-                    main_menu = False
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                elif event.key == pygame.K_5 and max_levels >= 5:
-                    level = 5
-                    settings_menu = False
-                    main_menu = False
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                elif event.key == pygame.K_6 and max_levels >= 6:
-                    level = 6
-                    settings_menu = False
-                    main_menu = False
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-                elif event.key == pygame.K_7 and max_levels >= 7:
-                    level = 7
-                    settings_menu = False
-                    main_menu = False
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-        pass
-    else:
-        # Game is running or paused (including when exiting settings to game)
-        if settings_button.draw():
-            settings_menu = True
-        # Add hover message for settings button
-        if settings_button.check_hover():
-            draw_hover_text("Settings", settings_button.rect.centerx, settings_button.rect.centery)
-
-        if pause_button.draw():
-            paused = not paused # This line toggles the paused state
-        # Add hover message for pause button
-        if pause_button.check_hover():
-            draw_hover_text("Pause/Resume", pause_button.rect.centerx, pause_button.rect.centery)
-
-        world.draw() # This line should be at the same indentation level as the button drawing
-        
+            start_selected_level(selected_level)
+
+class PlayingState(GameState):
+    name = 'playing'
+
+    def __init__(self):
+        GameState.__init__(self)
+        self.left_at = None
+
+    def enter(self, previous):
+        global level_start_time, controls_timer, last_player_action_time
+        # Time spent paused or in settings doesn't count against the level timer
+        if previous in ('paused', 'settings') and self.left_at is not None:
+            paused_for = game_ticks() - self.left_at
+            level_start_time += paused_for
+            controls_timer += paused_for
+            last_player_action_time += paused_for
+        self.left_at = None
+
+    def leave(self, next_state):
+        if next_state in ('paused', 'settings'):
+            self.left_at = game_ticks()
+
+    def update(self):
+        global game_started, game_over, score, last_coin_time
+        global show_controls, controls_timer, last_player_action_time
+
+        world.sight.next_frame()
         if not game_started:
-            game_started = draw_countdown_timer()
-            if game_started:  # Just finished countdown
+            if countdown_remaining() <= 0:  # Just finished countdown
+                game_started = True
                 show_controls = True
-                controls_timer = pygame.time.get_ticks()
-                last_player_action_time = pygame.time.get_ticks()
-  
-        if paused == False and game_over == 0 and game_started:
+                controls_timer = game_ticks()
+                last_player_action_time = game_ticks()
+
+        elif game_over == 0:
             # Check level timer
-            time_up = draw_level_timer()
-            if time_up:
+            if level_time_remaining() <= 0:
                 game_over = -1
                 if sfx_on:
-                    game_over_fx.play()
-                    draw_text('TIME\'S UP! TRY AGAIN', font, gray, (screen_width //2) - 150, screen_height // 2 - 20)
-            blob_group.update()
+                    sfx.play(game_over_fx)
+            if args.sensory_enemies:
+                blob_group.update(world.sight)
+            else:
+                blob_group.update()
             platform_group.update()
             #update score
             #check if a coin has been collected
             if pygame.sprite.spritecollide(player, coin_group, True):
-                
                 score += 1
+                run_stats['coins'] += 1
                 if sfx_on: # Only play coin sound if SFX is on
-                        coin_fx.play()
+                    sfx.play(coin_fx)
                 add_alert(f"+1 Coin! (Total: {score})", is_coin=True)
-                
-                last_coin_time = pygame.time.get_ticks()
-    
-            coin_time = pygame.time.get_ticks() - last_coin_time if 'last_coin_time' in globals() else 10000
-            flash_duration = 1000
-   
-            if coin_time < flash_duration:
-                fade_progress = coin_time / flash_duration
-                r = int(255 + (0 - 255) * fade_progress)
-                g = int(215 + (0 - 215) * fade_progress)
-                b = int(0 + (128 - 0) * fade_progress)
-                score_color = (r, g, b)
-            else:
-                score_color = navy_blue
-    
-            score_text = font_score.render('X ' + str(score), True, score_color)
-            outline_text = font_score.render('X ' + str(score), True, white)
-            screen.blit(outline_text, (tile_size - 12, 12))
-            screen.blit(score_text, (tile_size - 10, 10))
-   
-            #draw_text('X ' + str(score), font_score, black, tile_size - 10, 10)
-            #draw the level label
-            draw_level_label(level, font_menu, white, (50, 50, 150), screen_width -120, 5)
-        
-        blob_group.draw(screen)
-        platform_group.draw(screen)
-        lava_group.draw(screen)
-        coin_group.draw(screen)
-        exit_group.draw(screen)
+                last_coin_time = game_ticks()
 
-		# In your main game loop, after drawing other elements:
         for exit in exit_group:
-            exit.draw_instruction(screen)
             exit.update()  # For the pulsing effect
 
-        if game_over == 0 and not paused: # Only update player if not game over or paused
+        if game_over == 0:
             game_over = player.update(game_over)
-        
-        elif paused:
-            action = draw_pause_menu()
-            # Handle actions from the pause menu
-            if action == 'resume_game': # New condition for the back button
-                paused = False # Unpause the game
-            if action == 'restart_level':
-                # Restart the current level
-                world_data = [] # Clear old world data
-                world = reset_level(level) # Reset using the current 'level' variable
-                game_over = 0
-                score = 0
-                paused = False
-            elif action == 'main_menu':
-                # Return to the main menu
-                main_menu = True
-                paused = False
-                level = 0 # Reset level to 0 (or a value that main menu's start button understands as new game)
-                world_data = []
-                world = World(world_data) # Reinitialize world for main menu state (e.g., empty world)
-                game_over = 0
-                score = 0
-                player.reset(100, screen_height - 130)
-                title_animation_start_time = 0 # NEW: Reset animation timer
-                show_main_menu_buttons = False
-        
+
+        if game_over == -1:
+            run_stats['deaths'] += 1
+            state_machine.change('game_over')
+        elif game_over == 1:
+            complete_level()
+
+    def render(self):
+        action = draw_play_scene(show_buttons=True, show_stats=True)
+        if action == 'settings':
+            state_machine.change('settings')
+        elif action == 'pause':
+            state_machine.change('paused')
+
         # Show controls hint if needed
-        if show_controls and game_started and not paused and game_over == 0:
+        if show_controls and game_started and game_over == 0:
             draw_controls_hint()
-        
-        #if player has died
-        if game_over == -1:
-            # NEW: Draw a semi-transparent black overlay
-            overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 150)) 
-            screen.blit(overlay, (0, 0))
-            # Add "Time's Up!" message if that was the cause
-            current_time = pygame.time.get_ticks()
-            elapsed = (current_time - level_start_time - (countdown_time * 1000)) / 1000
-            if elapsed >= level_duration:
-                draw_text('TIME\'S UP!, TRY AGAIN', font, white, (screen_width // 2) - 270, screen_height // 4)
-    
-            # Calculate the centered position for the restart button on the overlay
-            restart_button.rect.x = (screen_width - restart_button.image.get_width()) // 2
-            restart_button.rect.y = (screen_height - restart_button.image.get_height()) // 2 # Vertically centered
-            
-            if restart_button.draw():
-                # FIX: Restart to the current level
-                world_data = [] # Clear any existing world data
-                world = reset_level(level) # Call reset_level with the current 'level'
-                game_over = 0 # Reset game_over state
-                score = 0  # Reset score for the current level
-                
-        #if player has completed the level
-        if game_over == 1:
-           # Save high score when level is completed
-            save_high_score(player_name, score, level)
-            
-            #reset game and go to next level
-            level += 1
-            if level <= max_levels:
-                #reset level
-                world_data = []
-                world = reset_level(level)
-                game_over = 0
-                game_started = False
-            else:
-                screen.fill(black) # NEW: Black out the entire screen
-                
-                # Render and center "YOU WIN!" text on the black screen
-                you_win_text_surf = font.render('YOU WIN!', True, blue)
-                you_win_text_rect = you_win_text_surf.get_rect(center=(screen_width // 2, screen_height // 2 - 50)) # Slightly above vertical center
-                screen.blit(you_win_text_surf, you_win_text_rect)
-                
-                # Calculate centered position for the restart button, below the text
-                restart_button.rect.x = (screen_width - restart_button.image.get_width()) // 2
-                restart_button.rect.y = screen_height // 2 + 50 # Placed 50 pixels below the center
-                
-                if restart_button.draw():
-                    level = 1 # Reset to level 1 to start over
-                    #reset level
-                    world_data = []
-                    world = reset_level(level)
-                    game_over = 0
-                    score = 0
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run = False
-        # Only toggle pause if not in settings menu
-        if event.type == pygame.KEYDOWN and not settings_menu: # Ensure 'P' doesn't toggle pause if settings is open
-            if event.key == pygame.K_p: # Toggle pause with 'P' key
-                paused = not paused
-   
-    #draw my alerts above the player character
-    now = pygame.time.get_ticks()
-    for alert in alerts[:]:
-        elapsed = (now - alert['time']) / 1000
-        if elapsed > alert.get('duration', ALERT_DURATION):
-            alerts.remove(alert)
-            continue
-        
-        alpha = max(0, 255 - int((elapsed / alert.get('duration', ALERT_DURATION)) * 255))
-        shake = alert.get('shake_offset', 0)
-        offset_x = random.randint(-shake, shake)
-        offset_y = random.randint(-shake, shake)
+        draw_alerts()
+
+class PausedState(GameState):
+    name = 'paused'
+
+    def render(self):
+        action = draw_play_scene(show_buttons=True, show_stats=False)
+        if action == 'settings':
+            state_machine.change('settings')
+        elif action == 'pause':
+            state_machine.change('playing')
+
+        action = draw_pause_menu()
+        # Handle actions from the pause menu
+        if action == 'restart_level':
+            restart_current_level()
+        elif action == 'main_menu':
+            return_to_title()
+        draw_alerts()
+
+class SettingsState(GameState):
+    name = 'settings'
+
+    def enter(self, previous):
+        # Go back to whichever screen opened the settings
+        if previous != 'settings':
+            self.return_to = previous
+
+    def render(self):
+        screen.blit(bg_img, (0, 0))
+        screen.blit(sun_img, (100, 100))
+        action = draw_settings_menu()
+        if action == 'back_to_game':
+            state_machine.change(self.return_to)
 
-        alert_font = pygame.font.SysFont('Arial', alert.get('size', 20))
-        text_color = alert.get('color', (255, 255, 255))
-        text_surf = alert_font.render(alert['text'], True, text_color)
-        text_surf.set_alpha(alpha)
-        
-        #create background box with same alpha
-        bg_surf = pygame.Surface((text_surf.get_width() + 20, text_surf.get_height() + 10), pygame.SRCALPHA)
-        bg_color = (50, 50, 50, alpha) if not alert.get('is_coin', False) else (100, 50, 0, alpha)
-        bg_surf.fill(bg_color)
-        pygame.draw.rect(bg_surf, (text_color[0], text_color[1], text_color[2], alpha), (0, 0, bg_surf.get_width(), bg_surf.get_height()), 2)
+class GameOverState(GameState):
+    name = 'game_over'
 
-        #position of alert
-        x = player.rect.centerx - bg_surf.get_width() // 2 + offset_x
-        y = player.rect.top - 40 + offset_y #pixels above the head of character 
-        
-        screen.blit(bg_surf, (x, y))
-        screen.blit(text_surf, (x + 10, y + 5))
+    def load_resources(self):
+        self.game_over_surf = font.render('GAME OVER!', True, blue)
+        self.times_up_surf = font.render('TIME\'S UP!, TRY AGAIN', True, white)
 
-    pygame.display.update()
+    def update(self):
+        # Ghost floats up from where the player died
+        player.update(game_over)
+
+    def render(self):
+        draw_play_scene(show_buttons=False, show_stats=False)
+
+        # Draw a semi-transparent black overlay
+        screen.blit(get_overlay(150), (0, 0))
+        # Add "Time's Up!" message if that was the cause
+        if level_time_remaining() <= 0:
+            screen.blit(self.times_up_surf, ((screen_width // 2) - 270, screen_height // 4))
+        screen.blit(self.game_over_surf, ((screen_width // 2) - 200, screen_height // 2 - 150))
+
+        # Calculate the centered position for the restart button on the overlay
+        restart_button.rect.x = (screen_width - restart_button.image.get_width()) // 2
+        restart_button.rect.y = (screen_height - restart_button.image.get_height()) // 2 # Vertically centered
+
+        if restart_button.draw():
+            restart_current_level() # Restart to the current level
+        draw_alerts()
+
+class VictoryState(GameState):
+    name = 'victory'
+
+    def load_resources(self):
+        # Render and center "YOU WIN!" text on the black screen
+        self.you_win_text_surf = font.render('YOU WIN!', True, blue)
+        self.you_win_text_rect = self.you_win_text_surf.get_rect(center=(screen_width // 2, screen_height // 2 - 50)) # Slightly above vertical center
+
+    def render(self):
+        global level
+        screen.fill(black) # Black out the entire screen
+        screen.blit(self.you_win_text_surf, self.you_win_text_rect)
+
+        # Calculate centered position for the restart button, below the text
+        restart_button.rect.x = (screen_width - restart_button.image.get_width()) // 2
+        restart_button.rect.y = screen_height // 2 + 50 # Placed 50 pixels below the center
+
+        if restart_button.draw():
+            level = 1 # Reset to level 1 to start over
+            restart_current_level()
+
+def submit_player_name():
+    global player_name, level, game_over, score
+    if not name_input_text.strip():
+        return
+    player_name = name_input_text.strip()
+    # RESET LEVEL TO 1 FOR NEW PLAYER
+    level = 1
+    game_over = 0
+    score = 0
+    state_machine.change('level_select')  # Let the player pick a level to start
+    print(f"Player name set to: {player_name}")
+
+def handle_mouse_click(event):
+    if event.button == 1:
+        mouse_clicks.append(event.pos)
+
+def handle_name_input_click(event):
+    global name_input_active
+    name_input_active = name_input_rect.collidepoint(event.pos)
+    if start_button_rect.collidepoint(event.pos):
+        submit_player_name()
+
+def handle_name_input_key(event):
+    global name_input_text, name_input_active
+    if not name_input_active:
+        return
+    if event.key == pygame.K_RETURN:
+        submit_player_name()
+    elif event.key == pygame.K_BACKSPACE:
+        name_input_text = name_input_text[:-1]
+    elif event.key == pygame.K_ESCAPE:
+        name_input_active = False
+    else:
+        if len(name_input_text) < 15:
+            name_input_text += event.unicode
+
+def handle_volume_slider(event):
+    global volume
+    # Only when the value moved; saving waits until the drag has settled
+    if volume_slider.handle_event(event) and volume_slider.value != volume:
+        volume = volume_slider.value # Update the global volume variable
+        pygame.mixer.music.set_volume(volume) # Apply the new volume to the music mixer
+        settings.set('volume', volume)
+
+def handle_settings_key(event):
+    if event.key == pygame.K_ESCAPE: # Allow ESC to exit settings
+        volume_slider.grabbed = False
+        state_machine.change(state_machine.states['settings'].return_to)
+
+def handle_level_select_key(event):
+    # Number keys pick a tile on the visible page, arrow keys change page
+    if pygame.K_1 <= event.key <= pygame.K_9:
+        slot = event.key - pygame.K_1
+        selected_level = level_select_grid.page * level_select_grid.page_size() + slot + 1
+        if slot < level_select_grid.page_size() and selected_level <= max_levels:
+            start_selected_level(selected_level)
+    elif event.key == pygame.K_LEFT:
+        level_select_grid.set_page(level_select_grid.page - 1)
+    elif event.key == pygame.K_RIGHT:
+        level_select_grid.set_page(level_select_grid.page + 1)
+
+def handle_pause_key(event):
+    if event.key == pygame.K_p: # Toggle pause with 'P' key
+        state_machine.change('paused' if state_machine.current.name == 'playing' else 'playing')
+
+state_machine = StateMachine()
+for game_state in (TitleState(), NameInputState(), LevelSelectState(), PlayingState(),
+                   PausedState(), SettingsState(), GameOverState(), VictoryState()):
+    state_machine.add(game_state)
+
+dispatcher = EventDispatcher()
+dispatcher.register(ANY_STATE, pygame.QUIT, lambda event: quit_game())
+dispatcher.register(ANY_STATE, pygame.MOUSEBUTTONDOWN, handle_mouse_click)
+dispatcher.register('name_input', pygame.MOUSEBUTTONDOWN, handle_name_input_click)
+dispatcher.register('name_input', pygame.KEYDOWN, handle_name_input_key)
+for event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+    dispatcher.register('settings', event_type, handle_volume_slider)
+dispatcher.register('settings', pygame.KEYDOWN, handle_settings_key)
+dispatcher.register('level_select', pygame.KEYDOWN, handle_level_select_key)
+dispatcher.register('playing', pygame.KEYDOWN, handle_pause_key)
+dispatcher.register('paused', pygame.KEYDOWN, handle_pause_key)
+
+# Where this frame's input comes from: the keyboard, or a recording being made or played back
+if replayer:
+    input_source = ReplayInput(replayer)
+elif args.record:
+    input_source = RecordingInput(window.to_logical, InputRecorder(args.record, {
+        'seed': args.seed,
+        'fps': fps,
+        'level': args.level,
+        'player_name': args.player_name,
+        'sensory_enemies': args.sensory_enemies,
+    }))
+elif args.autopilot:
+    input_source = AutopilotInput(lambda: {
+        'state': state_machine.current.name,
+        'playing': state_machine.current.name == 'playing' and game_started and game_over == 0,
+        'player': player,
+        'world': world,
+        'coins': coin_group,
+        'restart': restart_button.rect.center,
+    }, args.seed, args.frames)
+else:
+    input_source = LiveInput(window.to_logical)
+input_keys = None # Key state for this frame, read by Player.update
+
+if args.level:
+    # Skip the menus and drop straight into the level
+    finish_loading()
+    player_name = args.player_name
+    start_selected_level(args.level)
+else:
+    state_machine.change('title')
 
-pygame.quit()
\ No newline at end of file
+run = True
+frame_times = []
+state_machine.apply_pending()
+startup.mark('setup')
+while run:
+    if args.headless:
+        clock.tick() # No frame cap, run as fast as the machine allows
+    else:
+        clock.tick(fps)
+    frame_start = time.perf_counter()
+
+    # One event pump per frame, routed to the handlers of the active state
+    mouse_clicks.clear()
+    events, input_keys = input_source.poll()
+    dispatcher.dispatch(state_machine.current.name, events)
+    if not run:
+        break
+
+    state_machine.run_frame()
+    scheduler.run_frame()
+    sfx.run_frame(game_ticks(), player.rect.center if player is not None else None)
+    window.present(screen_shake)
+    pygame.display.update()
+    if not frame_times:
+        startup.mark('first frame')
+    if not assets_ready:
+        if not frame_times:
+            preload_game_assets() # The first frame is up, now load the rest
+        elif loading_done():
+            finish_loading()
+
+    if frame_clock:
+        frame_clock.tick()
+    frame_times.append(time.perf_counter() - frame_start)
+    governor.add_frame(frame_times[-1] * 1000)
+    if input_source.finished:
+        run = False
+
+input_source.close()
+settings.close()
+
+# Summary of the run, printed after a replay and read by replay_runner.py
+frame_ms = sorted(t * 1000 for t in frame_times) or [0]
+outcomes = {'victory': 'victory', 'game_over': 'died'}
+run_summary = {
+    'frames': len(frame_times),
+    'state': state_machine.current.name,
+    'outcome': outcomes.get(state_machine.current.name, 'finished' if input_source.finished else 'quit'),
+    'level': level,
+    'score': score,
+    'coins': run_stats['coins'],
+    'deaths': run_stats['deaths'],
+    'levels_completed': run_stats['levels_completed'],
+    'frame_ms_mean': sum(frame_ms) / len(frame_ms),
+    'frame_ms_p50': frame_ms[len(frame_ms) // 2],
+    'frame_ms_p95': frame_ms[int(len(frame_ms) * 0.95)],
+    'frame_ms_p99': frame_ms[int(len(frame_ms) * 0.99)],
+    'frame_ms_max': frame_ms[-1],
+}
+if replayer or args.autopilot:
+    print(f"{'Replay' if replayer else 'Autopilot'} finished: {run_summary['frames']} frames, {run_summary['outcome']}, "
+          f"level {level}, score {score}")
+    print(f"Frame time: mean {run_summary['frame_ms_mean']:.3f} ms, "
+          f"p95 {run_summary['frame_ms_p95']:.3f} ms, max {run_summary['frame_ms_max']:.3f} ms")
+    if args.autopilot:
+        print(f"Coins {run_stats['coins']}, deaths {run_stats['deaths']}, "
+              f"levels completed {run_stats['levels_completed']}")
+if args.profile_states:
+    state_machine.print_profile()
+    scheduler.print_stats()
+    sfx.print_stats()
+    governor.print_stats()
+if args.startup_report:
+    startup.report()
+assets.reset()
+pygame.quit()
@@ -0,0 +1,374 @@
+"""Images loaded once and converted to the display's pixel format.
+
+pygame.image.load gives surfaces in whatever format the file had, and
+every blit of one has to convert its pixels on the fly. load_image()
+converts once, after the display exists, picking the cheapest format
+that still looks the same:
+
+    no transparent pixels            plain display format
+    pixels fully on or fully off     display format with a colorkey
+    anything else                    display format with per-pixel alpha
+
+It also keeps each (file, size) it has loaded, so sprites that all use
+the same picture share one surface instead of loading their own copy.
+Sprites packed by atlas.py come out of the atlas instead of their own
+file: one decode and one conversion per page, and each sprite is a
+subsurface of it.
+
+preload_image() starts decoding files on worker threads, so a game can
+show its first frames while the rest loads. load_image() then only waits
+if its file isn't ready yet. LazySound puts off reading a sound until it
+is first played, and load_sound() keeps each sound's decoded samples in
+SOUND_CACHE_DIR so later launches don't decode it again. find_audio()
+lets a compressed copy of a sound or the music stand in for its WAV.
+load_font() replaces SysFont with the font files shipped in fonts/, made
+once per name, size and boldness.
+
+Everything here is kept at module level, so a process that runs the game
+more than once (replay_runner.py) has to call reset() when each game
+quits pygame; fonts and surfaces made before pygame.quit() can't be used
+after it.
+
+Run this file to compare blit speed before and after conversion:
+
+    python assets.py --headless
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# Tried in order as the colorkey, the first one no visible pixel uses wins
+KEY_COLORS = ((255, 0, 255), (0, 255, 255), (1, 2, 3))
+
+ATLAS_MANIFEST = 'atlas.json' # written by atlas.py next to the images
+WORKERS = 2 # threads decoding preloaded files
+
+# Decoded sound samples, named by the hash of the file they came from and
+# the mixer format they were decoded to. Safe to delete at any time
+SOUND_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'sounds')
+
+# Looked for next to a sound's or the music's WAV, best first
+AUDIO_FORMATS = ('.ogg', '.mp3', '.flac', '.wav')
+
+# Font names the game asks for -> (regular file, bold file or None) in
+# FONT_DIR. The fonts the game was made with aren't free to ship, so these
+# are freely licensed look-alikes; fonts/README.txt says which is which
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+FONT_FILES = {
+    'bauhaus 93': ('FredokaOne-Regular.ttf', None),
+    'arial': ('Roboto-Regular.ttf', 'Roboto-Bold.ttf'),
+    'impact': ('FjallaOne-Regular.ttf', None),
+    'futura': ('JosefinSans-Regular.ttf', None),
+}
+
+loaded = {} # (path, size) -> surface
+atlases = {} # image folder -> {region name: (manifest page, rect)}
+decoding = {} # (path, size) -> future (decoded surface, display kind)
+fonts = {} # (lower case name, size, bold) -> Font
+pool = None
+
+
+def load_image(path, size=None):
+    """The image at path, scaled to size if given, in the display's format"""
+    key = (path, size)
+    image = loaded.get(key)
+    if image is None:
+        image = atlas_image(path, size)
+        if image is None:
+            image = convert_for_display(*decoded(path, size))
+        loaded[key] = image
+    return image
+
+
+def decode(path, size=None, kind=None):
+    """(image at path scaled to size, its display_kind) without converting, which is safe off the main thread"""
+    image = pygame.image.load(path)
+    if size is not None:
+        image = pygame.transform.scale(image, size)
+    return image, kind or display_kind(image)
+
+
+def decoded(path, size=None, kind=None):
+    """decode(path, size, kind), waiting for a worker if it was preloaded"""
+    future = decoding.pop((path, size), None)
+    if future is not None:
+        return future.result()
+    return decode(path, size, kind)
+
+
+def workers():
+    global pool
+    if pool is None:
+        pool = ThreadPoolExecutor(WORKERS, thread_name_prefix='assets')
+    return pool
+
+
+def preload_image(path, size=None):
+    """Start decoding what load_image(path, size) will need on a worker thread.
+
+    PNG decoding lets other threads run, so the main thread can keep
+    drawing frames meanwhile. The worker also works out the display_kind;
+    only converting has to wait for the main thread, in load_image.
+    """
+    kind = None
+    place = atlas_place(path, size)
+    if place is not None:
+        image_dir, page, rect = place
+        if 'surface' in page:
+            return
+        path, size, kind = os.path.join(image_dir, page['file']), None, page['kind']
+    elif (path, size) in loaded:
+        return
+    if (path, size) not in decoding:
+        decoding[path, size] = workers().submit(decode, path, size, kind)
+
+
+def load_font(name, size, bold=False):
+    """Font for name from FONT_FILES, in place of pygame.font.SysFont(name, size, bold).
+
+    It goes by file path, so there's no search through the system's fonts,
+    and the same name and size give the same glyphs on every machine. A
+    name with no file gets pygame's default font, as SysFont gives for a
+    name that isn't installed, and bold without a bold file is drawn bold
+    by pygame. Each font is made once and shared, so asking again every
+    frame is cheap. Don't change a shared font's style; ask for bold instead.
+    """
+    key = (name.lower(), size, bold)
+    font = fonts.get(key)
+    if font is None:
+        regular, bold_file = FONT_FILES.get(key[0], (None, None))
+        if bold and bold_file:
+            font = pygame.font.Font(os.path.join(FONT_DIR, bold_file), size)
+        else:
+            font = pygame.font.Font(os.path.join(FONT_DIR, regular) if regular else None, size)
+            if bold:
+                font.set_bold(True)
+        fonts[key] = font
+    return font
+
+
+def reset():
+    """Forget every font, image and atlas page, for when pygame quits and may start again"""
+    global pool
+    fonts.clear()
+    loaded.clear()
+    atlases.clear()
+    for future in decoding.values():
+        future.cancel()
+    decoding.clear()
+    if pool is not None:
+        pool.shutdown(wait=True)
+        pool = None
+
+
+def find_audio(path):
+    """path, or the same file in the first of AUDIO_FORMATS that exists.
+
+    Shipping music.ogg in place of music.wav then needs no code change.
+    """
+    stem = os.path.splitext(path)[0]
+    for extension in AUDIO_FORMATS:
+        if os.path.exists(stem + extension):
+            return stem + extension
+    return path
+
+
+def load_sound(path):
+    """pygame.mixer.Sound(path), from the decoded-sample cache when it's in there.
+
+    A sound has to be decoded, and converted to the mixer's rate and
+    channels, before it can play. The first time that's done its samples
+    are written to SOUND_CACHE_DIR, keyed by the file's hash, so a changed
+    file is decoded again and later launches only read them back. If the
+    cache can't be written the sound still loads, it's just decoded again.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    frequency, size, channels = pygame.mixer.get_init()
+    name = f'{hashlib.sha1(data).hexdigest()}-{frequency}-{size}-{channels}.raw'
+    cache_path = os.path.join(SOUND_CACHE_DIR, name)
+    try:
+        with open(cache_path, 'rb') as f:
+            return pygame.mixer.Sound(buffer=f.read())
+    except OSError:
+        pass
+    sound = pygame.mixer.Sound(file=io.BytesIO(data))
+    try:
+        os.makedirs(SOUND_CACHE_DIR, exist_ok=True)
+        # Written under another name first, so a cut-off write is never read back
+        with open(cache_path + '.tmp', 'wb') as f:
+            f.write(sound.get_raw())
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError:
+        pass
+    return sound
+
+
+class LazySound():
+    """A pygame.mixer.Sound that isn't read until it first plays.
+
+    It also opens the mixer then, if nothing has yet.
+    """
+    def __init__(self, path, volume=1.0):
+        self.path = path
+        self.volume = volume
+        self.sound = None
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.sound is not None:
+            self.sound.set_volume(volume)
+
+    def load(self):
+        """The pygame Sound, read now if it hasn't been"""
+        if self.sound is None:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self.sound = load_sound(find_audio(self.path))
+            self.sound.set_volume(self.volume)
+        return self.sound
+
+    def play(self, *args):
+        return self.load().play(*args)
+
+
+def loading_done():
+    """True once every preloaded file has been decoded, so nothing will have to wait"""
+    return all(future.done() for future in decoding.values())
+
+
+def region_name(name, size):
+    """Atlas manifest key for file name drawn at size (None for its own size)"""
+    if size is None:
+        return name
+    return f'{name}@{size[0]}x{size[1]}'
+
+
+def atlas_place(path, size):
+    """(image folder, manifest page, rect) of path at size in the atlas, or None if it isn't packed"""
+    image_dir, name = os.path.split(path)
+    if image_dir not in atlases:
+        atlases[image_dir] = load_manifest(image_dir)
+    place = atlases[image_dir].get(region_name(name, size))
+    if place is None:
+        return None
+    return (image_dir,) + place
+
+
+def atlas_image(path, size):
+    """The atlas region for path at size, or None if it isn't packed"""
+    if pygame.display.get_surface() is None:
+        return None
+    place = atlas_place(path, size)
+    if place is None:
+        return None
+    image_dir, page, rect = place
+    if 'surface' not in page:
+        # Pages are decoded the first time one of their sprites is asked for
+        image, kind = decoded(os.path.join(image_dir, page['file']), None, page['kind'])
+        page['surface'] = convert_for_display(image, kind, rle=False)
+    return page['surface'].subsurface(rect)
+
+
+def load_manifest(image_dir):
+    """{region name: (page, rect)} from image_dir's atlas manifest; {} if there isn't one"""
+    manifest_path = os.path.join(image_dir, ATLAS_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return {name: (page, rect) for page in manifest['pages'] for name, rect in page['regions'].items()}
+
+
+def convert_for_display(image, kind=None, rle=True):
+    """image in the display's format, blitting the way kind says (see display_kind)"""
+    # Before set_mode there is no display format to convert to
+    if pygame.display.get_surface() is None:
+        return image
+    if kind is None:
+        kind = display_kind(image)
+    if kind == 'opaque':
+        return image.convert()
+    if kind == 'colorkey':
+        key = free_color(image, pygame.mask.from_surface(image, 254))
+        if key is not None:
+            keyed = pygame.Surface(image.get_size())
+            keyed.fill(key)
+            keyed.blit(image, (0, 0))
+            keyed = keyed.convert()
+            # RLE surfaces can't be shared by subsurfaces, so atlas pages go without
+            keyed.set_colorkey(key, pygame.RLEACCEL if rle else 0)
+            return keyed
+    return image.convert_alpha()
+
+
+def display_kind(image):
+    """'opaque', 'colorkey' or 'alpha': the cheapest way to blit image that looks the same"""
+    if not image.get_flags() & pygame.SRCALPHA:
+        return 'opaque'
+    opaque = pygame.mask.from_surface(image, 254).count()
+    if opaque == image.get_width() * image.get_height():
+        return 'opaque'
+    if opaque == pygame.mask.from_surface(image, 0).count():
+        return 'colorkey'
+    return 'alpha'
+
+
+def free_color(image, opaque):
+    """A colour none of the image's opaque pixels have, to use as its colorkey"""
+    for color in KEY_COLORS:
+        same = pygame.mask.from_threshold(image, color + (255,), (1, 1, 1, 255))
+        if not same.overlap_area(opaque, (0, 0)):
+            return color
+    return None
+
+
+def benchmark(paths, blits):
+    screen = pygame.display.get_surface()
+    print(f"{'image':<24} {'size':>10}  {'as loaded':>12} {'converted':>12}")
+    totals = [0.0, 0.0]
+    for path in paths:
+        raw = pygame.image.load(path)
+        converted = convert_for_display(raw)
+        times = []
+        for surface in (raw, converted):
+            start = time.perf_counter()
+            for n in range(blits):
+                screen.blit(surface, (n % 50, n % 30))
+            times.append(time.perf_counter() - start)
+        totals[0] += times[0]
+        totals[1] += times[1]
+        size = f'{raw.get_width()}x{raw.get_height()}'
+        print(f"{os.path.basename(path):<24} {size:>10}  {times[0] / blits * 1e6:>9.1f} us "
+              f"{times[1] / blits * 1e6:>9.1f} us  {times[0] / times[1]:.1f}x")
+    print(f"{'all':<24} {'':>10}  {totals[0] * 1000:>9.1f} ms {totals[1] * 1000:>9.1f} ms  "
+          f"{totals[0] / totals[1]:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Blit speed of the game\'s images before and after conversion')
+    parser.add_argument('images', nargs='*', help='image files (default: every .png in img/)')
+    parser.add_argument('--blits', type=int, default=2000, help='blits per image (default: 2000)')
+    parser.add_argument('--headless', action='store_true', help='use the dummy video driver')
+    args = parser.parse_args()
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+    pygame.init()
+    pygame.display.set_mode((800, 856))
+    paths = args.images
+    if not paths:
+        image_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
+        paths = [os.path.join(image_dir, name) for name in sorted(os.listdir(image_dir)) if name.endswith('.png')]
+    benchmark(paths, args.blits)
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Pack the sprites into a few atlas images.
+
+Building writes img/atlas_<program>_<kind>.png pages and img/atlas.json, the
+manifest naming each sprite's region. Sprites are packed at the size
+they're drawn, one page per way of blitting them (see
+assets.display_kind), so that every page can be converted once and each
+sprite is a subsurface of it:
+
+    python atlas.py
+
+Run it again after changing a sprite or a size in GAME_SPRITES or
+EDITOR_SPRITES. Anything not in the atlas, or with no atlas built at
+all, is loaded from its own file as before, so a stale atlas only costs
+speed, not pictures.
+
+The game and the level editor both load through assets.load_image,
+which looks in the atlas first.
+"""
+import argparse
+import json
+import os
+
+import pygame
+
+from assets import ATLAS_MANIFEST, display_kind, region_name
+
+PAGE_WIDTH = 1024
+PADDING = 1
+
+GAME_TILE = 40 # tile_size in DP-FINAL_LAUNCH_GAME.py
+EDITOR_TILE = 35 # tile_size in level_editor.py
+
+# (file in img/, size it is drawn at or None for as is), packed onto pages
+# of their own for each program so neither decodes the other's sprites.
+# The sky backgrounds are screen sized and stay in their own files, and so
+# does the game's sun, which the title screen needs before any page is in.
+GAME_SPRITES = [
+    ('dirt.png', (GAME_TILE, GAME_TILE)),
+    ('grass.png', (GAME_TILE, GAME_TILE)),
+    ('guy1.png', (40, 80)),
+    ('guy2.png', (40, 80)),
+    ('guy3.png', (40, 80)),
+    ('guy4.png', (40, 80)),
+    ('ghost.png', None),
+    ('blob1.png', None),
+    ('platform.png', (GAME_TILE, GAME_TILE // 2)),
+    ('lava.png', (GAME_TILE, GAME_TILE // 2)),
+    ('coin.png', (GAME_TILE // 2, GAME_TILE // 2)),
+    ('restart_btn.png', None),
+    ('start_btn.png', None),
+    ('exit_btn.png', None),
+    ('settings_btn.png', None),
+    ('pause_btn.png', None),
+    ('back_button.png', None),
+    ('music_on.png', None),
+    ('music_off.png', None),
+    ('sfx_on.png', None),
+    ('sfx_off.png', None),
+]
+
+EDITOR_SPRITES = [
+    ('sun.png', (EDITOR_TILE, EDITOR_TILE)),
+    ('dirt.png', (EDITOR_TILE, EDITOR_TILE)),
+    ('grass.png', (EDITOR_TILE, EDITOR_TILE)),
+    ('blob.png', (EDITOR_TILE, int(EDITOR_TILE * 0.75))),
+    ('platform_x.png', (EDITOR_TILE, EDITOR_TILE // 2)),
+    ('platform_y.png', (EDITOR_TILE, EDITOR_TILE // 2)),
+    ('lava.png', (EDITOR_TILE, EDITOR_TILE // 2)),
+    ('coin.png', (EDITOR_TILE // 2, EDITOR_TILE // 2)),
+    ('exit.png', (EDITOR_TILE, int(EDITOR_TILE * 1.5))),
+    ('save_btn.png', None),
+    ('load_btn.png', None),
+]
+
+
+def pack(sizes, width=PAGE_WIDTH, padding=PADDING):
+    """Shelf-pack (w, h) sizes into one page width wide; returns ([(x, y)], height)"""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    spots = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > width:
+            y += shelf + padding
+            x = shelf = 0
+        spots[i] = (x, y)
+        x += w + padding
+        shelf = max(shelf, h)
+    return spots, y + shelf
+
+
+def build(image_dir, groups=None):
+    """Write the atlas pages and manifest into image_dir; returns the manifest.
+
+    groups maps a page name prefix to its sprites, game and editor by default.
+    """
+    if groups is None:
+        groups = {'game': GAME_SPRITES, 'editor': EDITOR_SPRITES}
+    pages = []
+    for group, sprites in groups.items():
+        kinds = {} # kind -> [(region name, surface)]
+        for name, size in sprites:
+            image = pygame.image.load(os.path.join(image_dir, name))
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            kinds.setdefault(display_kind(image), []).append((region_name(name, size), image))
+
+        for kind in ('opaque', 'colorkey', 'alpha'):
+            if kind not in kinds:
+                continue
+            images = kinds[kind]
+            spots, height = pack([image.get_size() for name, image in images])
+            width = max(x + image.get_width() for (name, image), (x, y) in zip(images, spots))
+            page = pygame.Surface((width, height), pygame.SRCALPHA)
+            regions = {}
+            for (name, image), (x, y) in zip(images, spots):
+                # MAX onto the empty page copies the pixels, alpha and all, instead of blending
+                page.blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+                regions[name] = [x, y, image.get_width(), image.get_height()]
+            file = f'atlas_{group}_{kind}.png'
+            pygame.image.save(page, os.path.join(image_dir, file))
+            pages.append({'file': file, 'kind': kind, 'regions': regions})
+
+    manifest = {'pages': pages}
+    with open(os.path.join(image_dir, ATLAS_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack the game and editor sprites into atlas pages')
+    parser.add_argument('--img', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img'),
+                        help='image folder (default: img/ next to this file)')
+    args = parser.parse_args()
+
+    for stale in os.listdir(args.img):
+        if stale.startswith('atlas_') and stale.endswith('.png'):
+            os.remove(os.path.join(args.img, stale))
+    manifest = build(args.img)
+    for page in manifest['pages']:
+        print(f"{page['file']}: {len(page['regions'])} sprites ({page['kind']})")
+    print(f"Wrote {os.path.join(args.img, ATLAS_MANIFEST)}")
+
+
+if __name__ == '__main__':
+    main()
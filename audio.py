@@ -0,0 +1,158 @@
+"""Sound effects played through channels set aside per category.
+
+Gameplay code asks for a sound with play(sound) whenever something
+happens, as often as it likes. Requests are held until run_frame(), once
+a frame, which decides what is actually heard:
+
+    the same sound asked for twice in a frame     plays once
+    asked for again within its min_interval_ms    dropped
+    its category's channels all busy              takes the channel of the
+                                                  lowest priority sound
+                                                  playing there, if that is
+                                                  no higher than its own;
+                                                  otherwise dropped
+
+Each category has channels of its own, reserved so nothing else plays on
+them, so a burst of warnings can never take the channel the game over
+sound needs.
+
+A sound played with a source (a rect, like the blob's) is positional: it
+comes from the source's side and gets quieter with distance from the
+listener, and keeps following both while it plays. run_frame() works out
+the gains for every positional sound playing with stereo_gains(), once a
+frame.
+"""
+import math
+
+import pygame
+
+
+def stereo_gains(listener, sources, hearing_range, pan_width):
+    """[(left, right)] channel volumes for sounds at each of sources, heard from listener.
+
+    Volume falls off linearly to nothing at hearing_range; a source
+    pan_width or more to one side is only heard on that side.
+
+    This is a plain loop over the sources, not a vectorised batch: only the
+    few channels set aside for positional sounds can be playing at once, so
+    there are never more than a handful, and numpy (which the game doesn't
+    need) would cost more to set up per call than the loop takes.
+    """
+    x, y = listener
+    gains = []
+    for source_x, source_y in sources:
+        gain = max(0.0, 1.0 - math.hypot(source_x - x, source_y - y) / hearing_range)
+        pan = max(-1.0, min(1.0, (source_x - x) / pan_width))
+        gains.append((gain * min(1.0, 1.0 - pan), gain * min(1.0, 1.0 + pan)))
+    return gains
+
+
+class SoundSettings():
+    def __init__(self, category, priority, min_interval_ms):
+        self.category = category
+        self.priority = priority
+        self.min_interval_ms = min_interval_ms
+        self.last_played = None
+
+
+class SoundManager():
+    def __init__(self, categories, hearing_range=300, pan_width=100):
+        """categories: {name: number of channels}; see stereo_gains for the rest"""
+        self.categories = dict(categories)
+        self.hearing_range = hearing_range
+        self.pan_width = pan_width
+        self.settings = {} # sound -> SoundSettings
+        self.requests = [] # sounds asked for this frame, in order
+        self.sources = {} # sound asked for this frame -> its source rect, for positional ones
+        # category -> [[channel, sound playing, when it started, source rect or None]], once the mixer is up
+        self.channels = None
+        self.counts = {'requested': 0, 'played': 0, 'merged': 0, 'rate limited': 0, 'stolen': 0, 'dropped': 0}
+
+    def add(self, sound, category, priority=0, min_interval_ms=0):
+        """Register a sound (anything with load() returning a pygame Sound, like assets.LazySound)"""
+        self.settings[sound] = SoundSettings(category, priority, min_interval_ms)
+
+    def play(self, sound, source=None):
+        """Ask for sound this frame, from source (anything with a center, like a rect) if given"""
+        self.counts['requested'] += 1
+        if sound in self.requests:
+            self.counts['merged'] += 1
+        else:
+            self.requests.append(sound)
+            if source is not None:
+                self.sources[sound] = source
+
+    def open_channels(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        total = sum(self.categories.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total))
+        pygame.mixer.set_reserved(total)
+        self.channels = {}
+        index = 0
+        for category, count in self.categories.items():
+            self.channels[category] = [[pygame.mixer.Channel(index + n), None, 0, None] for n in range(count)]
+            index += count
+
+    def run_frame(self, now_ms, listener=None):
+        """Play this frame's requests, most important first, then pan the positional sounds.
+
+        now_ms is the game time, listener where sounds are heard from (None
+        plays everything centred).
+        """
+        if self.requests:
+            self.play_requests(now_ms)
+        if self.channels is not None and listener is not None:
+            self.pan(listener)
+
+    def play_requests(self, now_ms):
+        if self.channels is None:
+            self.open_channels()
+        requests = sorted(self.requests, key=lambda sound: -self.settings[sound].priority)
+        sources = self.sources
+        self.requests = []
+        self.sources = {}
+        for sound in requests:
+            settings = self.settings[sound]
+            if settings.last_played is not None and now_ms - settings.last_played < settings.min_interval_ms:
+                self.counts['rate limited'] += 1
+                continue
+            slot = self.pick_channel(settings, now_ms)
+            if slot is None:
+                self.counts['dropped'] += 1
+                continue
+            slot[0].play(sound.load())
+            slot[0].set_volume(1.0) # Undo the last sound's panning; pan() sets it for positional ones
+            slot[1] = sound
+            slot[2] = now_ms
+            slot[3] = sources.get(sound)
+            settings.last_played = now_ms
+            self.counts['played'] += 1
+
+    def pick_channel(self, settings, now_ms):
+        """A free channel in the sound's category, or the one to steal, or None"""
+        slots = self.channels[settings.category]
+        for slot in slots:
+            if not slot[0].get_busy():
+                return slot
+        # All busy: the lowest priority sound goes, the longest playing of those first
+        victim = min(slots, key=lambda slot: (self.settings[slot[1]].priority, slot[2]))
+        if self.settings[victim[1]].priority > settings.priority:
+            return None
+        victim[0].stop()
+        self.counts['stolen'] += 1
+        return victim
+
+    def pan(self, listener):
+        """Point every positional sound still playing at its source"""
+        slots = [slot for slots in self.channels.values() for slot in slots
+                 if slot[3] is not None and slot[0].get_busy()]
+        if not slots:
+            return
+        gains = stereo_gains(listener, [slot[3].center for slot in slots], self.hearing_range, self.pan_width)
+        for slot, (left, right) in zip(slots, gains):
+            slot[0].set_volume(left, right)
+
+    def print_stats(self):
+        if self.counts['requested']:
+            print("Sound effects: " + ", ".join(f"{count} {name}" for name, count in self.counts.items()))
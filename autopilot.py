@@ -0,0 +1,198 @@
+"""A bot that plays the game in place of the keyboard.
+
+Autopilot decides the SPACE/LEFT/RIGHT keys for one frame from what is
+on screen: it goes for coins that are close by, otherwise it follows the
+level's flow field towards the exit, and it jumps over lava and whatever
+it gets stuck against. It's a few lookups per frame, not a search, and
+all its randomness comes from one seeded Random, so a bot run replays
+the same way every time given the same seed.
+
+AutopilotInput plugs it in as the game's input source. It also clicks
+restart after dying or winning, so one bot can play for as long as a
+soak test needs:
+
+    python DP-FINAL_LAUNCH_GAME.py --autopilot --headless --frames 20000
+    python replay_runner.py --bots 16 --workers 8
+"""
+import random
+
+import pygame
+
+from input_replay import KEY_BITS, KeyState
+
+SPACE, LEFT, RIGHT = (bit for key, bit in KEY_BITS)
+
+# Coins further than this from the player are left to the exit route
+COIN_RANGE = (200, 80) # px across, px above the player's head
+STUCK_FRAMES = 10 # pushing against something this long, try jumping
+LOST_FRAMES = 90 # still not getting anywhere, turn round for a while
+WANDER_FRAMES = 40
+WAIT_FRAMES = 120 # no route from here, wait this long for a platform before wandering off
+RESTART_DELAY = 60 # frames on the game over screen before clicking restart
+HESITATE_CHANCE = 0.01 # a human-ish pause or stray jump now and then
+
+
+class Autopilot():
+    def __init__(self, rng):
+        self.rng = rng
+        self.reset()
+
+    def reset(self):
+        self.direction = 1
+        self.goal_x = None # where the current walk or jump is headed
+        self.space_held = False
+        self.last_x = None
+        self.stuck = 0
+        self.wander = 0
+        self.waited = 0
+
+    def target_coin(self, player, coins, field):
+        best = None
+        for coin in coins:
+            # The score coin in the corner sits inside the wall
+            if field.cell_at(coin.rect.centerx, coin.rect.centery + 1) in field.solid:
+                continue
+            dx = coin.rect.centerx - player.rect.centerx
+            if abs(dx) > COIN_RANGE[0] or coin.rect.centery < player.rect.top - COIN_RANGE[1] \
+                    or coin.rect.centery > player.rect.bottom:
+                continue
+            # Only walk over to it along solid ground, the exit route does the jumping
+            if abs(dx) > field.tile_size and not self.can_walk(field, player, coin.rect.centerx):
+                continue
+            if best is None or abs(dx) < abs(best.rect.centerx - player.rect.centerx):
+                best = coin
+        return best
+
+    def can_walk(self, field, player, x):
+        col, row = field.cell_at(player.rect.centerx, player.rect.bottom)
+        goal = x // field.tile_size
+        step = 1 if goal > col else -1
+        return all((between, row) in field.stand for between in range(col, goal + step, step))
+
+    def plan(self, player, world, coins):
+        """Pick goal_x for a player standing on something; returns whether to jump"""
+        field = world.flow_field
+        cell = field.cell_at(player.rect.centerx, player.rect.bottom)
+
+        if self.wander:
+            self.wander -= 1
+            self.goal_x = None
+            return self.rng.random() < 0.1
+
+        coin = self.target_coin(player, coins, field)
+        if coin is not None or field.next_move(cell) is not None:
+            self.waited = 0
+        if coin is not None:
+            self.goal_x = coin.rect.centerx
+            jump = coin.rect.centery < player.rect.top and abs(coin.rect.centerx - player.rect.centerx) < 60
+        else:
+            move = field.next_move(cell)
+            if move is not None:
+                (col, row), kind = move
+                self.goal_x = col * field.tile_size + field.tile_size // 2
+                jump = kind == 'jump'
+            elif field.cue(cell) == 'exit':
+                self.goal_x = player.rect.centerx
+                jump = False
+            elif self.waited < WAIT_FRAMES:
+                # No route from here right now, maybe a platform will come round
+                self.waited += 1
+                self.goal_x = player.rect.centerx
+                jump = False
+            else:
+                self.waited = 0
+                self.wander = WANDER_FRAMES
+                self.goal_x = None
+                jump = False
+
+        # Don't walk into lava
+        col, row = cell
+        side = self.steer(player)
+        if side and ((col + side, row) in field.lava or (col + side, row + 1) in field.lava):
+            jump = True
+        return jump
+
+    def steer(self, player):
+        """-1, 0 or 1 to get to goal_x (or carry on the same way without one)"""
+        if self.goal_x is None:
+            return self.direction
+        dx = self.goal_x - player.rect.centerx
+        if abs(dx) < 3:
+            return 0
+        return 1 if dx > 0 else -1
+
+    def mask(self, player, world, coins):
+        """Keys to hold this frame"""
+        jump = False
+        if not player.in_air:
+            jump = self.plan(player, world, coins)
+        # In the air, keep steering for where the jump was going
+        direction = self.steer(player)
+        if direction:
+            self.direction = direction
+
+        # Pushing into a wall or stuck in a corner
+        if direction and player.rect.x == self.last_x:
+            self.stuck += 1
+            if self.stuck >= LOST_FRAMES:
+                self.direction = -self.direction
+                self.wander = WANDER_FRAMES
+                self.stuck = 0
+            elif self.stuck >= STUCK_FRAMES:
+                jump = True
+        else:
+            self.stuck = 0
+        self.last_x = player.rect.x
+
+        if self.rng.random() < HESITATE_CHANCE:
+            direction, jump = 0, self.rng.random() < 0.5
+
+        mask = 0
+        if direction < 0:
+            mask |= LEFT
+        elif direction > 0:
+            mask |= RIGHT
+        # SPACE has to come back up before the game takes another jump
+        if jump and not self.space_held:
+            mask |= SPACE
+        self.space_held = bool(mask & SPACE)
+        return mask
+
+
+class AutopilotInput():
+    """Input source driven by Autopilot.
+
+    view is called once a frame and returns a dict with the active state's
+    name, whether the level is being played, the player, world and coin
+    group, and where the restart button is.
+    """
+    def __init__(self, view, seed, max_frames=None):
+        self.view = view
+        self.pilot = Autopilot(random.Random(seed))
+        self.max_frames = max_frames
+        self.frame = 0
+        self.waiting = 0
+
+    @property
+    def finished(self):
+        return self.max_frames is not None and self.frame >= self.max_frames
+
+    def poll(self):
+        # Still drain the real queue so the window stays responsive and can be closed
+        events = [event for event in pygame.event.get() if event.type == pygame.QUIT]
+        self.frame += 1
+        view = self.view()
+        mask = 0
+        if view['playing']:
+            self.waiting = 0
+            mask = self.pilot.mask(view['player'], view['world'], view['coins'])
+        elif view['state'] in ('game_over', 'victory'):
+            self.waiting += 1
+            if self.waiting == RESTART_DELAY:
+                self.pilot.reset()
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=view['restart'], button=1))
+                self.waiting = 0
+        return events, KeyState(mask)
+
+    def close(self):
+        pass
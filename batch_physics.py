@@ -0,0 +1,269 @@
+"""Player physics for many players at once, with NumPy.
+
+step() is player_physics.step for arrays: every argument is one entry per
+player, and all of them move in one call. Tiles are looked up in a grid
+rather than a list, but they are tested in the same order the game tests
+them, so a player here ends up on exactly the same pixel as in the game.
+
+BatchEnv wraps it as a reset/step environment for research and tuning:
+
+    env = BatchEnv(level=1, num_envs=4096)
+    obs = env.reset()
+    obs, reward, done, info = env.step(actions) # actions: SPACE|LEFT|RIGHT masks
+
+Needs numpy, which the game itself doesn't, and not pygame: nothing here
+opens a window or reads the keyboard.
+"""
+import numpy as np
+
+import player_physics
+from level_analyzer import BLOB_SIZE, FPS, MOVER_CYCLE, PLAYER_SIZE
+from level_data import PLAYER_START, get_level_duration, load_level_data, tile_size
+
+SPACE, LEFT, RIGHT = player_physics.SPACE_BIT, player_physics.LEFT_BIT, player_physics.RIGHT_BIT
+
+# outcome values in BatchEnv.step's info
+RUNNING = 0
+EXIT = 1
+DIED = -1
+TIMED_OUT = -2
+
+# Cells around the player that step() could hit, see TileGrid.near for
+# why it's so much more than the player's own size
+NEAR_COLS = 3
+NEAR_ROWS = 10
+
+
+class BatchLevel():
+    """A level as grids and arrays, shared by every player in a batch"""
+    def __init__(self, data, level):
+        self.level = level
+        self.jump_power = player_physics.jump_power(level)
+        self.duration = get_level_duration(level)
+        self.rows = len(data)
+        self.cols = len(data[0]) if data else 0
+        self.solid = np.zeros((self.rows, self.cols), dtype=bool)
+        self.lava = np.zeros((self.rows, self.cols), dtype=bool)
+        blobs = []
+        platforms = [] # (x, y, move_x, move_y)
+        exits = []
+        coins = []
+        for row, tiles in enumerate(data):
+            for col, tile in enumerate(tiles):
+                x = col * tile_size
+                y = row * tile_size
+                if tile == 1 or tile == 2:
+                    self.solid[row, col] = True
+                if tile == 3:
+                    blobs.append((x, y + 15))
+                if tile == 4:
+                    platforms.append((x, y, 1, 0))
+                if tile == 5:
+                    platforms.append((x, y, 0, 1))
+                if tile == 6:
+                    self.lava[row, col] = True
+                if tile == 7:
+                    coins.append((x + tile_size // 4, y + tile_size // 4))
+                if tile == 8:
+                    exits.append((x, y - (tile_size // 2)))
+        self.exits = np.array(exits, dtype=np.int64).reshape(-1, 2)
+        self.coins = np.array(coins, dtype=np.int64).reshape(-1, 2)
+
+        # Where every blob and platform is after 0, 1, 2, ... updates
+        self.period = len(MOVER_CYCLE) if (blobs or platforms) else 1
+        offsets = np.array([offset for offset, move_direction in MOVER_CYCLE[:self.period]], dtype=np.int64)
+        self.move_directions = np.array([move_direction for offset, move_direction in MOVER_CYCLE[:self.period]],
+                                        dtype=np.int64)
+        blobs = np.array(blobs, dtype=np.int64).reshape(-1, 2)
+        self.blob_x = blobs[:, 0][None, :] + offsets[:, None] # [phase, blob]
+        self.blob_y = np.broadcast_to(blobs[:, 1][None, :], self.blob_x.shape)
+        platforms = np.array(platforms, dtype=np.int64).reshape(-1, 4)
+        self.platform_move_x = platforms[:, 2]
+        self.platform_x = platforms[:, 0][None, :] + offsets[:, None] * platforms[:, 2][None, :]
+        self.platform_y = platforms[:, 1][None, :] + offsets[:, None] * platforms[:, 3][None, :]
+
+    @classmethod
+    def load(cls, level, directory=''):
+        return cls(load_level_data(level, directory), level)
+
+    def cells(self, grid, rows, cols):
+        """grid[rows, cols], False outside the level"""
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        return inside & grid[np.clip(rows, 0, self.rows - 1), np.clip(cols, 0, self.cols - 1)]
+
+
+def overlaps(rx, ry, rw, rh, x, y, width, height):
+    """player_physics.collides for arrays"""
+    return (rx < x + width) & (x < rx + rw) & (ry < y + height) & (y < ry + rh)
+
+
+def touching(level, x, y, phase):
+    """(on an exit, dead) for players at x, y with blobs at phase, as Player.update checks them"""
+    width, height = PLAYER_SIZE
+    on_exit = np.zeros(x.shape, dtype=bool)
+    for exit_x, exit_y in level.exits:
+        on_exit |= overlaps(exit_x, exit_y, tile_size, int(tile_size * 1.5), x, y, width, height)
+
+    dead = np.zeros(x.shape, dtype=bool)
+    for blob in range(level.blob_x.shape[1]):
+        dead |= overlaps(level.blob_x[phase, blob], level.blob_y[phase, blob], BLOB_SIZE[0], BLOB_SIZE[1],
+                         x, y, width, height)
+    # Lava is the bottom half of its cell
+    col = x // tile_size
+    row = y // tile_size
+    for row_offset in range(height // tile_size + 1):
+        for col_offset in range(width // tile_size + 1):
+            lava_row = row + row_offset
+            lava_col = col + col_offset
+            lava = level.cells(level.lava, lava_row, lava_col)
+            dead |= lava & overlaps(lava_col * tile_size, lava_row * tile_size + tile_size // 2,
+                                    tile_size, tile_size // 2, x, y, width, height)
+    return on_exit, dead
+
+
+def step(level, x, y, vel_y, in_air, jumped, left, right, space, phase):
+    """Move every player one frame; player_physics.step with arrays.
+
+    phase is each player's MOVER_CYCLE index, for where the platforms
+    are. Returns new (x, y, vel_y, in_air, jumped) arrays.
+    """
+    width, height = PLAYER_SIZE
+    jump = space & ~jumped & ~in_air
+    vel_y = np.where(jump, level.jump_power, vel_y)
+    jumped = (jumped | jump) & space
+    dx = np.where(right, player_physics.MOVE_SPEED, 0) - np.where(left, player_physics.MOVE_SPEED, 0)
+
+    #add gravity
+    vel_y = np.minimum(vel_y + player_physics.GRAVITY, player_physics.TERMINAL_VELOCITY)
+    dy = vel_y.copy()
+
+    #check for collision, tile by tile in the order the game's tile list is in
+    in_air = np.ones(x.shape, dtype=bool)
+    first_col = np.minimum(x, x + dx) // tile_size
+    first_row = (np.minimum(y, y + dy) - height - tile_size) // tile_size
+    for row_offset in range(NEAR_ROWS):
+        row = first_row + row_offset
+        tile_y = row * tile_size
+        for col_offset in range(NEAR_COLS):
+            col = first_col + col_offset
+            tile_x = col * tile_size
+            solid = level.cells(level.solid, row, col)
+            #check for collision in x direction
+            hit_x = solid & overlaps(tile_x, tile_y, tile_size, tile_size, x + dx, y, width, height)
+            dx = np.where(hit_x, 0, dx)
+            #check for collision in y direction
+            hit_y = solid & overlaps(tile_x, tile_y, tile_size, tile_size, x, y + dy, width, height)
+            #below the ground i.e. jumping, or above it i.e. falling
+            rising = hit_y & (vel_y < 0)
+            falling = hit_y & ~rising
+            dy = np.where(rising, tile_y + tile_size - y, np.where(falling, tile_y - (y + height), dy))
+            vel_y = np.where(hit_y, 0, vel_y)
+            in_air &= ~falling
+
+    #check for collision with platforms
+    platform_height = tile_size // 2
+    for platform in range(level.platform_x.shape[1]):
+        platform_x = level.platform_x[phase, platform]
+        platform_y = level.platform_y[phase, platform]
+        #collision in the x direction
+        dx = np.where(overlaps(platform_x, platform_y, tile_size, platform_height, x + dx, y, width, height), 0, dx)
+        #collision in the y direction
+        hit_y = overlaps(platform_x, platform_y, tile_size, platform_height, x, y + dy, width, height)
+        platform_bottom = platform_y + platform_height
+        #below the platform, or standing on it
+        below = hit_y & (np.abs((y + dy) - platform_bottom) < player_physics.COL_THRESH)
+        above = hit_y & ~below & (np.abs((y + height + dy) - platform_y) < player_physics.COL_THRESH)
+        vel_y = np.where(below, 0, vel_y)
+        dy = np.where(below, platform_bottom - y, np.where(above, 0, dy))
+        y = np.where(above, platform_y - 1 - height, y)
+        in_air &= ~above
+        #move sideways with the platform
+        if level.platform_move_x[platform]:
+            x = np.where(hit_y, x + level.move_directions[phase], x)
+
+    return x + dx, y + dy, vel_y, in_air, jumped
+
+
+class BatchEnv():
+    """num_envs copies of one level, stepped together.
+
+    Each step follows PlayingState.update once the countdown is over: the
+    timer, then coins, then Player.update's blob, lava and exit checks on
+    the rect before it moves, then the move. Copies that finish (exit,
+    death or the level timer) are reset in the same step() call; info
+    says how each one ended.
+    """
+    def __init__(self, level=1, num_envs=1, directory='', coin_reward=0.1, exit_reward=1.0, death_reward=-1.0):
+        self.level = level if isinstance(level, BatchLevel) else BatchLevel.load(level, directory)
+        self.num_envs = num_envs
+        self.time_limit = self.level.duration * FPS
+        self.coin_reward = coin_reward
+        self.exit_reward = exit_reward
+        self.death_reward = death_reward
+        self.x = np.zeros(num_envs, dtype=np.int64)
+        self.y = np.zeros(num_envs, dtype=np.int64)
+        self.vel_y = np.zeros(num_envs, dtype=np.int64)
+        self.in_air = np.zeros(num_envs, dtype=bool)
+        self.jumped = np.zeros(num_envs, dtype=bool)
+        self.frame = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.coins = np.zeros((num_envs, len(self.level.coins)), dtype=bool) # still there
+
+    def reset(self, which=None):
+        """Put every copy (or those where which is True) back at the start; returns observations"""
+        if which is None:
+            which = np.ones(self.num_envs, dtype=bool)
+        self.x[which] = PLAYER_START[0]
+        self.y[which] = PLAYER_START[1]
+        self.vel_y[which] = 0
+        self.in_air[which] = True
+        self.jumped[which] = False
+        self.frame[which] = 0
+        self.score[which] = 0
+        self.coins[which] = True
+        return self.observe()
+
+    def observe(self):
+        """[num_envs, 5] float32: x, y, vel_y, in_air, frames left on the timer"""
+        return np.stack([self.x, self.y, self.vel_y, self.in_air, self.time_limit - self.frame],
+                        axis=1).astype(np.float32)
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        space = (actions & SPACE) != 0
+        left = (actions & LEFT) != 0
+        right = (actions & RIGHT) != 0
+        phase = self.frame % self.level.period
+        width, height = PLAYER_SIZE
+
+        timed_out = self.frame >= self.time_limit
+        collected = np.zeros((self.num_envs, len(self.level.coins)), dtype=bool)
+        for coin, (coin_x, coin_y) in enumerate(self.level.coins):
+            collected[:, coin] = self.coins[:, coin] & ~timed_out & overlaps(
+                coin_x, coin_y, tile_size // 2, tile_size // 2, self.x, self.y, width, height)
+        self.coins &= ~collected
+        picked_up = collected.sum(axis=1)
+        self.score += picked_up
+
+        on_exit, dead = touching(self.level, self.x, self.y, phase)
+        # The exit is checked last in Player.update, so it wins over dying on the same frame
+        outcome = np.where(timed_out, TIMED_OUT, np.where(on_exit, EXIT, np.where(dead, DIED, RUNNING)))
+        moving = outcome == RUNNING
+
+        x, y, vel_y, in_air, jumped = step(self.level, self.x, self.y, self.vel_y, self.in_air, self.jumped,
+                                           left, right, space, phase)
+        self.x = np.where(moving, x, self.x)
+        self.y = np.where(moving, y, self.y)
+        self.vel_y = np.where(moving, vel_y, self.vel_y)
+        self.in_air = np.where(moving, in_air, self.in_air)
+        self.jumped = np.where(moving, jumped, self.jumped)
+        self.frame += 1
+
+        reward = picked_up * self.coin_reward
+        reward = reward + np.where(outcome == EXIT, self.exit_reward, 0.0)
+        reward = reward + np.where((outcome == DIED) | (outcome == TIMED_OUT), self.death_reward, 0.0)
+        done = ~moving
+        info = {'outcome': outcome, 'score': self.score.copy(), 'frames': self.frame.copy()}
+        if done.any():
+            self.reset(done)
+        return self.observe(), reward.astype(np.float32), done, info
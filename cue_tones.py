@@ -0,0 +1,87 @@
+"""Warning tones made on the fly, saying how close a hazard is.
+
+Each hazard has a few distance buckets, each with its own beep: the
+closer the hazard, the higher the pitch and the faster the beeps. A tone
+is synthesised the first time its bucket is needed, or all at once with
+prepare() while the game is loading, and kept, so playing one after that
+is just picking it out of a list.
+
+Tones are written straight into a sample buffer for the mixer's format,
+so this needs neither numpy nor sound files. CueTone has load() and
+play() like assets.LazySound, so a SoundManager can play it.
+"""
+import math
+from array import array
+
+import pygame
+
+DURATION = 0.5 # seconds of beeping in each tone
+FADE = 0.004 # seconds each beep fades in and out over, so it doesn't click
+AMPLITUDE = 0.6 # of full scale
+
+
+def synthesise(pitch, pulse_rate, frequency, channels, duration=DURATION):
+    """Signed 16 bit samples: beeps at about pitch Hz, pulse_rate times a second, for duration seconds"""
+    period = int(frequency / pulse_rate)
+    # Whole cycles of a wave table, which is far quicker than a sine per
+    # sample; the pitch comes out within a couple of percent
+    cycle = max(2, round(frequency / pitch))
+    on = max(cycle, period // 2 // cycle * cycle)
+    fade = min(max(1, int(frequency * FADE)), on // 2)
+    peak = AMPLITUDE * 32767
+    table = [int(peak * math.sin(2 * math.pi * i / cycle)) for i in range(cycle)]
+    mono = array('h', table * (on // cycle))
+    for i in range(fade):
+        scale = i / fade
+        mono[i] = int(mono[i] * scale)
+        mono[on - 1 - i] = int(mono[on - 1 - i] * scale)
+    # One beep and the gap after it, repeated; every beep starts at the same phase
+    beep = array('h', bytes(2 * channels * on))
+    for channel in range(channels):
+        beep[channel::channels] = mono
+    beep.frombytes(bytes(2 * channels * (period - on)))
+    repeats = max(1, round(duration * pulse_rate))
+    return beep.tobytes() * repeats
+
+
+class CueTone():
+    """One bucket's tone, synthesised the first time it's loaded"""
+    def __init__(self, pitch, pulse_rate, volume=1.0):
+        self.pitch = pitch
+        self.pulse_rate = pulse_rate
+        self.volume = volume
+        self.sound = None
+
+    def load(self):
+        if self.sound is None:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            # The game asks the mixer for signed 16 bit samples (see pre_init), only the channels may differ
+            frequency, size, channels = pygame.mixer.get_init()
+            self.sound = pygame.mixer.Sound(buffer=synthesise(self.pitch, self.pulse_rate, frequency, channels))
+            self.sound.set_volume(self.volume)
+        return self.sound
+
+    def play(self, *args):
+        return self.load().play(*args)
+
+
+class CueTones():
+    """The tones for one kind of hazard, up to max_distance away.
+
+    pitches and pulse_rates go from the closest bucket to the furthest,
+    one of each per bucket, splitting max_distance evenly.
+    """
+    def __init__(self, max_distance, pitches, pulse_rates, volume=1.0):
+        self.max_distance = max_distance
+        self.tones = [CueTone(pitch, rate, volume) for pitch, rate in zip(pitches, pulse_rates)]
+
+    def tone(self, distance):
+        """The tone for a hazard distance away"""
+        bucket = int(distance * len(self.tones) / self.max_distance)
+        return self.tones[max(0, min(bucket, len(self.tones) - 1))]
+
+    def prepare(self):
+        """Synthesise every bucket's tone now, rather than when it first plays"""
+        for tone in self.tones:
+            tone.load()
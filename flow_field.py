@@ -0,0 +1,264 @@
+"""Which way is the exit? Distance-to-exit over the cells the player can stand in.
+
+When a level loads, FlowField works out every cell the player can stand in
+and how many moves (walk, step off a ledge, jump) each one is from the
+exit, by a breadth-first search back from the exit. Reading a cue for the
+player's cell is then a dictionary lookup.
+
+Moving platforms change where the player can stand. move_platforms() is
+given their rects every frame, but only does work when one has crossed
+into another cell. Then just the cells around it are rebuilt and the
+distances are repaired from there instead of searching the whole level
+again.
+
+The moves are a tile-level approximation of Player.update (jumps reach two
+rows up and a few columns across). That's good enough to point the right
+way; level_analyzer.py does the exact frame-by-frame search.
+"""
+import heapq
+
+SOLID_TILES = (1, 2)
+LAVA = 6
+EXIT = 8
+
+# Rows up (negative is down) -> columns a jump can cover. From the jump arc
+# in player_physics: -15 (or -14) then 1 px/frame gravity at 5 px/frame
+# across, plus most of a tile for landing with only the player's edge on it
+JUMP_REACH = {2: 3, 1: 4, 0: 4, -1: 5, -2: 5, -3: 6}
+# How far a change to one cell can reach other cells' moves
+MOVE_RADIUS = max(JUMP_REACH.values())
+
+UNREACHABLE = None
+
+
+class FlowField():
+    def __init__(self, data, tile_size=40):
+        self.tile_size = tile_size
+        self.rows = len(data)
+        self.cols = len(data[0]) if data else 0
+        self.solid = set()
+        self.lava = set()
+        self.platform_cells = set() # cells a platform currently holds the player up in
+        exit_tiles = []
+        for row, tiles in enumerate(data):
+            for col, tile in enumerate(tiles):
+                if tile in SOLID_TILES:
+                    self.solid.add((col, row))
+                if tile == LAVA:
+                    self.lava.add((col, row))
+                if tile in (4, 5):
+                    self.platform_cells.add((col, row - 1))
+                if tile == EXIT:
+                    exit_tiles.append((col, row))
+        # The exit is a tile and a half tall, standing next to any of it counts
+        self.exit_cells = set()
+        for col, row in exit_tiles:
+            self.exit_cells.update([(col, row - 1), (col, row), (col, row + 1)])
+
+        self.stand = set(cell for cell in self.all_cells() if self.can_stand(cell))
+        self.moves = {}
+        self.came_from = {} # cell -> cells that can move into it
+        for cell in self.stand:
+            self.moves[cell] = self.find_moves(cell)
+        for cell, moves in self.moves.items():
+            for target, kind in moves:
+                self.came_from.setdefault(target, set()).add(cell)
+        self.distance = {}
+        self.cues = {}
+        self.search()
+
+    def all_cells(self):
+        for row in range(self.rows):
+            for col in range(self.cols):
+                yield (col, row)
+
+    def is_open(self, cell):
+        col, row = cell
+        return 0 <= col < self.cols and 0 <= row < self.rows and cell not in self.solid
+
+    def can_stand(self, cell):
+        """Room for the two tiles of the player, and something solid underneath"""
+        col, row = cell
+        if not (self.is_open(cell) and self.is_open((col, row - 1))) or cell in self.lava:
+            return False
+        return (col, row + 1) in self.solid or cell in self.platform_cells
+
+    def landing(self, col, row):
+        """Where the player ends up falling down a column from (col, row), if anywhere safe"""
+        while self.is_open((col, row)) and row < self.rows:
+            if (col, row) in self.lava:
+                return None
+            if (col, row) in self.stand:
+                return (col, row)
+            row += 1
+        return None
+
+    def find_moves(self, cell):
+        """[(cell, kind)] the player can get to in one walk, step off a ledge or jump"""
+        col, row = cell
+        moves = []
+        for side in (-1, 1):
+            beside = (col + side, row)
+            if beside in self.stand:
+                moves.append((beside, 'walk'))
+            elif self.is_open(beside) and self.is_open((col + side, row - 1)):
+                landing = self.landing(col + side, row)
+                if landing:
+                    moves.append((landing, 'walk'))
+        for rows_up, reach in JUMP_REACH.items():
+            # Head room straight above to get the jump started
+            if any(not self.is_open((col, row - 1 - up)) for up in range(1, rows_up + 1)):
+                continue
+            top = min(row, row - rows_up) - 2 # head height at the top of the arc
+            for cols_across in range(-reach, reach + 1):
+                target = (col + cols_across, row - rows_up)
+                if target == cell or target not in self.stand:
+                    continue
+                if rows_up <= 0 and abs(cols_across) <= 1:
+                    continue # walking or stepping off already gets there
+                step = 1 if cols_across > 0 else -1
+                if all(self.is_open((between, top + 1)) for between in range(col, col + cols_across + step, step)):
+                    moves.append((target, 'jump'))
+        return moves
+
+    def search(self):
+        """Breadth-first from the exit over every cell the player can stand in"""
+        self.distance = {}
+        queue = []
+        for cell in self.exit_cells & self.stand:
+            self.distance[cell] = 0
+            queue.append(cell)
+        for cell in queue:
+            for before in self.came_from.get(cell, ()):
+                if before not in self.distance:
+                    self.distance[before] = self.distance[cell] + 1
+                    queue.append(before)
+        self.cues = {}
+
+    def best_distance(self, cell):
+        """1 + the distance of the closest cell this one can move to"""
+        if cell in self.exit_cells:
+            return 0
+        best = UNREACHABLE
+        for target, kind in self.moves.get(cell, ()):
+            distance = self.distance.get(target)
+            if distance is not None and (best is None or distance + 1 < best):
+                best = distance + 1
+        return best
+
+    def repair(self, changed):
+        """Fix up distances after the moves out of the changed cells were rebuilt.
+
+        Cells whose distance may have got longer are cleared and everything
+        depending on them with it, then the cleared cells and the changed
+        ones are settled again closest first, which also carries any
+        shortcut the change opened up back through the cells before them.
+        """
+        cleared = set()
+        check = list(changed)
+        while check:
+            cell = check.pop()
+            if cell in cleared or cell not in self.distance:
+                continue
+            if cell in self.stand and self.best_distance(cell) == self.distance[cell]:
+                continue
+            cleared.add(cell)
+            old = self.distance.pop(cell)
+            for before in self.came_from.get(cell, ()):
+                if self.distance.get(before) == old + 1:
+                    check.append(before)
+
+        queue = []
+        for cell in cleared | set(changed):
+            if cell in self.stand:
+                distance = self.best_distance(cell)
+                if distance is not None:
+                    heapq.heappush(queue, (distance, cell))
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            if cell in self.distance and self.distance[cell] <= distance:
+                continue
+            self.distance[cell] = distance
+            for before in self.came_from.get(cell, ()):
+                if before in self.stand and (before not in self.distance or self.distance[before] > distance + 1):
+                    heapq.heappush(queue, (distance + 1, before))
+        # A cue depends on the distances around it too, and there are only a
+        # few hundred cells, so just start the cache again
+        self.cues = {}
+
+    def move_platforms(self, rects):
+        """Call with the platform rects after they move; cheap unless one changed cell"""
+        cells = set(self.cell_at(rect.centerx, rect.top - 1) for rect in rects)
+        if cells == self.platform_cells:
+            return False
+        changed_cells = cells ^ self.platform_cells
+        self.platform_cells = cells
+
+        # Standing cells that appeared or went away, and every cell with a
+        # move that could start or end in them: jumps from around them, and
+        # stepping off a ledge anywhere above them in the next column over
+        touched = set(changed_cells)
+        for col, row in changed_cells:
+            for near_col in range(col - MOVE_RADIUS, col + MOVE_RADIUS + 1):
+                for rows_up in JUMP_REACH:
+                    touched.add((near_col, row + rows_up))
+            for near_row in range(row + 1):
+                touched.add((col - 1, near_row))
+                touched.add((col + 1, near_row))
+        for cell in changed_cells:
+            if self.can_stand(cell):
+                self.stand.add(cell)
+            else:
+                self.stand.discard(cell)
+        rebuilt = []
+        for cell in touched:
+            old_moves = self.moves.pop(cell, [])
+            for target, kind in old_moves:
+                self.came_from.get(target, set()).discard(cell)
+            if cell in self.stand:
+                self.moves[cell] = self.find_moves(cell)
+                for target, kind in self.moves[cell]:
+                    self.came_from.setdefault(target, set()).add(cell)
+            if old_moves or cell in self.stand:
+                rebuilt.append(cell)
+        self.repair(rebuilt)
+        return True
+
+    def cell_at(self, x, bottom):
+        """Cell the player's feet are in, for a rect with this center x and bottom"""
+        return (x // self.tile_size, (bottom - 1) // self.tile_size)
+
+    def cue(self, cell):
+        """'exit', 'left', 'right', 'jump left', 'jump right', 'jump' or None"""
+        if cell not in self.cues:
+            self.cues[cell] = self.find_cue(cell)
+        return self.cues[cell]
+
+    def next_move(self, cell):
+        """(cell, kind) of the first move on the way to the exit, or None"""
+        distance = self.distance.get(cell)
+        if not distance:
+            return None
+        for target, kind in self.moves.get(cell, ()):
+            if self.distance.get(target) == distance - 1:
+                return target, kind
+        return None
+
+    def find_cue(self, cell):
+        distance = self.distance.get(cell)
+        if distance is None:
+            return None
+        if distance == 0:
+            return 'exit'
+        move = self.next_move(cell)
+        if move is None:
+            return None
+        target, kind = move
+        side = ''
+        if target[0] < cell[0]:
+            side = 'left'
+        elif target[0] > cell[0]:
+            side = 'right'
+        if kind == 'jump':
+            return f'jump {side}'.strip()
+        return side
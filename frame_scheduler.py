@@ -0,0 +1,139 @@
+"""Spread jobs that don't need to run every frame over several frames.
+
+Each job says how stale its result is allowed to get (max_staleness, in
+frames) and how much it matters (priority). Every frame run_frame() first
+runs the jobs that have hit their limit, whatever that costs, then fills
+what is left of the millisecond budget with the rest: highest priority
+first, then the ones that have waited longest. With more jobs than fit,
+frame time stays about the same and the jobs just run less often, down
+to their limit.
+
+Jobs for many entities of the same kind can share a batch function:
+register one job per entity with item=entity, and each frame the batch
+function is called once with the list of entities picked.
+
+Measured job times vary between runs, so recorded, replayed and headless
+games pass measure=False: the budget is then filled using each job's
+cost_ms estimate, and the same jobs run on the same frames every time.
+"""
+import heapq
+import time
+
+
+class Job():
+    def __init__(self, name, run, priority, max_staleness, cost_ms, item):
+        self.name = name
+        self.run = run
+        self.priority = priority
+        self.max_staleness = max(1, max_staleness)
+        self.cost_ms = cost_ms # measured average once it has run, if measuring
+        self.item = item
+        self.last_run = 0
+
+
+class FrameScheduler():
+    def __init__(self, budget_ms=2.0, measure=True):
+        self.budget_ms = budget_ms
+        self.measure = measure
+        self.jobs = {}
+        # priority -> heap of (frame due, order added, job). Only the jobs
+        # that run are looked at, so a frame costs the same however many
+        # are waiting. Removed jobs stay in the heap until they come up.
+        self.queues = {}
+        self.frame = 0
+        self.added = 0
+        # Totals for print_stats
+        self.frames_run = 0
+        self.job_runs = 0
+        self.total_ms = 0.0
+        self.worst_ms = 0.0
+        self.worst_age = 0
+
+    def add(self, name, run, priority=0, max_staleness=1, cost_ms=0.05, item=None):
+        """Register run() (or run([item, ...]) if item is given) under name, replacing any job with that name"""
+        job = Job(name, run, priority, max_staleness, cost_ms, item)
+        # Stagger when new jobs fall due, so a level's worth of them
+        # doesn't all land on the same frame
+        job.last_run = self.frame - self.added % job.max_staleness
+        self.jobs[name] = job
+        self.queue(job)
+
+    def queue(self, job):
+        self.added += 1
+        heapq.heappush(self.queues.setdefault(job.priority, []),
+                       (job.last_run + job.max_staleness, self.added, job))
+
+    def remove(self, name):
+        self.jobs.pop(name, None)
+
+    def remove_batch(self, run):
+        """Drop every job that uses run, e.g. one per blob of a level that has gone"""
+        for name in [name for name, job in self.jobs.items() if job.run is run]:
+            del self.jobs[name]
+
+    def next_job(self, queue):
+        """The queue's earliest due job that is still registered, or None"""
+        while queue and self.jobs.get(queue[0][2].name) is not queue[0][2]:
+            heapq.heappop(queue)
+        return queue[0][2] if queue else None
+
+    def run_frame(self):
+        self.frame += 1
+        priorities = sorted(self.queues, reverse=True)
+
+        # Everything at its staleness limit runs, then whatever fits in the budget,
+        # highest priority first and the longest waiting first within that
+        picked = []
+        spent = 0.0
+        for priority in priorities:
+            queue = self.queues[priority]
+            job = self.next_job(queue)
+            while job is not None and job.last_run + job.max_staleness <= self.frame:
+                picked.append(heapq.heappop(queue)[2])
+                spent += job.cost_ms
+                job = self.next_job(queue)
+        for priority in priorities:
+            queue = self.queues[priority]
+            job = self.next_job(queue)
+            while job is not None and spent + job.cost_ms <= self.budget_ms:
+                picked.append(heapq.heappop(queue)[2])
+                spent += job.cost_ms
+                job = self.next_job(queue)
+            if job is not None:
+                break
+
+        start = time.perf_counter()
+        batches = {} # batch function -> jobs, in the order they were picked
+        for job in picked:
+            self.worst_age = max(self.worst_age, self.frame - job.last_run)
+            if job.item is None:
+                self.run_job(job.run, [job], ())
+            else:
+                batches.setdefault(job.run, []).append(job)
+        for run, jobs in batches.items():
+            self.run_job(run, jobs, ([job.item for job in jobs],))
+        for job in picked:
+            self.queue(job)
+        frame_ms = (time.perf_counter() - start) * 1000
+
+        self.frames_run += 1
+        self.job_runs += len(picked)
+        self.total_ms += frame_ms
+        self.worst_ms = max(self.worst_ms, frame_ms)
+
+    def run_job(self, run, jobs, args):
+        start = time.perf_counter()
+        run(*args)
+        for job in jobs:
+            job.last_run = self.frame
+        if self.measure:
+            each_ms = (time.perf_counter() - start) * 1000 / len(jobs)
+            for job in jobs:
+                job.cost_ms += (each_ms - job.cost_ms) * 0.1
+
+    def print_stats(self):
+        if not self.frames_run:
+            return
+        print(f"Scheduled jobs: {len(self.jobs)} registered, {self.job_runs / self.frames_run:.1f} run per frame, "
+              f"mean {self.total_ms / self.frames_run:.3f} ms, worst {self.worst_ms:.3f} ms "
+              f"(budget {self.budget_ms} ms), stalest {self.worst_age} frames")
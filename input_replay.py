@@ -0,0 +1,205 @@
+"""Record and replay the input the game reads each frame.
+
+A recording is a small gzip'd text file:
+
+    line 1            JSON header (format version, seed, fps, start level, ...)
+    K <frames> <mask> run of frames with the same SPACE/LEFT/RIGHT key mask
+    E <frame> <json>  one discrete event (pause key, menu clicks, typing, ...)
+
+Held keys are run-length encoded, so a level played in a few hundred key
+changes stays a few KB no matter how many frames it lasted.
+"""
+import gzip
+import json
+
+import pygame
+
+from player_physics import LEFT_BIT, RIGHT_BIT, SPACE_BIT
+
+FORMAT_VERSION = 1
+
+# Keys Player.update reads from pygame.key.get_pressed(), packed into one mask
+KEY_BITS = (
+    (pygame.K_SPACE, SPACE_BIT),
+    (pygame.K_LEFT, LEFT_BIT),
+    (pygame.K_RIGHT, RIGHT_BIT),
+)
+
+# Events the game reacts to and the attributes needed to rebuild them
+EVENT_FIELDS = {
+    pygame.QUIT: ('quit', ()),
+    pygame.KEYDOWN: ('keydown', ('key', 'mod', 'unicode', 'scancode')),
+    pygame.KEYUP: ('keyup', ('key', 'mod', 'scancode')),
+    pygame.MOUSEBUTTONDOWN: ('mousedown', ('pos', 'button')),
+    pygame.MOUSEBUTTONUP: ('mouseup', ('pos', 'button')),
+    pygame.MOUSEMOTION: ('motion', ('pos', 'rel', 'buttons')),
+}
+EVENT_TYPES = {name: event_type for event_type, (name, fields) in EVENT_FIELDS.items()}
+
+
+def key_mask(pressed):
+    mask = 0
+    for key, bit in KEY_BITS:
+        if pressed[key]:
+            mask |= bit
+    return mask
+
+
+class KeyState():
+    """Stands in for pygame.key.get_pressed() for the keys the game reads"""
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        for bound_key, bit in KEY_BITS:
+            if bound_key == key:
+                return bool(self.mask & bit)
+        return False
+
+
+def encode_event(event):
+    name, fields = EVENT_FIELDS[event.type]
+    data = {'type': name}
+    for field in fields:
+        value = getattr(event, field, None)
+        if isinstance(value, tuple):
+            value = list(value)
+        data[field] = value
+    return data
+
+
+def decode_event(data):
+    attrs = {}
+    for field, value in data.items():
+        if field == 'type':
+            continue
+        attrs[field] = tuple(value) if isinstance(value, list) else value
+    return pygame.event.Event(EVENT_TYPES[data['type']], attrs)
+
+
+def should_record(event):
+    if event.type not in EVENT_FIELDS:
+        return False
+    # Plain mouse movement only drives hover effects, drags are what matter
+    if event.type == pygame.MOUSEMOTION:
+        return any(event.buttons)
+    return True
+
+
+class InputRecorder():
+    def __init__(self, path, header):
+        self.path = path
+        self.header = dict(header, version=FORMAT_VERSION)
+        self.runs = [] # [frames, mask]
+        self.events = [] # (frame, encoded event)
+        self.frame = 0
+
+    def record(self, mask, events):
+        if self.runs and self.runs[-1][1] == mask:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        for event in events:
+            if should_record(event):
+                self.events.append((self.frame, encode_event(event)))
+        self.frame += 1
+
+    def close(self):
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps(self.header) + '\n')
+            for frames, mask in self.runs:
+                f.write(f'K {frames} {mask}\n')
+            for frame, data in self.events:
+                f.write(f'E {frame} {json.dumps(data, separators=(",", ":"))}\n')
+
+
+class InputReplayer():
+    def __init__(self, path):
+        self.runs = []
+        self.events = {} # frame -> [encoded events]
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            self.header = json.loads(f.readline())
+            if self.header.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported replay format in {path}: {self.header.get('version')}")
+            for line in f:
+                kind, frame, rest = line.rstrip('\n').split(' ', 2)
+                if kind == 'K':
+                    self.runs.append((int(frame), int(rest)))
+                elif kind == 'E':
+                    self.events.setdefault(int(frame), []).append(json.loads(rest))
+        self.total_frames = sum(frames for frames, mask in self.runs)
+        self.frame = 0
+        self.run_index = 0
+        self.run_left = self.runs[0][0] if self.runs else 0
+
+    @property
+    def finished(self):
+        return self.frame >= self.total_frames
+
+    def next_frame(self):
+        """Return (key mask, events) for the next recorded frame"""
+        while self.run_left == 0 and self.run_index < len(self.runs) - 1:
+            self.run_index += 1
+            self.run_left = self.runs[self.run_index][0]
+        mask = self.runs[self.run_index][1] if self.runs else 0
+        self.run_left -= 1
+        events = [decode_event(data) for data in self.events.get(self.frame, ())]
+        self.frame += 1
+        return mask, events
+
+
+class LiveInput():
+    """Keyboard and mouse, read once per frame.
+
+    to_logical maps mouse positions from the window to the game's own
+    coordinates, for a window that isn't the game's size.
+    """
+    finished = False
+
+    def __init__(self, to_logical=None):
+        self.to_logical = to_logical
+
+    def poll(self):
+        events = pygame.event.get()
+        if self.to_logical is not None:
+            for event in events:
+                if hasattr(event, 'pos'):
+                    event.pos = self.to_logical(event.pos)
+        return events, pygame.key.get_pressed()
+
+    def close(self):
+        pass
+
+
+class RecordingInput(LiveInput):
+    def __init__(self, to_logical, recorder):
+        LiveInput.__init__(self, to_logical)
+        self.recorder = recorder
+
+    def poll(self):
+        events, pressed = LiveInput.poll(self)
+        mask = key_mask(pressed)
+        self.recorder.record(mask, events)
+        return events, KeyState(mask)
+
+    def close(self):
+        self.recorder.close()
+
+
+class ReplayInput():
+    """Feeds a recording back in place of the keyboard and mouse"""
+    def __init__(self, replayer):
+        self.replayer = replayer
+
+    @property
+    def finished(self):
+        return self.replayer.finished
+
+    def poll(self):
+        # Still drain the real queue so the window stays responsive and can be closed
+        live_quit = [event for event in pygame.event.get() if event.type == pygame.QUIT]
+        mask, events = self.replayer.next_frame()
+        return events + live_quit, KeyState(mask)
+
+    def close(self):
+        pass
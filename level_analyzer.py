@@ -0,0 +1,571 @@
+"""Check levels are solvable and work out their par time, offline.
+
+Searches the positions the player can reach from the start, using the
+game's own movement code (player_physics.step), with blobs and moving
+platforms stepped exactly as the game steps them. For each level it
+reports whether the exit can be reached, the fewest frames it finds, and
+whether that fits in the level timer:
+
+    python level_analyzer.py                  # every level
+    python level_analyzer.py 3 4 --workers 4
+    python level_analyzer.py --file my_level_data --json
+    python level_analyzer.py 4 --routes routes/  # then --replay routes/level4_par.rec
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+import player_physics
+from level_data import PLAYER_START, get_level_duration, load_level_data, tile_size
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PLAYER_SIZE = (40, 80) # guy images are scaled to this in Player.reset
+BLOB_SIZE = (22, 22) # img/blob1.png
+FPS = 60
+COUNTDOWN_FRAMES = 3 * FPS
+MAX_LEVELS = 7
+
+# The searches keep one state per cell, vel_y and in_air: the first state to
+# get to a CELL_WIDTH by cell-height cell is expanded and later ones are
+# dropped. Off moving platforms the player only moves MOVE_SPEED px sideways,
+# so that is exact across, and standing states keep their exact height.
+# analyze() searches tall cells first, which is quick, then short ones for a
+# faster route.
+CELL_WIDTH = player_physics.MOVE_SPEED
+COARSE_CELL_HEIGHT = 8
+FINE_CELL_HEIGHT = 2
+
+# How close to a blob's or platform's path the timed search keeps track of
+# where movers are in their cycle for a standing player, so it can wait
+# there for one to come round (about one frame of movement plus the distance
+# a platform snaps the player onto itself)
+TIMING_REACH = tile_size // 2
+
+# How far one step can move the player (sideways, up, down), so whether the
+# next step can meet a mover is a single rect test
+STEP_REACH = (player_physics.MOVE_SPEED, 15, player_physics.TERMINAL_VELOCITY)
+
+# The timed search only times movers whose path comes this close to open
+# space the untimed search never got to (a jump's height): anywhere else,
+# catching a mover at the right moment only gets the player somewhere they
+# could already get to
+FRONTIER_REACH = 3 * tile_size
+
+EXPANDED = -1 # search()'s best frame for a state that has been expanded
+
+
+def mover_cycle():
+    """(offset, move_direction) of a blob or platform after 0, 1, 2, ... updates.
+
+    Enemy.update and Platform.update go 51 px out, 102 back and 51 home, so
+    everything that moves is back at its start after one shared cycle.
+    """
+    cycle = []
+    offset = 0
+    move_counter = 0
+    move_direction = 1
+    while True:
+        cycle.append((offset, move_direction))
+        offset += move_direction
+        move_counter += 1
+        if abs(move_counter) > 50:
+            move_direction *= -1
+            move_counter *= -1
+        if (offset, move_counter, move_direction) == (0, 0, 1):
+            return cycle
+
+MOVER_CYCLE = mover_cycle()
+
+
+class LevelModel():
+    """The parts of a World that matter for movement, as plain rects"""
+    def __init__(self, data, level):
+        self.level = level
+        self.jump_power = player_physics.jump_power(level)
+        self.duration = get_level_duration(level)
+        self.floor = len(data) * tile_size
+        tiles = []
+        blobs = []
+        platforms = [] # (rect, move_x, move_y)
+        self.lava = []
+        self.exits = []
+        self.open_cells = set()
+        for row, tiles_in_row in enumerate(data):
+            for col, tile in enumerate(tiles_in_row):
+                x = col * tile_size
+                y = row * tile_size
+                if tile == 1 or tile == 2:
+                    tiles.append((x, y, tile_size, tile_size))
+                else:
+                    self.open_cells.add((col, row))
+                if tile == 3:
+                    blobs.append((x, y + 15) + BLOB_SIZE)
+                if tile == 4:
+                    platforms.append(((x, y, tile_size, tile_size // 2), 1, 0))
+                if tile == 5:
+                    platforms.append(((x, y, tile_size, tile_size // 2), 0, 1))
+                if tile == 6:
+                    self.lava.append((x, y + (tile_size // 2), tile_size, tile_size // 2))
+                if tile == 8:
+                    self.exits.append((x, y - (tile_size // 2), tile_size, int(tile_size * 1.5)))
+        self.tiles = player_physics.TileGrid(tiles, tile_size)
+        self.movers = [(rect, 1, 0) for rect in blobs] + platforms
+        self.blob_count = len(blobs)
+        self.fastest = player_physics.MOVE_SPEED + (1 if any(move_x for rect, move_x, move_y in platforms) else 0)
+
+        # What the player can bump into or touch, by tile cell, so a step
+        # that meets none of it is worked out without step()
+        self.solid = {} # (col, row) -> rects of tiles, lava and exits
+        for rect in tiles + self.lava + self.exits:
+            x, y, width, height = rect
+            for col in range(x // tile_size, (x + width - 1) // tile_size + 1):
+                for row in range(y // tile_size, (y + height - 1) // tile_size + 1):
+                    self.solid.setdefault((col, row), []).append(rect)
+
+        # Positions only depend on the frame number modulo the cycle, so work
+        # them out once per phase rather than once per searched state
+        self.period = len(MOVER_CYCLE) if self.movers else 1
+        self.blobs_at = []
+        self.platforms_at = []
+        for phase in range(self.period):
+            offset, move_direction = MOVER_CYCLE[phase]
+            self.blobs_at.append([(x + offset, y, width, height) for x, y, width, height in blobs])
+            self.platforms_at.append([((x + offset * move_x, y + offset * move_y, width, height), move_x, move_direction)
+                                      for (x, y, width, height), move_x, move_y in platforms])
+        self.offset_range = (min(offset for offset, move_direction in MOVER_CYCLE),
+                             max(offset for offset, move_direction in MOVER_CYCLE))
+        self.time_movers(self.movers)
+
+        self.flag_cache = {}
+        self.area_cache = {}
+        self.exit_cache = {}
+        # Steps worked out by step(), for search(); the same for every search
+        # of the level, timed or not. With a platform within reach they also
+        # depend on where it is, so those are kept per phase
+        self.steps = {} # (x, y, vel_y, in_air) -> ((next state, (space, left, right)), ...)
+        self.platform_steps = {} # ((x, y, vel_y, in_air), phase) -> the same
+
+    def sweep(self, rect, move_x, move_y, pad):
+        """Everything a mover covers over its cycle, padded by pad all round"""
+        x, y, width, height = rect
+        lowest, highest = self.offset_range
+        return (x + lowest * move_x - pad, y + lowest * move_y - pad,
+                width + (highest - lowest) * move_x + 2 * pad, height + (highest - lowest) * move_y + 2 * pad)
+
+    def time_movers(self, movers):
+        """Set the blobs and platforms the timed search keeps track of the timing of"""
+        self.timed = movers
+        width, height = PLAYER_SIZE
+        side, up, down = STEP_REACH
+        # Where each one is on each phase, grown by a step and the player's
+        # size, so a player whose top left is strictly inside can meet it on
+        # the next step
+        self.timed_at = []
+        for phase in range(self.period):
+            offset = MOVER_CYCLE[phase][0]
+            self.timed_at.append([(x + offset * move_x - width - side, y + offset * move_y - height - down,
+                                   x + offset * move_x + mover_width + side, y + offset * move_y + mover_height + up)
+                                  for (x, y, mover_width, mover_height), move_x, move_y in movers])
+        self.timed_paths = [self.sweep(rect, move_x, move_y, TIMING_REACH) for rect, move_x, move_y in movers]
+        # Tile cells where a player's top left can be that close to one on
+        # some phase, or a step away from that, so most states need no rect
+        # tests at all
+        reach = TIMING_REACH + 2 * max(STEP_REACH)
+        self.timed_cells = set()
+        for rect, move_x, move_y in movers:
+            x, y, sweep_width, sweep_height = self.sweep(rect, move_x, move_y, reach)
+            for col in range((x - width) // tile_size, (x + sweep_width) // tile_size + 1):
+                for row in range((y - height) // tile_size, (y + sweep_height) // tile_size + 1):
+                    self.timed_cells.add((col, row))
+        self.path_cache = {}
+
+    def time_frontier(self, expanded_states):
+        """Only time the movers whose path comes within FRONTIER_REACH of open space no state in expanded_states touches"""
+        width, height = PLAYER_SIZE
+        spans = {(x // tile_size, (x + width - 1) // tile_size, y // tile_size, (y + height - 1) // tile_size)
+                 for frame, (x, y, vel_y, in_air), seen_key in expanded_states}
+        reached = set()
+        for col_low, col_high, row_low, row_high in spans:
+            for col in range(col_low, col_high + 1):
+                for row in range(row_low, row_high + 1):
+                    reached.add((col, row))
+        unreached = self.open_cells - reached
+        frontier = []
+        for mover in self.movers:
+            area = self.sweep(*mover, FRONTIER_REACH)
+            if any(player_physics.collides(area, col * tile_size, row * tile_size, tile_size, tile_size)
+                   for col, row in unreached):
+                frontier.append(mover)
+        self.time_movers(frontier)
+
+    def by_path(self, x, y):
+        """Whether a timed blob or platform comes within TIMING_REACH of this position at some point in its cycle"""
+        near = self.path_cache.get((x, y))
+        if near is None:
+            width, height = PLAYER_SIZE
+            near = any(player_physics.collides(path, x, y, width, height) for path in self.timed_paths)
+            self.path_cache[(x, y)] = near
+        return near
+
+    def step_timed(self, state, frame):
+        """Whether a step from state on this frame can end up where the timed search keys states by phase"""
+        x, y, vel_y, in_air = state
+        if (x // tile_size, y // tile_size) not in self.timed_cells:
+            return False
+        side, up, down = STEP_REACH
+        for left, top, right, bottom in self.timed_at[(frame + 1) % self.period]:
+            if left - side < x < right + side and top - down < y < bottom + up:
+                return True
+        width, height = PLAYER_SIZE
+        return any(player_physics.collides(path, x - side, y - up, width + 2 * side, height + up + down)
+                   for path in self.timed_paths)
+
+    def position_flags(self, x, y):
+        """(on an exit, in lava), cached per position"""
+        flags = self.flag_cache.get((x, y))
+        if flags is None:
+            width, height = PLAYER_SIZE
+            flags = (any(player_physics.collides(rect, x, y, width, height) for rect in self.exits),
+                     any(player_physics.collides(rect, x, y, width, height) for rect in self.lava))
+            self.flag_cache[(x, y)] = flags
+        return flags
+
+    def around(self, area):
+        """(solid rects, indexes into platforms_at, whether a blob can be there) for a (left, right, top, bottom) range of tile cells"""
+        found = self.area_cache.get(area)
+        if found is None:
+            col_low, col_high, row_low, row_high = area
+            rects = set()
+            for col in range(col_low, col_high + 1):
+                for row in range(row_low, row_high + 1):
+                    rects.update(self.solid.get((col, row), ()))
+            box = (col_low * tile_size, row_low * tile_size,
+                   (col_high - col_low + 1) * tile_size, (row_high - row_low + 1) * tile_size)
+            reaching = [index for index, mover in enumerate(self.movers)
+                        if player_physics.collides(self.sweep(*mover, 0), *box)]
+            found = (tuple(rects), tuple(index - self.blob_count for index in reaching if index >= self.blob_count),
+                     any(index < self.blob_count for index in reaching))
+            self.area_cache[area] = found
+        return found
+
+    def frames_to_exit(self, x):
+        """Lower bound on the frames left, from the horizontal gap to the nearest exit"""
+        best = self.exit_cache.get(x)
+        if best is None:
+            width = PLAYER_SIZE[0]
+            for exit_x, exit_y, exit_width, exit_height in self.exits:
+                gap = max(0, exit_x - (x + width) + 1, x - (exit_x + exit_width) + 1)
+                frames = -(-gap // self.fastest)
+                if best is None or frames < best:
+                    best = frames
+            self.exit_cache[x] = best
+        return best
+
+
+def search(model, max_frames, timed, keep_route=False, cell_height=FINE_CELL_HEIGHT, explored=None):
+    """Fewest frames from the start to touching an exit that the search finds, or None.
+
+    A* over player states (x, y, vel_y, in_air): the path cost is frames
+    played and the heuristic never overestimates, so the first exit popped
+    is the fastest one found. Blobs and platforms are placed for the frame
+    each state is reached on, so every route found can really be played.
+    States whose estimate is past max_frames are never queued.
+    To keep the state space small:
+      - jumped is always treated as released. Anything reachable while the
+        game still waits for SPACE to come back up is also reachable after
+        releasing it, so those states add nothing.
+      - in the air SPACE does nothing, so only the three run directions are
+        tried there.
+      - states in the same cell (CELL_WIDTH by cell_height px) with the same
+        vel_y and in_air are one state, and only the first one there is
+        expanded. It is never expanded again.
+      - with timed set, states are also told apart by where the movers are
+        in their cycle, but only while a timed blob or platform is within a
+        step of the player, or the player is standing anywhere one passes
+        by. That finds routes that wait for a platform to come round.
+        Everywhere else the phase is dropped: a jump past a platform's path
+        with the platform somewhere else is the same jump whenever it's made.
+      - steps through open air with no mover within reach are worked out
+        without step(), and the rest are memoized.
+    explored is what a failed search returned. Its states are not expanded
+    again, except where a step from one can meet a timed mover.
+    Returns (frames or None, states expanded, route, explored): route is the
+    (space, left, right) input for each frame if keep_route is set, and
+    explored is set if no exit was found.
+    """
+    if not model.exits:
+        return None, 0, None, None
+    width, height = PLAYER_SIZE
+    speed = player_physics.MOVE_SPEED
+    gravity = player_physics.GRAVITY
+    terminal = player_physics.TERMINAL_VELOCITY
+    jump_dy = model.jump_power + gravity
+    period = model.period
+    steps = model.steps
+    platform_steps = model.platform_steps
+    timed_at = model.timed_at
+    timed_cells = model.timed_cells
+
+    def key(state, phase):
+        x, y, vel_y, in_air = state
+        cell = (x // CELL_WIDTH, y // cell_height if in_air else y, vel_y, in_air)
+        if timed and (x // tile_size, y // tile_size) in timed_cells:
+            if not in_air and model.by_path(x, y):
+                return cell + (phase,)
+            for left, top, right, bottom in timed_at[phase]:
+                if left < x < right and top < y < bottom:
+                    return cell + (phase,)
+        return cell
+
+    # Estimates are whole frames, so the queue is a list of them rather than
+    # a heap. Each holds (frame, state, key) and pops the last one pushed
+    queue = [[] for estimate in range(max_frames + 1)]
+    if explored is None:
+        start = (PLAYER_START[0], PLAYER_START[1], 0, True)
+        start_key = key(start, 0)
+        best = {start_key: 0}
+        came_from = {} # state key -> (previous state key, (space, left, right))
+        if model.frames_to_exit(start[0]) <= max_frames:
+            queue[model.frames_to_exit(start[0])].append((0, start, start_key))
+    else:
+        best, came_from, expanded_before = explored
+        best = dict(best)
+        came_from = dict(came_from)
+        for frame, state, seen_key in expanded_before:
+            estimate = frame + model.frames_to_exit(state[0])
+            if estimate <= max_frames and model.step_timed(state, frame):
+                best[seen_key] = frame
+                queue[estimate].append((frame, state, seen_key))
+    expanded_states = []
+    estimate = 0
+    while estimate <= max_frames:
+        if not queue[estimate]:
+            estimate += 1
+            continue
+        frame, state, seen_key = queue[estimate].pop()
+        if best[seen_key] != frame:
+            continue
+        best[seen_key] = EXPANDED
+        x, y, vel_y, in_air = state
+        phase = frame % period
+
+        # Everything step() can run into this frame is inside left..right, top..bottom
+        fall = min(vel_y + gravity, terminal)
+        left = x - speed
+        right = x + width + speed
+        top = min(y, y + (fall if in_air else jump_dy))
+        bottom = y + height + max(0, fall)
+        rects, platform_indexes, blob_near = model.around(
+            (left // tile_size, (right - 1) // tile_size, top // tile_size, (bottom - 1) // tile_size))
+        clear = True
+        for rect_x, rect_y, rect_width, rect_height in rects:
+            if rect_x < right and left < rect_x + rect_width and rect_y < bottom and top < rect_y + rect_height:
+                clear = False
+                break
+        # The game checks the exit, blobs and lava against the rect before it
+        # moves, and blobs and platforms have already moved this frame
+        if not clear:
+            on_exit, in_lava = model.position_flags(x, y)
+            if on_exit:
+                route = None
+                if keep_route:
+                    route = []
+                    while seen_key in came_from:
+                        seen_key, keys = came_from[seen_key]
+                        route.append(keys)
+                    route.reverse()
+                return frame, len(expanded_states), route, None
+            if in_lava:
+                continue
+        if blob_near and any(player_physics.collides(blob, x, y, width, height) for blob in model.blobs_at[phase]):
+            continue
+        expanded_states.append((frame, state, seen_key))
+
+        platforms = []
+        for index in platform_indexes:
+            platform = model.platforms_at[phase][index]
+            platform_x, platform_y, platform_width, platform_height = platform[0]
+            if platform_x < right and left < platform_x + platform_width and platform_y < bottom and top < platform_y + platform_height:
+                platforms.append(platform)
+        if platforms:
+            moves = platform_steps.get((state, phase))
+        elif in_air and clear:
+            # Nothing to hit: the same as step() gives, without the calls
+            moves = (((x, y + fall, fall, True), (False, False, False)),
+                     ((x - speed, y + fall, fall, True), (False, True, False)),
+                     ((x + speed, y + fall, fall, True), (False, False, True)))
+        else:
+            moves = steps.get(state)
+        if moves is None:
+            moves = []
+            for space in ((False,) if in_air else (False, True)):
+                for left_key, right_key in ((False, False), (True, False), (False, True)):
+                    new_x, new_y, new_vel_y, new_in_air, jumped, did_jump = player_physics.step(
+                        (x, y, width, height), vel_y, in_air, False, left_key, right_key, space,
+                        model.jump_power, model.tiles, platforms)
+                    new_state = (new_x, new_y, new_vel_y, new_in_air)
+                    if all(new_state != move[0] for move in moves):
+                        moves.append((new_state, (space, left_key, right_key)))
+            if platforms:
+                platform_steps[(state, phase)] = moves
+            else:
+                steps[state] = moves
+
+        next_frame = frame + 1
+        next_phase = next_frame % period
+        for new_state, keys in moves:
+            if new_state[1] > model.floor:
+                continue # fell out of the level
+            new_estimate = next_frame + model.frames_to_exit(new_state[0])
+            if new_estimate > max_frames:
+                continue
+            new_key = key(new_state, next_phase)
+            if best.get(new_key, next_frame + 1) <= next_frame:
+                continue
+            best[new_key] = next_frame
+            if keep_route:
+                came_from[new_key] = (seen_key, keys)
+            queue[new_estimate].append((next_frame, new_state, new_key))
+            estimate = min(estimate, new_estimate)
+    return None, len(expanded_states), None, (best, came_from, expanded_states)
+
+
+def analyze(data, level, name=None, max_frames=None, route_path=None):
+    model = LevelModel(data, level)
+    time_limit = model.duration * FPS
+    if max_frames is None:
+        # Look past the timer so a level that is too tight still gets a par time
+        max_frames = time_limit * 2
+    start = time.perf_counter()
+    keep_route = route_path is not None
+    # Most levels don't need any waiting for platforms, so first search
+    # without the timing, in tall cells, which is quick. If that gets out, a
+    # search in short cells finds a route at least as fast
+    frames, expanded, route, explored = search(model, max_frames, False, keep_route, COARSE_CELL_HEIGHT)
+    if frames is not None:
+        fine_frames, fine_expanded, fine_route, unused = search(model, frames, False, keep_route, FINE_CELL_HEIGHT)
+        expanded += fine_expanded
+        if fine_frames is not None:
+            frames, route = fine_frames, fine_route
+    timed = frames is None and model.period > 1
+    if timed:
+        # Only if it finds no way out is it worth tracking the timing, of the
+        # movers next to where it never got, carrying on from where it got to.
+        # Look only as far as the level timer first, IDA* style: states that
+        # can't reach the exit in time are never queued, and only a level
+        # that can't be finished in time pays for looking further for a par
+        model.time_frontier(explored[2])
+        for horizon in sorted({min(time_limit, max_frames), max_frames}):
+            frames, timed_expanded, route, unused = search(model, horizon, True, keep_route, COARSE_CELL_HEIGHT, explored)
+            expanded += timed_expanded
+            if frames is not None:
+                break
+    if route is not None:
+        save_route(route_path, route, level)
+    return {
+        'level': level,
+        'name': name or f'level {level}',
+        'exits': len(model.exits),
+        'reachable': frames is not None,
+        'par_frames': frames,
+        'par_seconds': frames / FPS if frames is not None else None,
+        'duration': model.duration,
+        'fits': frames is not None and frames < time_limit,
+        'timed_search': timed,
+        'searched_frames': max_frames,
+        'states': expanded,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def save_route(path, route, level):
+    """Write the par route as a recording the game can play back with --replay"""
+    from input_replay import InputRecorder
+    recorder = InputRecorder(path, {'seed': 0, 'fps': FPS, 'level': level, 'player_name': 'Par'})
+    # Nothing moves during the countdown, the route starts on the frame it ends
+    for frame in range(COUNTDOWN_FRAMES):
+        recorder.record(0, [])
+    for space, left, right in route:
+        recorder.record((1 if space else 0) | (2 if left else 0) | (4 if right else 0), [])
+    # A few more frames so the replay gets to see the exit being touched
+    for frame in range(FPS):
+        recorder.record(0, [])
+    recorder.close()
+
+
+def analyze_job(job):
+    """Pool worker: job is (level, level file or None, max frames, route file or None)"""
+    level, level_path, max_frames, route_path = job
+    if level_path:
+        with open(level_path, 'rb') as pickle_in:
+            data = pickle.load(pickle_in)
+        name = os.path.basename(level_path)
+    else:
+        data = load_level_data(level, GAME_DIR)
+        name = None
+    return analyze(data, level, name, max_frames, route_path)
+
+
+def analyze_pack(jobs, workers):
+    """Analyze many levels at once, one level per task, results in job order"""
+    if workers <= 1 or len(jobs) <= 1:
+        return [analyze_job(job) for job in jobs]
+    with Pool(processes=min(workers, len(jobs))) as pool:
+        return pool.map(analyze_job, jobs, chunksize=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check levels can be finished and work out their par times')
+    parser.add_argument('levels', nargs='*', type=int, help='level numbers (default: 1 to %d)' % MAX_LEVELS)
+    parser.add_argument('--file', action='append', default=[], metavar='FILE',
+                        help='analyze a level editor file, can be given more than once')
+    parser.add_argument('--file-level', type=int, default=1,
+                        help='level number used for --file levels (sets jump power and timer)')
+    parser.add_argument('--max-frames', type=int, help='search horizon (default: twice the level timer)')
+    parser.add_argument('--workers', type=int, default=cpu_count(), help='worker processes (default: one per core)')
+    parser.add_argument('--routes', metavar='DIR',
+                        help='save each par route to DIR as a recording for the game\'s --replay')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    levels = [(level, None) for level in args.levels]
+    levels += [(args.file_level, level_path) for level_path in args.file]
+    if not levels:
+        levels = [(level, None) for level in range(1, MAX_LEVELS + 1)]
+    jobs = []
+    for level, level_path in levels:
+        route_path = None
+        if args.routes:
+            name = os.path.basename(level_path) if level_path else f'level{level}'
+            route_path = os.path.join(args.routes, f'{name}_par.rec')
+        jobs.append((level, level_path, args.max_frames, route_path))
+    if args.routes:
+        os.makedirs(args.routes, exist_ok=True)
+
+    results = analyze_pack(jobs, args.workers)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    for result in results:
+        if not result['exits']:
+            verdict = 'no exit'
+        elif not result['reachable']:
+            verdict = f"exit not reachable within {result['searched_frames']} frames"
+        else:
+            verdict = (f"par {result['par_seconds']:.2f} s ({result['par_frames']} frames) of {result['duration']} s"
+                       + ('' if result['fits'] else '  TOO SLOW'))
+        print(f"{result['name']:<14} {verdict:<48} {result['states']:>8} states  {result['seconds']:.2f} s")
+
+    if any(not result['fits'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import pygame
 import pickle
 from os import path
+from assets import load_font, load_image
 
 
 pygame.init()
@@ -20,20 +21,18 @@ pygame.display.set_caption('Level Editor')
 
 
 #load images
-sun_img = pygame.image.load('img/sun.png')
-sun_img = pygame.transform.scale(sun_img, (tile_size, tile_size))
-bg_img = pygame.image.load('img/sky.png')
-bg_img = pygame.transform.scale(bg_img, (screen_width, screen_height - margin))
-dirt_img = pygame.image.load('img/dirt.png')
-grass_img = pygame.image.load('img/grass.png')
-blob_img = pygame.image.load('img/blob.png')
-platform_x_img = pygame.image.load('img/platform_x.png')
-platform_y_img = pygame.image.load('img/platform_y.png')
-lava_img = pygame.image.load('img/lava.png')
-coin_img = pygame.image.load('img/coin.png')
-exit_img = pygame.image.load('img/exit.png')
-save_img = pygame.image.load('img/save_btn.png')
-load_img = pygame.image.load('img/load_btn.png')
+sun_img = load_image('img/sun.png', (tile_size, tile_size))
+bg_img = load_image('img/sky.png', (screen_width, screen_height - margin))
+dirt_img = load_image('img/dirt.png', (tile_size, tile_size))
+grass_img = load_image('img/grass.png', (tile_size, tile_size))
+blob_img = load_image('img/blob.png', (tile_size, int(tile_size * 0.75)))
+platform_x_img = load_image('img/platform_x.png', (tile_size, tile_size // 2))
+platform_y_img = load_image('img/platform_y.png', (tile_size, tile_size // 2))
+lava_img = load_image('img/lava.png', (tile_size, tile_size // 2))
+coin_img = load_image('img/coin.png', (tile_size // 2, tile_size // 2))
+exit_img = load_image('img/exit.png', (tile_size, int(tile_size * 1.5)))
+save_img = load_image('img/save_btn.png')
+load_img = load_image('img/load_btn.png')
 
 
 #define game variables
@@ -44,7 +43,7 @@ level = 1
 white = (255, 255, 255)
 green = (144, 201, 120)
 
-font = pygame.font.SysFont('Futura', 24)
+font = load_font('Futura', 24)
 
 #create empty tile list
 world_data = []
@@ -78,35 +77,35 @@ def draw_world():
 			if world_data[row][col] > 0:
 				if world_data[row][col] == 1:
 					#dirt blocks
-					img = pygame.transform.scale(dirt_img, (tile_size, tile_size))
+					img = dirt_img
 					screen.blit(img, (col * tile_size, row * tile_size))
 				if world_data[row][col] == 2:
 					#grass blocks
-					img = pygame.transform.scale(grass_img, (tile_size, tile_size))
+					img = grass_img
 					screen.blit(img, (col * tile_size, row * tile_size))
 				if world_data[row][col] == 3:
 					#enemy blocks
-					img = pygame.transform.scale(blob_img, (tile_size, int(tile_size * 0.75)))
+					img = blob_img
 					screen.blit(img, (col * tile_size, row * tile_size + (tile_size * 0.25)))
 				if world_data[row][col] == 4:
 					#horizontally moving platform
-					img = pygame.transform.scale(platform_x_img, (tile_size, tile_size // 2))
+					img = platform_x_img
 					screen.blit(img, (col * tile_size, row * tile_size))
 				if world_data[row][col] == 5:
 					#vertically moving platform
-					img = pygame.transform.scale(platform_y_img, (tile_size, tile_size // 2))
+					img = platform_y_img
 					screen.blit(img, (col * tile_size, row * tile_size))
 				if world_data[row][col] == 6:
 					#lava
-					img = pygame.transform.scale(lava_img, (tile_size, tile_size // 2))
+					img = lava_img
 					screen.blit(img, (col * tile_size, row * tile_size + (tile_size // 2)))
 				if world_data[row][col] == 7:
 					#coin
-					img = pygame.transform.scale(coin_img, (tile_size // 2, tile_size // 2))
+					img = coin_img
 					screen.blit(img, (col * tile_size + (tile_size // 4), row * tile_size + (tile_size // 4)))
 				if world_data[row][col] == 8:
 					#exit
-					img = pygame.transform.scale(exit_img, (tile_size, int(tile_size * 1.5)))
+					img = exit_img
 					screen.blit(img, (col * tile_size, row * tile_size - (tile_size // 2)))
 
 
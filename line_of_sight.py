@@ -0,0 +1,193 @@
+"""Ray and segment queries over the level's tile grid.
+
+TileRaycaster walks a segment through the grid one cell at a time (the
+usual DDA traversal, in integer arithmetic so results never depend on
+rounding) and stops at the first solid tile. On top of that it answers:
+
+    first_hit(start, end)                   first solid tile on the way, and where
+    distance_to_solid(point, direction)     how far to a wall, floor or ceiling
+    clear_between(start, end)               can one point see the other
+
+Each has a batched form that takes a list, and with frame_cache set,
+results are kept until next_frame() so systems asking the same thing in
+one frame (warnings, blobs, bots) only trace it once.
+
+SightGrid adds cell-to-cell visibility for the blobs. A line looks the
+same from either end, so each pair of cells is traced once and cached
+until a tile changes. visible_from() answers for a whole list of cells at
+once, so a level full of blobs looking at the same player costs one
+lookup per distinct cell, and a raycast only for pairs never seen before.
+"""
+import math
+
+SOLID_TILES = (1, 2)
+
+
+class TileRaycaster():
+    def __init__(self, data, tile_size=40, frame_cache=False):
+        self.tile_size = tile_size
+        self.solid = set()
+        for row, tiles in enumerate(data):
+            for col, tile in enumerate(tiles):
+                if tile in SOLID_TILES:
+                    self.solid.add((col, row))
+        self.frame_cache = {} if frame_cache else None
+
+    def set_solid(self, cell, solid):
+        """Add or remove a tile; forgets cached results if that changed anything"""
+        if solid == (cell in self.solid):
+            return
+        if solid:
+            self.solid.add(cell)
+        else:
+            self.solid.discard(cell)
+        self.forget()
+
+    def forget(self):
+        if self.frame_cache is not None:
+            self.frame_cache = {}
+
+    def next_frame(self):
+        """Call once a frame when using frame_cache"""
+        if self.frame_cache:
+            self.frame_cache = {}
+
+    def cell_at(self, x, y):
+        return (x // self.tile_size, y // self.tile_size)
+
+    def center(self, cell):
+        return (cell[0] * self.tile_size + self.tile_size // 2, cell[1] * self.tile_size + self.tile_size // 2)
+
+    def first_hit(self, start, end):
+        """(cell, (x, y)) of the first solid tile the segment from start to end enters, or None.
+
+        start and end are whole pixels. (x, y) is where the segment crosses
+        into that tile; a start inside a tile hits it straight away.
+        """
+        if self.frame_cache is not None:
+            key = ('hit', start, end)
+            if key not in self.frame_cache:
+                self.frame_cache[key] = self.trace(start, end)
+            return self.frame_cache[key]
+        return self.trace(start, end)
+
+    def trace(self, start, end):
+        size = self.tile_size
+        x0, y0 = start
+        x1, y1 = end
+        col, row = x0 // size, y0 // size
+        end_col, end_row = x1 // size, y1 // size
+        if (col, row) in self.solid:
+            return (col, row), (x0, y0)
+        dx = x1 - x0
+        dy = y1 - y0
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+        # Next grid line the segment crosses in each direction. Which comes
+        # first is which of (line - x0) / dx and (line - y0) / dy is smaller,
+        # compared multiplied out so it stays in integers
+        line_x = (col + 1) * size if dx > 0 else col * size
+        line_y = (row + 1) * size if dy > 0 else row * size
+        # Counting the lines left keeps an end point sitting on a line from being overshot
+        cols_left = abs(end_col - col)
+        rows_left = abs(end_row - row)
+        while cols_left or rows_left:
+            to_x = abs(line_x - x0) * abs(dy) if cols_left else None
+            to_y = abs(line_y - y0) * abs(dx) if rows_left else None
+            if to_y is None or (to_x is not None and to_x < to_y):
+                col += step_col
+                cols_left -= 1
+                crossed = (line_x - x0, dx)
+                line_x += step_col * size
+            elif to_x is None or to_y < to_x:
+                row += step_row
+                rows_left -= 1
+                crossed = (line_y - y0, dy)
+                line_y += step_row * size
+            else:
+                # Exactly through a corner, it's blocked if either side is
+                crossed = (line_x - x0, dx)
+                for side in ((col + step_col, row), (col, row + step_row)):
+                    if side in self.solid:
+                        return side, self.point_at(start, end, crossed)
+                col += step_col
+                row += step_row
+                cols_left -= 1
+                rows_left -= 1
+                line_x += step_col * size
+                line_y += step_row * size
+            if (col, row) in self.solid:
+                return (col, row), self.point_at(start, end, crossed)
+        return None
+
+    def point_at(self, start, end, crossed):
+        """Where the segment meets a grid line, from (line - start, segment length) along one axis"""
+        along, length = crossed
+        t = along / length
+        return (start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+
+    def distance_to_solid(self, point, direction, max_distance=400):
+        """Pixels from point to the first tile in direction (an (x, y) vector), or None within max_distance"""
+        length = math.hypot(*direction)
+        end = (point[0] + round(direction[0] * max_distance / length),
+               point[1] + round(direction[1] * max_distance / length))
+        hit = self.first_hit(point, end)
+        if hit is None:
+            return None
+        cell, (x, y) = hit
+        return math.hypot(x - point[0], y - point[1])
+
+    def clear_between(self, start, end):
+        return self.first_hit(start, end) is None
+
+    def first_hits(self, segments):
+        return [self.first_hit(start, end) for start, end in segments]
+
+    def distances_to_solid(self, points, direction, max_distance=400):
+        return [self.distance_to_solid(point, direction, max_distance) for point in points]
+
+    def clear_from(self, points, target):
+        """[clear_between(point, target)] for every point"""
+        return [self.first_hit(point, target) is None for point in points]
+
+
+class SightGrid(TileRaycaster):
+    def __init__(self, data, tile_size=40, frame_cache=False):
+        TileRaycaster.__init__(self, data, tile_size, frame_cache)
+        self.cache = {} # (cell, cell), lower cell first -> clear line between them
+
+    def forget(self):
+        TileRaycaster.forget(self)
+        self.cache = {}
+
+    def raycast(self, start, end):
+        """True if no solid cell lies between the middles of start and end"""
+        return self.trace(self.center(start), self.center(end)) is None
+
+    def visible(self, start, end):
+        key = (start, end) if start <= end else (end, start)
+        clear = self.cache.get(key)
+        if clear is None:
+            clear = self.raycast(*key)
+            self.cache[key] = clear
+        return clear
+
+    def visible_from(self, cells, target, max_range=None):
+        """[can cell see target] for every cell in cells, in order.
+
+        Cells further than max_range cells from the target (in either
+        direction) don't see it, without tracing a ray.
+        """
+        answers = {}
+        results = []
+        for cell in cells:
+            seen = answers.get(cell)
+            if seen is None:
+                if max_range is not None and (abs(cell[0] - target[0]) > max_range
+                                              or abs(cell[1] - target[1]) > max_range):
+                    seen = False
+                else:
+                    seen = self.visible(cell, target)
+                answers[cell] = seen
+            results.append(seen)
+        return results
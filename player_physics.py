@@ -0,0 +1,139 @@
+"""One frame of player movement, without pygame sprites or images.
+
+Player.update in the game calls step() every frame and level_analyzer.py
+calls the same function to search levels offline, so the two can't drift
+apart. Rects are plain (x, y, width, height) int tuples.
+"""
+MOVE_SPEED = 5
+GRAVITY = 1
+TERMINAL_VELOCITY = 10
+COL_THRESH = 20
+
+# Bits of the SPACE/LEFT/RIGHT key mask that recordings and batch physics
+# use for a frame's input (input_replay.KEY_BITS maps pygame keys to them)
+SPACE_BIT = 1
+LEFT_BIT = 2
+RIGHT_BIT = 4
+
+
+def jump_power(level):
+    # Later levels jump a little lower (they also set gravity 1.2, but the
+    # game has always added 1 px/frame, so that's what the physics does)
+    if level >= 5:
+        return -14
+    return -15
+
+
+def collides(rect, x, y, width, height):
+    """Same test as pygame.Rect.colliderect for rects with a size"""
+    rx, ry, rw, rh = rect
+    return rx < x + width and x < rx + rw and ry < y + height and y < ry + rh
+
+
+class TileGrid():
+    """Solid tiles bucketed by cell, so a step only looks at the tiles around the player"""
+    def __init__(self, rects, cell_size=40):
+        self.rects = [tuple(rect) for rect in rects]
+        self.cell_size = cell_size
+        self.cells = {} # (col, row) -> indexes into rects
+        for index, (x, y, width, height) in enumerate(self.rects):
+            for col in range(x // cell_size, (x + width - 1) // cell_size + 1):
+                for row in range(y // cell_size, (y + height - 1) // cell_size + 1):
+                    self.cells.setdefault((col, row), []).append(index)
+        self.near_cache = {}
+
+    def near(self, x, y, width, height, dx, dy):
+        """Tiles that step() could hit, in the same order as the full tile list.
+
+        Landing on or bumping a tile moves the test rect by up to its own
+        height, so the area checked is padded by the player's height.
+        """
+        cell = self.cell_size
+        left = min(x, x + dx) // cell
+        right = (max(x, x + dx) + width) // cell
+        top = (min(y, y + dy) - height - cell) // cell
+        bottom = (max(y, y + dy) + 2 * height + cell) // cell
+        key = (left, right, top, bottom)
+        tiles = self.near_cache.get(key)
+        if tiles is None:
+            indexes = set()
+            for col in range(left, right + 1):
+                for row in range(top, bottom + 1):
+                    indexes.update(self.cells.get((col, row), ()))
+            tiles = [self.rects[index] for index in sorted(indexes)]
+            self.near_cache[key] = tiles
+        return tiles
+
+
+def step(rect, vel_y, in_air, jumped, left, right, space, jump_power, tiles, platforms):
+    """Move the player one frame.
+
+    platforms is a list of (rect, move_x, move_direction) after this frame's
+    platform update. Returns (x, y, vel_y, in_air, jumped, did_jump).
+    """
+    x, y, width, height = rect
+    dx = 0
+    dy = 0
+    did_jump = False
+
+    if space and jumped == False and in_air == False:
+        vel_y = jump_power
+        jumped = True
+        did_jump = True
+    if space == False:
+        jumped = False
+    if left:
+        dx -= MOVE_SPEED
+    if right:
+        dx += MOVE_SPEED
+
+    #add gravity
+    vel_y += GRAVITY
+    if vel_y > TERMINAL_VELOCITY:
+        vel_y = TERMINAL_VELOCITY
+    dy += vel_y
+
+    #check for collision
+    in_air = True
+    # (collides() written out, this loop runs for every tile near the player every frame)
+    for tile_x, tile_y, tile_width, tile_height in tiles.near(x, y, width, height, dx, dy):
+        tile_right = tile_x + tile_width
+        tile_bottom = tile_y + tile_height
+        #check for collision in x direction
+        if tile_x < x + dx + width and x + dx < tile_right and tile_y < y + height and y < tile_bottom:
+            dx = 0
+        #check for collision in y direction
+        if tile_x < x + width and x < tile_right and tile_y < y + dy + height and y + dy < tile_bottom:
+            #check if below the ground i.e. jumping
+            if vel_y < 0:
+                dy = tile_bottom - y
+                vel_y = 0
+            #check if above the ground i.e. falling
+            elif vel_y >= 0:
+                dy = tile_y - (y + height)
+                vel_y = 0
+                in_air = False
+
+    #check for collision with platforms
+    for platform, move_x, move_direction in platforms:
+        #collision in the x direction
+        if collides(platform, x + dx, y, width, height):
+            dx = 0
+        #collision in the y direction
+        if collides(platform, x, y + dy, width, height):
+            platform_top = platform[1]
+            platform_bottom = platform[1] + platform[3]
+            #check if below platform
+            if abs((y + dy) - platform_bottom) < COL_THRESH:
+                vel_y = 0
+                dy = platform_bottom - y
+            #check if above platform
+            elif abs((y + height + dy) - platform_top) < COL_THRESH:
+                y = platform_top - 1 - height
+                in_air = False
+                dy = 0
+            #move sideways with the platform
+            if move_x != 0:
+                x += move_direction
+
+    return x + dx, y + dy, vel_y, in_air, jumped, did_jump
@@ -0,0 +1,67 @@
+"""Turn cosmetic effects off while frames run over budget, and back on after.
+
+The game reports each frame's time to add_frame(). Once a window's worth
+has been seen, the governor compares their mean with the frame budget:
+
+    over degrade_at x budget    the next effect in the list goes off
+    under restore_at x budget   the last effect turned off comes back
+
+After any change it waits hold_frames before deciding again, and the gap
+between the two thresholds keeps it from flapping on the edge. Effects
+go off in the order given, so put the first to lose first. Drawing code
+asks enabled(name) and draws the plain version when it's off.
+
+Measured frame times vary between runs, so recorded, replayed and headless
+games pass active=False and keep every effect on, the same way the frame
+scheduler stops measuring for them.
+"""
+from collections import deque
+
+
+class QualityGovernor():
+    def __init__(self, effects, budget_ms, window=60, degrade_at=1.0, restore_at=0.7, hold_frames=60, active=True):
+        self.effects = list(effects) # turned off from the front
+        self.budget_ms = budget_ms
+        self.degrade_at = degrade_at
+        self.restore_at = restore_at
+        self.hold_frames = hold_frames
+        self.active = active
+        self.frame_ms = deque(maxlen=window)
+        self.level = 0 # how many effects are off
+        self.off = set()
+        self.since_change = 0
+        self.frames_at_level = [0] * (len(self.effects) + 1)
+        self.changes = 0
+
+    def enabled(self, effect):
+        return effect not in self.off
+
+    def add_frame(self, ms):
+        if not self.active:
+            return
+        self.frame_ms.append(ms)
+        self.frames_at_level[self.level] += 1
+        self.since_change += 1
+        if len(self.frame_ms) < self.frame_ms.maxlen or self.since_change < self.hold_frames:
+            return
+        mean = sum(self.frame_ms) / len(self.frame_ms)
+        if mean > self.budget_ms * self.degrade_at and self.level < len(self.effects):
+            self.set_level(self.level + 1)
+        elif mean < self.budget_ms * self.restore_at and self.level > 0:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        self.level = level
+        self.off = set(self.effects[:level])
+        self.since_change = 0
+        self.changes += 1
+
+    def print_stats(self):
+        frames = sum(self.frames_at_level)
+        if not frames:
+            return
+        print(f"Quality governor: {self.changes} changes, budget {self.budget_ms:.1f} ms")
+        for level, count in enumerate(self.frames_at_level):
+            if count:
+                off = ', '.join(self.effects[:level]) or 'nothing'
+                print(f"  {count * 100 / frames:5.1f}% of frames with {off} off")
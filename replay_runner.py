@@ -0,0 +1,225 @@
+"""Replay a directory of recordings in parallel.
+
+Each worker process runs its own headless copy of the game, so the
+corpus is spread over every core instead of being replayed one run
+after another:
+
+    python replay_runner.py replays/ --workers 8 --report report.json
+
+--bots runs autopilot games instead, for soak testing: every bot plays
+(and dies, and restarts) for --bot-frames frames with its own seed.
+Pointing them all at one --db puts the database under concurrent writes:
+
+    python replay_runner.py --bots 32 --bot-frames 36000 --db soak.db
+
+A run that kills its worker process outright (a crash inside pygame) is
+reported with outcome 'error' instead of stopping the rest.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import runpy
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import cpu_count
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_SCRIPT = os.path.join(GAME_DIR, 'DP-FINAL_LAUNCH_GAME.py')
+
+worker_db = None
+
+
+def init_worker(db_dir, shared_db):
+    global worker_db
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    # Level files are loaded relative to the working directory
+    os.chdir(GAME_DIR)
+    if GAME_DIR not in sys.path:
+        sys.path.insert(0, GAME_DIR)
+    # Separate database per worker so runs don't wait on each other's locks
+    worker_db = shared_db or os.path.join(db_dir, f'worker-{os.getpid()}.db')
+
+
+def run_game(argv):
+    """Run the game script once in this process and return its run_summary"""
+    saved_argv = sys.argv
+    sys.argv = [GAME_SCRIPT] + argv + ['--db', worker_db]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = runpy.run_path(GAME_SCRIPT, run_name='__main__')
+        return dict(game['run_summary'])
+    finally:
+        sys.argv = saved_argv
+        # The game does this when it quits, but not if it raised first
+        import assets
+        assets.reset()
+
+
+def run_label(item):
+    """The name a run is reported under: its replay file, or bot-<seed>"""
+    return item if isinstance(item, str) else f'bot-{item[0]}'
+
+
+def run_replay(replay_path):
+    start = time.perf_counter()
+    try:
+        result = run_game(['--headless', '--replay', replay_path])
+    except Exception as e:
+        result = {'outcome': 'error', 'error': repr(e)}
+    result['replay'] = run_label(replay_path)
+    result['wall_seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_bot(job):
+    seed, level, frames = job
+    start = time.perf_counter()
+    try:
+        result = run_game(['--headless', '--autopilot', '--seed', str(seed),
+                           '--level', str(level), '--frames', str(frames)])
+    except Exception as e:
+        result = {'outcome': 'error', 'error': repr(e)}
+    result['replay'] = run_label(job)
+    result['wall_seconds'] = time.perf_counter() - start
+    return result
+
+
+def find_replays(paths):
+    replays = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith('.rec'):
+                    replays.append(os.path.abspath(os.path.join(path, name)))
+        else:
+            replays.append(os.path.abspath(path))
+    return replays
+
+
+def summarise(results, wall_seconds, workers):
+    outcomes = {}
+    for result in results:
+        outcomes[result['outcome']] = outcomes.get(result['outcome'], 0) + 1
+    frames = sum(result.get('frames', 0) for result in results)
+    return {
+        'replays': len(results),
+        'workers': workers,
+        'wall_seconds': wall_seconds,
+        'replayed_frames': frames,
+        'frames_per_second': frames / wall_seconds if wall_seconds else 0,
+        'outcomes': outcomes,
+        'coins': sum(result.get('coins', 0) for result in results),
+        'deaths': sum(result.get('deaths', 0) for result in results),
+        'levels_completed': sum(result.get('levels_completed', 0) for result in results),
+    }
+
+
+def run_pool(items, worker, workers, db_dir, shared_db, progress=True):
+    """Spread items over a pool of game processes; results come back in the order they finish.
+
+    Only as many runs as there are workers are handed to the pool at a
+    time. A worker dying takes the whole pool down, and the runs in it at
+    the time fail with it; the rest of items carry on in a new pool with
+    every worker. The runs that were in the broken pool are run again at
+    the end, one at a time in a pool of their own, so only the run that
+    really crashes comes back as an 'error'.
+    """
+    results = []
+    todo = deque(items)
+    suspects = []
+
+    def show_progress():
+        if progress:
+            print(f"\r{len(results)}/{len(items)} runs", end='', file=sys.stderr, flush=True)
+
+    while todo:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(db_dir, shared_db)) as pool:
+            running = {}
+            while todo or running:
+                while todo and len(running) < workers:
+                    item = todo.popleft()
+                    running[pool.submit(worker, item)] = item
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    item = running.pop(future)
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool:
+                        suspects.append(item)
+                        broken = True
+                if broken:
+                    # Everything else in this pool died with it
+                    suspects.extend(running.values())
+                    break
+                show_progress()
+    for item in suspects:
+        with ProcessPoolExecutor(1, initializer=init_worker, initargs=(db_dir, shared_db)) as pool:
+            try:
+                results.append(pool.submit(worker, item).result())
+            except BrokenProcessPool as e:
+                results.append({'replay': run_label(item), 'outcome': 'error',
+                                'error': f'worker process died: {e!r}'})
+        show_progress()
+    if progress and items:
+        print(file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded runs in parallel headless games')
+    parser.add_argument('paths', nargs='*', help='replay files or directories of .rec files')
+    parser.add_argument('--workers', type=int, default=cpu_count(), help='worker processes (default: one per core)')
+    parser.add_argument('--report', metavar='FILE', help='write the JSON report to FILE')
+    parser.add_argument('--db', metavar='FILE', help='database every worker writes to (default: a scratch one each)')
+    parser.add_argument('--bots', type=int, help='run this many autopilot games instead of replays')
+    parser.add_argument('--bot-frames', type=int, default=18000, help='frames each bot plays (default: 18000, 5 minutes)')
+    parser.add_argument('--level', type=int, default=1, help='level the bots start at (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first bot, the rest count up from it')
+    args = parser.parse_args()
+
+    if args.bots:
+        jobs = [(args.seed + n, args.level, args.bot_frames) for n in range(args.bots)]
+        worker = run_bot
+    else:
+        jobs = find_replays(args.paths)
+        worker = run_replay
+        if not jobs:
+            parser.error('no replay files found')
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='replays-') as db_dir:
+        results = run_pool(jobs, worker, args.workers, db_dir, args.db)
+    wall_seconds = time.perf_counter() - start
+
+    results.sort(key=lambda result: result['replay'])
+    report = {'summary': summarise(results, wall_seconds, args.workers), 'runs': results}
+
+    for result in results:
+        if result['outcome'] == 'error':
+            print(f"{os.path.basename(result['replay'])}: ERROR {result['error']}")
+        else:
+            print(f"{os.path.basename(result['replay'])}: {result['outcome']:<9} level {result['level']} "
+                  f"score {result['score']:>3}  {result['frames']:>6} frames  "
+                  f"mean {result['frame_ms_mean']:.2f} ms  p95 {result['frame_ms_p95']:.2f} ms")
+    summary = report['summary']
+    print(f"{summary['replays']} {'bots' if args.bots else 'replays'} on {summary['workers']} workers in {summary['wall_seconds']:.1f} s "
+          f"({summary['frames_per_second']:.0f} frames/s), outcomes: {summary['outcomes']}")
+    if args.bots:
+        print(f"Coins {summary['coins']}, deaths {summary['deaths']}, levels completed {summary['levels_completed']}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""The player's settings, kept in memory and saved in the background.
+
+SettingsStore reads the settings once, the first time one is asked for
+or changed, so making it costs nothing. After that reading one is a dict
+lookup, and set() only changes the value in memory and
+notes the time. A writer thread saves the settings once they have gone
+delay seconds without changing, so dragging the volume slider writes once
+when the drag stops rather than on every mouse movement. close() saves
+anything still waiting, for when the game quits.
+
+load() returns {name: value} or None, and save(**values) writes them
+back; the game passes its load_settings and save_settings.
+"""
+import threading
+import time
+
+
+class SettingsStore():
+    def __init__(self, load, save, defaults, delay=1.0):
+        self.load = load
+        self.save = save
+        self.delay = delay
+        self.defaults = dict(defaults)
+        self.values = None # until the first read
+        self.dirty = False
+        self.changed_at = 0.0
+        self.writes = 0
+        self.condition = threading.Condition()
+        self.writer = None
+        self.closed = False
+
+    def loaded(self):
+        """The settings, read now if they haven't been"""
+        if self.values is None:
+            values = dict(self.defaults)
+            values.update(self.load() or {})
+            self.values = values
+        return self.values
+
+    def __getitem__(self, name):
+        return self.loaded()[name]
+
+    def set(self, name, value):
+        """Change a setting now; it's saved once settings stop changing for a while"""
+        if self.loaded().get(name) == value:
+            return
+        with self.condition:
+            self.values[name] = value
+            self.dirty = True
+            self.changed_at = time.monotonic()
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_when_settled, name='settings', daemon=True)
+                self.writer.start()
+            self.condition.notify()
+
+    def write_when_settled(self):
+        with self.condition:
+            while not self.closed:
+                if not self.dirty:
+                    self.condition.wait()
+                    continue
+                wait = self.changed_at + self.delay - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                values = dict(self.values)
+                self.dirty = False
+                # Saved without the lock held, so set() never waits on the database
+                self.condition.release()
+                try:
+                    saved = self.try_save(values)
+                finally:
+                    self.condition.acquire()
+                self.writes += 1
+                if not saved:
+                    # Try again in a while rather than over and over
+                    self.dirty = True
+                    self.changed_at = time.monotonic()
+
+    def close(self):
+        """Save anything not saved yet and stop the writer"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        # Let a save already under way finish first, so it can't land after this one
+        if self.writer is not None:
+            self.writer.join()
+        if self.dirty:
+            self.dirty = False
+            self.try_save(self.values)
+            self.writes += 1
+
+    def try_save(self, values):
+        """save(**values), with an exception counting as a failed save rather than ending the writer"""
+        try:
+            return self.save(**values)
+        except Exception as e:
+            print(f"Error saving settings: {e}")
+            return False
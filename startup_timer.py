@@ -0,0 +1,40 @@
+"""How long each part of starting the game takes, for --startup-report.
+
+mark(name) closes a phase of the straight-line startup: everything since
+the previous mark. timed(name) wraps work that only happens on first use
+(the database, the first level), which can land any time after the first
+frame. report() prints both, in the order they happened.
+"""
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer():
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.deferred = 0.0 # seconds in timed() since the last mark, not counted twice
+        self.phases = [] # (name, ms, ms since start when it ended, deferred)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last - self.deferred) * 1000, (now - self.start) * 1000, False))
+        self.last = now
+        self.deferred = 0.0
+
+    @contextmanager
+    def timed(self, name):
+        """Time a deferred phase; only the first time each name runs is kept"""
+        begin = time.perf_counter()
+        yield
+        now = time.perf_counter()
+        self.deferred += now - begin
+        if all(phase[0] != name for phase in self.phases):
+            self.phases.append((name, (now - begin) * 1000, (now - self.start) * 1000, True))
+
+    def report(self):
+        print("Startup phase                  ms    at ms")
+        for name, ms, at, deferred in self.phases:
+            if deferred:
+                name += ' (deferred)'
+            print(f"{name:<26} {ms:>6.1f} {at:>8.1f}")
@@ -0,0 +1,22 @@
+"""level_analyzer.analyze on every bundled level.
+
+Each one should be finished inside its timer, and working that out should
+take well under a second even for the level that has to wait for platforms.
+"""
+import os
+import sys
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+
+import level_analyzer
+from level_data import load_level_data
+
+MOST_SECONDS = 1.0
+
+
+def test_every_level_analyzes_in_under_a_second():
+    for level in range(1, level_analyzer.MAX_LEVELS + 1):
+        result = level_analyzer.analyze(load_level_data(level, GAME_DIR), level)
+        assert result['reachable'] and result['fits'], result
+        assert result['seconds'] < MOST_SECONDS, result
@@ -0,0 +1,54 @@
+"""replay_runner.run_pool when a run kills its worker process.
+
+The crashing run should come back as the only 'error', and the runs after
+it should still be spread over every worker rather than run one by one.
+"""
+import os
+import sys
+import tempfile
+import time
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+
+import replay_runner
+
+RUN_SECONDS = 0.3
+WORKERS = 3
+
+
+def crash_or_sleep(item):
+    """Stands in for run_replay: 'crash' kills its process outright, anything else takes RUN_SECONDS"""
+    start = time.monotonic()
+    if item == 'crash':
+        time.sleep(0.05)
+        os._exit(1)
+    time.sleep(RUN_SECONDS)
+    return {'replay': item, 'outcome': 'finished', 'start': start, 'end': time.monotonic()}
+
+
+def most_at_once(results):
+    """The most runs that were going at the same moment"""
+    edges = sorted([(result['start'], 1) for result in results] + [(result['end'], -1) for result in results])
+    going = most = 0
+    for when, change in edges:
+        going += change
+        most = max(most, going)
+    return most
+
+
+def test_a_crash_fails_one_run_and_the_rest_stay_parallel():
+    items = ['crash'] + [f'run-{n}' for n in range(4 * WORKERS)]
+    with tempfile.TemporaryDirectory() as db_dir:
+        results = replay_runner.run_pool(items, crash_or_sleep, WORKERS, db_dir, None, progress=False)
+
+    errors = [result for result in results if result['outcome'] == 'error']
+    assert [result['replay'] for result in errors] == ['crash']
+    assert 'worker process died' in errors[0]['error']
+    finished = [result for result in results if result['outcome'] == 'finished']
+    assert sorted(result['replay'] for result in finished) == sorted(items[1:])
+
+    # The runs that never shared a pool with the crash all ran in a new
+    # pool of WORKERS processes, not one after another
+    after = [result for result in finished if result['start'] > min(other['end'] for other in finished)]
+    assert most_at_once(after) == WORKERS
@@ -0,0 +1,27 @@
+"""Two games in a row in one process, the way a replay_runner worker runs them.
+
+Fonts and surfaces the asset caches kept from the first game used to
+crash the second one (a segfault, so it runs in a child process).
+"""
+import os
+import subprocess
+import sys
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TWO_GAMES = '''
+import sys, tempfile
+import replay_runner
+replay_runner.init_worker(tempfile.mkdtemp(), None)
+for seed in (1, 2):
+    result = replay_runner.run_bot((seed, 1, 120))
+    assert result['outcome'] != 'error', result
+    print(result['replay'], result['outcome'], result['frames'])
+'''
+
+
+def test_two_games_in_one_process():
+    done = subprocess.run([sys.executable, '-c', TWO_GAMES], cwd=GAME_DIR, capture_output=True, text=True,
+                          timeout=120)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.split('\n')[:2] == ['bot-1 finished 120', 'bot-2 finished 120']
@@ -0,0 +1,65 @@
+"""The game's window, and getting each frame onto it.
+
+The game always draws at its logical size (800x856) onto an offscreen
+surface, with the same coordinates, sprites and fonts whatever the
+window is. present() puts that frame on the window once per frame:
+
+    window the logical size     one blit (moved by any screen shake)
+    scale given                 one scale to the window's size, then the
+                                blit: 2 for a high DPI screen, instead of
+                                scaling every sprite as it's drawn
+    scaled=True                 pygame.SCALED: SDL stretches the frame to
+                                fit the desktop, on the GPU where it can;
+                                this is the way to fit a smaller screen
+
+There's no drawing below the logical size: measured on this game, drawing
+the sky and tiles at half size saves less than scaling the frame back up
+costs, and at 0.75 it comes out slower.
+
+Mouse positions from a scaled window are in window pixels; to_logical()
+and mouse_pos() turn them back into the game's. With pygame.SCALED, SDL
+already does.
+"""
+import pygame
+
+
+class Window():
+    def __init__(self, logical_size, scale=1.0, scaled=False):
+        self.logical_size = logical_size
+        self.scale = scale
+        self.scaled = scaled
+        self.display = None
+        self.frame = None
+        self.stretched = None # window sized copy of the frame, when scaling ourselves
+
+    def open(self, caption):
+        """Create the window; returns the offscreen surface to draw each frame on"""
+        if self.scaled:
+            self.display = pygame.display.set_mode(self.logical_size, pygame.SCALED)
+        else:
+            width, height = self.logical_size
+            self.display = pygame.display.set_mode((round(width * self.scale), round(height * self.scale)))
+        pygame.display.set_caption(caption)
+        self.frame = pygame.Surface(self.logical_size).convert()
+        if self.display.get_size() != self.logical_size:
+            self.stretched = pygame.Surface(self.display.get_size()).convert()
+        return self.frame
+
+    def present(self, shake):
+        """Put the frame on the window, moved by shake (a ScreenShake)"""
+        if self.stretched is None:
+            shake.present(self.frame, self.display)
+        else:
+            pygame.transform.scale(self.frame, self.stretched.get_size(), self.stretched)
+            shake.present(self.stretched, self.display)
+
+    def to_logical(self, pos):
+        """A position in the window as a position in the frame"""
+        if self.stretched is None:
+            return pos
+        (width, height), (window_width, window_height) = self.logical_size, self.display.get_size()
+        return (pos[0] * width // window_width, pos[1] * height // window_height)
+
+    def mouse_pos(self):
+        """pygame.mouse.get_pos() in the frame's coordinates"""
+        return self.to_logical(pygame.mouse.get_pos())